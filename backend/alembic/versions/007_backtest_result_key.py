@@ -0,0 +1,27 @@
+"""Add result_key to strategy_backtest_runs (one stored run per identical backtest)
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("strategy_backtest_runs", sa.Column("result_key", sa.String(64), nullable=True))
+    op.create_unique_constraint(
+        "uq_strategy_backtest_runs_result_key", "strategy_backtest_runs", ["strategy_id", "result_key"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_strategy_backtest_runs_result_key", "strategy_backtest_runs", type_="unique")
+    op.drop_column("strategy_backtest_runs", "result_key")
@@ -75,6 +75,39 @@ class Settings(BaseSettings):
     chat_developer_instructions: str = ""
     chat_max_context_tokens: int = 12000
 
+    # Backtesting: CPU-bound runs go to a process pool (0 workers = one per CPU).
+    # At most workers + queue_size runs are in flight; beyond that the API returns 503.
+    backtest_process_workers: int = 0
+    backtest_queue_size: int = 16
+    backtest_batch_max_concurrency: int = 8
+    backtest_batch_max_symbols: int = 500
+    backtest_sweep_max_combinations: int = 5000
+    # Monte Carlo over a run's trades: runs above shard_simulations are split across the process pool
+    backtest_monte_carlo_max_simulations: int = 100_000
+    backtest_monte_carlo_shard_simulations: int = 10_000
+    backtest_results_dir: str = ".cache/backtests"  # per-run trade logs and equity curves (columnar files)
+    # Result cache for single backtests: in-process LRU, then Redis (redis_url); ranges that reach
+    # the present expire with market_data_cache_open_ttl_seconds, closed ones after the TTL below.
+    backtest_result_cache_size: int = 256
+    backtest_result_cache_ttl_seconds: int = 7 * 86400
+
+    # Market data: provider ("mock" = synthetic bars, "fixture" = CSV files under the fixture dir)
+    # behind an OHLCV cache (columnar files, memory-mapped). Only the base resolution is fetched
+    # and stored; coarser bars are resampled from it. Ranges that reach past their fetch time
+    # are refetched after the TTL.
+    market_data_provider: str = "mock"
+    market_data_mock_regime: str = "default"  # synthetic market for "mock": default, calm, volatile, small_cap
+    market_data_fixture_dir: str = "fixtures/bars"
+    market_data_base_resolution: str = "1"
+    market_data_stream_poll_seconds: float = 5.0  # live feed: one upstream poll per symbol
+    market_data_cache_dir: str = ".cache/bars"
+    market_data_cache_open_ttl_seconds: int = 300
+
+    # Strategy scanner: live entry-rule scans over a symbol universe (one batch upstream poll per scan)
+    scanner_max_symbols: int = 5000
+    scanner_poll_seconds: float = 15.0
+    scanner_universe: str = ""  # comma-separated default universe for scans that name no symbols
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -5,6 +5,7 @@ from fastapi.responses import JSONResponse
 
 from app.config import get_settings
 from app.routers import health, auth, users, onboarding, gurus, strategies, chart, chat
+from app.services.backtest_executor import get_backtest_executor
 
 settings = get_settings()
 app = FastAPI(title=settings.project_name, debug=settings.debug)
@@ -45,6 +46,11 @@ app.include_router(chart.router, prefix="/chart", tags=["chart"])
 app.include_router(chat.router, prefix="/chat", tags=["chat"])
 
 
+@app.on_event("shutdown")
+def shutdown_backtest_executor():
+    get_backtest_executor().shutdown()
+
+
 @app.get("/")
 def root():
     return {"app": settings.project_name, "status": "ok"}
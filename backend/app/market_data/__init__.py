@@ -0,0 +1,19 @@
+"""Market data: providers, resolutions and the persistent OHLCV cache."""
+from app.market_data.cache import BarCache, get_bar_cache
+from app.market_data.providers import FileFixtureProvider, MarketDataProvider, MockProvider, create_provider
+from app.market_data.resolution import RESOLUTION_SECONDS, normalize_resolution
+from app.market_data.synthetic import MarketRegime, synthetic_bars, synthetic_universe
+
+__all__ = [
+    "BarCache",
+    "get_bar_cache",
+    "MarketDataProvider",
+    "MockProvider",
+    "FileFixtureProvider",
+    "create_provider",
+    "RESOLUTION_SECONDS",
+    "normalize_resolution",
+    "MarketRegime",
+    "synthetic_bars",
+    "synthetic_universe",
+]
@@ -0,0 +1,260 @@
+"""
+Persistent OHLCV cache: bars keyed by (symbol, resolution, range), stored as columnar files
+(app.storage.columnar) and served memory-mapped. A hit returns BarSeries views into the
+mapping, so the backtester and the chart API read cached bars without copying or parsing.
+BarCache is itself a MarketDataProvider wrapping an upstream provider, so async callers
+get single-flight coalescing on top of the cache. Files are keyed by the upstream's name and
+version, so a provider whose data changes starts from an empty cache.
+
+Only base_resolution (the finest granularity, 1-minute by default) is fetched and stored.
+Coarser resolutions are resampled from the stored base file on demand and kept in memory
+next to its mapping, so every resolution shares one fetch and one file.
+
+Ranges are widened to whole UTC days before fetching. A miss that overlaps or touches
+cached ranges fetches only the days none of them holds and merges everything into one file
+replacing them, so coverage per (symbol, resolution) stays one or a few files. Ranges that
+extend past the time they were fetched are "open" (the vendor may still add bars); once older
+than open_ttl_seconds their tail, from the day they were fetched on, is fetched again.
+"""
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from app.config import get_settings
+from app.market_data.providers import MarketDataProvider, create_provider
+from app.market_data.resample import bucket_range, bucket_start, resample
+from app.market_data.resolution import DAY_SECONDS, normalize_resolution, resolution_seconds
+from app.storage.columnar import read_columns, write_columns
+from app.strategies.bars import BarSeries
+
+_SUFFIX = ".bars"
+
+
+class BarCache(MarketDataProvider):
+    def __init__(
+        self,
+        root: Union[str, Path],
+        upstream: MarketDataProvider,
+        base_resolution: str = "1",
+        open_ttl_seconds: int = 300,
+        max_open_files: int = 64,
+    ):
+        super().__init__()
+        self.root = Path(root)
+        self.upstream = upstream
+        self.name = f"cached-{upstream.name}"
+        self.base_resolution = normalize_resolution(base_resolution)
+        self.open_ttl_seconds = open_ttl_seconds
+        self.max_open_files = max_open_files
+        self._open: OrderedDict[Path, tuple[dict, BarSeries]] = OrderedDict()
+        self._derived: OrderedDict[tuple, BarSeries] = OrderedDict()
+        self._lock = threading.Lock()  # guards _open, _derived and _key_locks
+        self._key_locks: dict[tuple[str, str], threading.Lock] = {}
+
+    @property
+    def data_version(self) -> str:
+        """Upstream name and version: anything derived from these bars can key on it."""
+        return f"{self.upstream.name}-{self.upstream.version}"
+
+    def _dir(self, symbol: str, resolution: str) -> Path:
+        return self.root / self.data_version / resolution / symbol
+
+    def _key_lock(self, symbol: str, resolution: str) -> threading.Lock:
+        """One lock per (symbol, resolution): misses for the same key fetch once, other keys don't wait."""
+        with self._lock:
+            return self._key_locks.setdefault((symbol, resolution), threading.Lock())
+
+    def _ranges(self, symbol: str, resolution: str) -> list[tuple[int, int, Path]]:
+        """Cached (start, end, path) for one key, read from disk so other processes' writes show up."""
+        out = []
+        for path in self._dir(symbol, resolution).glob(f"*{_SUFFIX}"):
+            try:
+                lo, hi = (int(x) for x in path.stem.split("-"))
+            except ValueError:
+                continue
+            out.append((lo, hi, path))
+        return sorted(out)
+
+    def _load(self, path: Path) -> Optional[tuple[dict, BarSeries]]:
+        with self._lock:
+            entry = self._open.get(path)
+            if entry is not None:
+                self._open.move_to_end(path)
+                return entry
+        try:
+            meta, cols = read_columns(path)
+        except (OSError, ValueError):
+            return None  # replaced or removed by another process
+        entry = (meta, BarSeries(cols["t"], cols["o"], cols["h"], cols["l"], cols["c"], cols["v"]))
+        with self._lock:
+            self._open[path] = entry
+            while len(self._open) > self.max_open_files:
+                self._open.popitem(last=False)
+        return entry
+
+    def _forget(self, path: Path) -> None:
+        with self._lock:
+            self._open.pop(path, None)
+
+    def _fresh(self, meta: dict) -> bool:
+        if meta["end"] <= meta["fetched_at"]:
+            return True
+        return time.time() - meta["fetched_at"] < self.open_ttl_seconds
+
+    def _store(
+        self, symbol: str, resolution: str, lo: int, hi: int, bars: BarSeries, fetched_at: int, replaces: list[Path]
+    ) -> tuple[dict, BarSeries]:
+        path = self._dir(symbol, resolution) / f"{lo}-{hi}{_SUFFIX}"
+        meta = {"symbol": symbol, "resolution": resolution, "start": lo, "end": hi, "fetched_at": fetched_at}
+        write_columns(path, {"t": bars.t, "o": bars.o, "h": bars.h, "l": bars.l, "c": bars.c, "v": bars.v}, meta)
+        self._forget(path)
+        for old in replaces:
+            if old != path:
+                self._forget(old)
+                old.unlink(missing_ok=True)  # open mappings stay valid until released
+        return self._load(path) or (meta, bars)
+
+    def _final_until(self, meta: dict) -> int:
+        """Where meta's stored bars stop being kept: their end, or for a stale open range the day it was fetched on."""
+        if self._fresh(meta):
+            return meta["end"]
+        return max(meta["start"], meta["fetched_at"] // DAY_SECONDS * DAY_SECONDS)
+
+    def _base_entry(self, symbol: str, lo: int, hi: int) -> tuple[dict, BarSeries]:
+        """Stored base-resolution bars covering [lo, hi), fetching the gaps (and merging ranges) on a miss."""
+        resolution = self.base_resolution
+        with self._key_lock(symbol, resolution):
+            for r_lo, r_hi, path in self._ranges(symbol, resolution):
+                if r_lo <= lo and hi <= r_hi:
+                    entry = self._load(path)
+                    if entry is not None and self._fresh(entry[0]):
+                        return entry
+            touching = [r for r in self._ranges(symbol, resolution) if r[0] <= hi and lo <= r[1]]
+            f_lo = min([lo] + [r[0] for r in touching])
+            f_hi = max([hi] + [r[1] for r in touching])
+
+            # Walk [f_lo, f_hi): stored bars where a range holds them, upstream bars for the rest
+            fetched_at = int(time.time())
+            parts: list[BarSeries] = []
+            cursor = f_lo
+            for r_lo, _, path in touching:
+                entry = self._load(path)
+                if entry is None:
+                    continue
+                meta, bars = entry
+                until = self._final_until(meta)
+                if until <= cursor:
+                    continue
+                if r_lo > cursor:
+                    parts.append(self.upstream.fetch_bars(symbol, resolution, cursor, r_lo - 1))
+                    cursor = r_lo
+                i = int(np.searchsorted(bars.t, cursor, side="left"))
+                j = int(np.searchsorted(bars.t, until, side="left"))
+                parts.append(bars[i:j])
+                cursor = until
+                if meta["end"] > meta["fetched_at"] and until == meta["end"]:
+                    fetched_at = min(fetched_at, meta["fetched_at"])  # kept open bars age from their own fetch
+            if cursor < f_hi:
+                parts.append(self.upstream.fetch_bars(symbol, resolution, cursor, f_hi - 1))
+            bars = BarSeries.concat(parts)
+            return self._store(symbol, resolution, f_lo, f_hi, bars, fetched_at, [r[2] for r in touching])
+
+    def _resampled(self, entry: tuple[dict, BarSeries], resolution: str) -> BarSeries:
+        """entry's bars at resolution, computed once per stored file version."""
+        meta, base = entry
+        key = (meta["symbol"], meta["start"], meta["end"], meta["fetched_at"], resolution)
+        with self._lock:
+            bars = self._derived.get(key)
+            if bars is not None:
+                self._derived.move_to_end(key)
+                return bars
+        bars = resample(base, resolution)
+        with self._lock:
+            self._derived[key] = bars
+            while len(self._derived) > self.max_open_files:
+                self._derived.popitem(last=False)
+        return bars
+
+    def fetch_bars(self, symbol: str, resolution: str, start_ts: int, end_ts: int) -> BarSeries:
+        """
+        Bars with start_ts <= t <= end_ts. At base_resolution these are read-only views into
+        the cached file; coarser resolutions are views into the cached resampled columns.
+        """
+        symbol = symbol.upper().strip()
+        resolution = normalize_resolution(resolution)
+        if resolution_seconds(resolution) < resolution_seconds(self.base_resolution):
+            raise ValueError(f"Resolution {resolution} is finer than the stored {self.base_resolution} bars")
+        # Whole days, widened to whole buckets so a coarse bar never comes from a partial range
+        lo, hi = bucket_range(start_ts, end_ts, resolution)
+        lo = lo // DAY_SECONDS * DAY_SECONDS
+        hi = -(-hi // DAY_SECONDS) * DAY_SECONDS
+
+        entry = self._base_entry(symbol, lo, hi)
+        bars = entry[1] if resolution == self.base_resolution else self._resampled(entry, resolution)
+        i = int(np.searchsorted(bars.t, start_ts, side="left"))
+        j = int(np.searchsorted(bars.t, end_ts, side="right"))
+        return bars[i:j]
+
+    def iter_bars(
+        self, symbol: str, resolution: str, start_ts: int, end_ts: int, chunk_bars: int = 50_000
+    ) -> Iterator[BarSeries]:
+        """
+        fetch_bars as consecutive chunks of about chunk_bars bars. The base file is walked
+        through its mapping and each piece is resampled on its own (cut on bucket boundaries),
+        so memory stays at one chunk however long the range is.
+        """
+        symbol = symbol.upper().strip()
+        resolution = normalize_resolution(resolution)
+        step = resolution_seconds(resolution)
+        base_step = resolution_seconds(self.base_resolution)
+        if step < base_step:
+            raise ValueError(f"Resolution {resolution} is finer than the stored {self.base_resolution} bars")
+        lo, hi = bucket_range(start_ts, end_ts, resolution)
+        lo = lo // DAY_SECONDS * DAY_SECONDS
+        hi = -(-hi // DAY_SECONDS) * DAY_SECONDS
+        base = self._base_entry(symbol, lo, hi)[1]
+        i = int(np.searchsorted(base.t, bucket_start(np.array([start_ts]), resolution)[0]))
+        end = int(np.searchsorted(base.t, hi, side="left"))
+        per_chunk = max(chunk_bars, 1) * (step // base_step)
+        while i < end:
+            j = min(i + per_chunk, end)
+            if j < end:
+                # Cut at the start of the bucket bar j falls in, or after it if the chunk is inside one bucket
+                first = int(bucket_start(base.t[j : j + 1], resolution)[0])
+                cut = int(np.searchsorted(base.t, first, side="left"))
+                j = cut if cut > i else int(np.searchsorted(base.t, first + step, side="left"))
+            bars = base[i:j] if resolution == self.base_resolution else resample(base[i:j], resolution)
+            a = int(np.searchsorted(bars.t, start_ts, side="left"))
+            b = int(np.searchsorted(bars.t, end_ts, side="right"))
+            if b > a:
+                yield bars[a:b]
+            i = j
+
+    def clear_memory(self) -> None:
+        """Drop open mappings (files stay on disk)."""
+        with self._lock:
+            self._open.clear()
+            self._derived.clear()
+
+
+_bar_cache: Optional[BarCache] = None
+
+
+def get_bar_cache() -> BarCache:
+    """Process-wide cache over the configured provider (each backtest worker gets its own)."""
+    global _bar_cache
+    if _bar_cache is None:
+        settings = get_settings()
+        _bar_cache = BarCache(
+            root=settings.market_data_cache_dir,
+            upstream=create_provider(
+                settings.market_data_provider, settings.market_data_fixture_dir, settings.market_data_mock_regime
+            ),
+            base_resolution=settings.market_data_base_resolution,
+            open_ttl_seconds=settings.market_data_cache_open_ttl_seconds,
+        )
+    return _bar_cache
@@ -0,0 +1,40 @@
+"""
+Wire encodings for bar columns. Bars stay columnar from the cache to the response body:
+JSON is serialized straight from the NumPy arrays by orjson (no per-bar dicts or lists),
+and the binary form is the columnar file layout (app.storage.columnar) in memory.
+"""
+import hashlib
+from typing import Optional
+
+import numpy as np
+import orjson
+
+from app.storage.columnar import encode_columns
+from app.strategies.bars import BarSeries
+
+BINARY_MEDIA_TYPE = "application/vnd.tradsy.bars"
+_FIELDS = ("t", "o", "h", "l", "c", "v")
+
+
+def bar_columns(bars: BarSeries) -> dict[str, np.ndarray]:
+    cols = {k: np.ascontiguousarray(getattr(bars, k)) for k in _FIELDS}
+    cols["v"] = cols["v"].astype(np.int64)  # whole shares on the wire
+    return cols
+
+
+def bars_digest(bars: BarSeries) -> str:
+    """Content hash of the bars (all six columns), for ETags."""
+    h = hashlib.blake2b(digest_size=12)
+    for k in _FIELDS:
+        h.update(np.ascontiguousarray(getattr(bars, k)).data)
+    return h.hexdigest()
+
+
+def encode_udf_json(bars: BarSeries, meta: Optional[dict] = None) -> bytes:
+    """TradingView UDF shape: {"s": "ok", "t": [...], "o": [...], ..., "v": [...]}; meta replaces {"s": "ok"}."""
+    return orjson.dumps({**(meta or {"s": "ok"}), **bar_columns(bars)}, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def encode_binary(bars: BarSeries, meta: Optional[dict] = None) -> bytes:
+    """Columnar binary body: t int64, o/h/l/c float64, v int64 (see storage.columnar.decode_columns)."""
+    return encode_columns(bar_columns(bars), meta or {"s": "ok"})
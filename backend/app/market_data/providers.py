@@ -0,0 +1,156 @@
+"""
+Market-data providers: one interface for every source of OHLCV bars.
+Providers implement the blocking fetch_bars (and optionally a true multi-symbol
+fetch_bars_batch); the async get_bars / get_bars_batch run those off the event loop and
+coalesce concurrent identical requests (single-flight), so 50 clients opening the same
+chart share one fetch.
+"""
+import asyncio
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from app.market_data.resolution import normalize_resolution
+from app.market_data.synthetic import SYNTHETIC_VERSION, MarketRegime, get_regime, synthetic_bars
+from app.strategies.bars import BarSeries
+
+_COLUMNS = ("t", "o", "h", "l", "c", "v")
+
+
+def empty_series() -> BarSeries:
+    return BarSeries([], [], [], [], [], [])
+
+
+class MarketDataProvider(ABC):
+    name = "base"
+    version = "1"  # changes when the bars served for a range change; caches key on name and version
+
+    def __init__(self):
+        self._flights: dict[tuple, asyncio.Future] = {}
+
+    @abstractmethod
+    def fetch_bars(self, symbol: str, resolution: str, start_ts: int, end_ts: int) -> BarSeries:
+        """Blocking fetch of bars with start_ts <= t <= end_ts."""
+
+    def fetch_bars_batch(
+        self, symbols: list[str], resolution: str, start_ts: int, end_ts: int
+    ) -> dict[str, BarSeries]:
+        """Blocking multi-symbol fetch. Vendors with a multi-symbol endpoint should override this."""
+        return {s: self.fetch_bars(s, resolution, start_ts, end_ts) for s in symbols}
+
+    async def get_bars(self, symbol: str, resolution: str, start_ts: int, end_ts: int) -> BarSeries:
+        result = await self.get_bars_batch([symbol], resolution, start_ts, end_ts)
+        return result[symbol.upper().strip()]
+
+    async def get_bars_batch(
+        self, symbols: Iterable[str], resolution: str, start_ts: int, end_ts: int
+    ) -> dict[str, BarSeries]:
+        """
+        Bars for many symbols, keyed by upper-cased symbol. A (symbol, resolution, range)
+        already in flight is awaited instead of fetched again; the rest go to one
+        fetch_bars_batch call in a worker thread. Cancelling a caller never cancels a
+        fetch other callers are waiting on.
+        """
+        resolution = normalize_resolution(resolution)
+        symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s and s.strip()))
+        flights = {}
+        missing = []
+        for symbol in symbols:
+            flight = self._flights.get((symbol, resolution, start_ts, end_ts))
+            if flight is None:
+                missing.append(symbol)
+            else:
+                flights[symbol] = flight
+        if missing:
+            batch = asyncio.ensure_future(
+                asyncio.to_thread(self.fetch_bars_batch, missing, resolution, start_ts, end_ts)
+            )
+            for symbol in missing:
+                key = (symbol, resolution, start_ts, end_ts)
+                flight = asyncio.ensure_future(self._pick(batch, symbol))
+                flight.add_done_callback(lambda _, key=key: self._flights.pop(key, None))
+                self._flights[key] = flights[symbol] = flight
+        return {symbol: await asyncio.shield(flights[symbol]) for symbol in symbols}
+
+    @staticmethod
+    async def _pick(batch: asyncio.Future, symbol: str) -> BarSeries:
+        result = await batch
+        bars = result.get(symbol)
+        return bars if bars is not None else empty_series()
+
+
+class MockProvider(MarketDataProvider):
+    """Deterministic synthetic bars (app.market_data.synthetic) in one market regime; works offline."""
+
+    name = "mock"
+
+    def __init__(self, regime: Union[str, MarketRegime, None] = None):
+        super().__init__()
+        self.regime = get_regime(regime)
+        self.version = f"{SYNTHETIC_VERSION}-{self.regime.key()}"
+
+    def fetch_bars(self, symbol: str, resolution: str, start_ts: int, end_ts: int) -> BarSeries:
+        # Synthetic bars exist for any timestamp; only serve the ones that have "printed"
+        return synthetic_bars(symbol, resolution, start_ts, min(end_ts, int(time.time())), self.regime)
+
+
+class FileFixtureProvider(MarketDataProvider):
+    """
+    Bars from CSV fixtures at <root>/<SYMBOL>/<resolution>.csv with a t,o,h,l,c,v header.
+    Symbols or resolutions without a file have no bars. write() records fixtures, e.g. from
+    MockProvider, so tests can pin exact data.
+    """
+
+    name = "fixture"
+
+    def __init__(self, root: Union[str, Path]):
+        super().__init__()
+        self.root = Path(root)
+        self._loaded: dict[Path, BarSeries] = {}
+        self._lock = threading.Lock()
+
+    def path(self, symbol: str, resolution: str) -> Path:
+        return self.root / symbol.upper().strip() / f"{normalize_resolution(resolution)}.csv"
+
+    def _load(self, path: Path) -> Optional[BarSeries]:
+        with self._lock:
+            if path not in self._loaded:
+                if not path.exists():
+                    return None
+                data = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2)
+                order = np.argsort(data[:, 0], kind="stable")
+                data = data[order]
+                self._loaded[path] = BarSeries(data[:, 0].astype(np.int64), *(data[:, k] for k in range(1, 6)))
+            return self._loaded[path]
+
+    def fetch_bars(self, symbol: str, resolution: str, start_ts: int, end_ts: int) -> BarSeries:
+        bars = self._load(self.path(symbol, resolution))
+        if bars is None:
+            return empty_series()
+        i = int(np.searchsorted(bars.t, start_ts, side="left"))
+        j = int(np.searchsorted(bars.t, end_ts, side="right"))
+        return bars[i:j]
+
+    def write(self, symbol: str, resolution: str, bars: BarSeries) -> Path:
+        path = self.path(symbol, resolution)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = np.column_stack([getattr(bars, k) for k in _COLUMNS])
+        np.savetxt(path, data, delimiter=",", header=",".join(_COLUMNS), comments="", fmt=["%d"] + ["%.6f"] * 5)
+        with self._lock:
+            self._loaded.pop(path, None)
+        return path
+
+
+def create_provider(
+    name: str, fixture_dir: Union[str, Path] = "fixtures/bars", mock_regime: str = "default"
+) -> MarketDataProvider:
+    """Provider by settings name: "mock" (in a synthetic.REGIMES regime) or "fixture"."""
+    if name == MockProvider.name:
+        return MockProvider(mock_regime)
+    if name == FileFixtureProvider.name:
+        return FileFixtureProvider(fixture_dir)
+    raise ValueError(f"Unknown market data provider: {name}")
@@ -0,0 +1,52 @@
+"""
+Bar resolutions as used by the TradingView datafeed ("1", "5", ..., "1D", "1W"),
+plus the aliases strategy configs use ("5min", "daily").
+"""
+
+DAY_SECONDS = 86400
+SESSION_OPEN = 14 * 3600 + 30 * 60  # regular session open, seconds after 00:00 UTC
+SESSION_SECONDS = 390 * 60
+
+RESOLUTION_SECONDS: dict[str, int] = {
+    "1": 60,
+    "5": 300,
+    "15": 900,
+    "30": 1800,
+    "60": 3600,
+    "1D": DAY_SECONDS,
+    "1W": 7 * DAY_SECONDS,
+}
+
+_ALIASES = {
+    "1min": "1",
+    "5min": "5",
+    "15min": "15",
+    "30min": "30",
+    "1h": "60",
+    "60min": "60",
+    "D": "1D",
+    "daily": "1D",
+    "W": "1W",
+    "weekly": "1W",
+}
+
+
+def normalize_resolution(resolution: str) -> str:
+    """Canonical resolution key; raises ValueError for unsupported values."""
+    key = _ALIASES.get(resolution, resolution)
+    if key not in RESOLUTION_SECONDS:
+        raise ValueError(f"Unsupported resolution: {resolution}")
+    return key
+
+
+def is_intraday(resolution: str) -> bool:
+    return RESOLUTION_SECONDS[normalize_resolution(resolution)] < DAY_SECONDS
+
+
+def resolution_seconds(resolution: str) -> int:
+    return RESOLUTION_SECONDS[normalize_resolution(resolution)]
+
+
+def session_bars(bar_seconds: int) -> int:
+    """Most bars of bar_seconds one regular session holds (1 on daily and longer bars)."""
+    return -(-SESSION_SECONDS // bar_seconds)
@@ -0,0 +1,171 @@
+"""
+Live bar fan-out: one upstream feed per symbol, any number of (symbol, resolution) subscribers.
+Each feed polls its provider for base-resolution bars from its last bar onward (the last bar
+may still be forming), keeps a rolling window, and marks subscribers dirty from the first bar
+that changed. Subscribers resample the window at their own resolution when they read, so a
+slow client gets one merged update instead of a queue of stale ones.
+"""
+import asyncio
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.market_data.cache import get_bar_cache
+from app.market_data.providers import MarketDataProvider, empty_series
+from app.market_data.resample import bucket_start, resample
+from app.market_data.resolution import DAY_SECONDS, normalize_resolution, resolution_seconds
+from app.strategies.bars import BarSeries
+
+_FIELDS = ("t", "o", "h", "l", "c", "v")
+
+
+def _merge(window: BarSeries, fresh: BarSeries) -> tuple[BarSeries, Optional[int]]:
+    """window with fresh bars replacing its tail from fresh.t[0]; also the first changed t (None if unchanged)."""
+    if not len(fresh):
+        return window, None
+    i = int(np.searchsorted(window.t, fresh.t[0]))
+    old = window[i:]
+    n = min(len(old), len(fresh))
+    same = np.ones(n, dtype=bool)
+    for k in _FIELDS:
+        same &= getattr(old, k)[:n] == getattr(fresh, k)[:n]
+    diff = np.flatnonzero(~same)
+    if len(diff):
+        changed = int(fresh.t[diff[0]])
+    elif len(fresh) > n:
+        changed = int(fresh.t[n])
+    else:
+        return window, None
+    return BarSeries.concat([window[:i], fresh]), changed
+
+
+class BarSubscription:
+    """Updates for one (symbol, resolution); read with get(), release with close()."""
+
+    def __init__(self, hub: "BarStreamHub", feed: "_Feed", resolution: str, since: int):
+        self._hub = hub
+        self._feed = feed
+        self.symbol = feed.symbol
+        self.resolution = resolution
+        self.since = since
+        self._pending: Optional[int] = None
+        self._event = asyncio.Event()
+        self.closed = False
+
+    def _mark(self, changed: int) -> None:
+        changed = max(changed, self.since)
+        self._pending = changed if self._pending is None else min(self._pending, changed)
+        self._event.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[BarSeries]:
+        """
+        Bars at this resolution from the first changed bucket onward (new bars and the
+        updated in-progress bar; may be empty). Returns None if nothing changed within timeout.
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        start = int(bucket_start(np.array([self._pending]), self.resolution)[0])
+        self._pending = None
+        window = self._feed.window
+        base = window[int(np.searchsorted(window.t, start)) :]
+        return base if self.resolution == self._hub.base_resolution else resample(base, self.resolution)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._hub._release(self)
+
+    async def __aenter__(self) -> "BarSubscription":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+
+class _Feed:
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.window: BarSeries = empty_series()
+        self.subscribers: set[BarSubscription] = set()
+        self.task: Optional[asyncio.Task] = None
+
+
+class BarStreamHub:
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        base_resolution: str = "1",
+        poll_seconds: float = 5.0,
+        window_seconds: int = 8 * DAY_SECONDS,
+    ):
+        self.provider = provider
+        self.base_resolution = normalize_resolution(base_resolution)
+        self.poll_seconds = poll_seconds
+        self.window_seconds = window_seconds  # covers a whole weekly bucket
+        self._feeds: dict[str, _Feed] = {}
+
+    def subscribe(self, symbol: str, resolution: str, since: Optional[int] = None) -> BarSubscription:
+        """
+        Subscribe to bars with t >= since (default: from now on). The symbol's feed starts with
+        its first subscriber and stops with its last. Must be called from the event loop.
+        """
+        symbol = symbol.upper().strip()
+        resolution = normalize_resolution(resolution)
+        if resolution_seconds(resolution) < resolution_seconds(self.base_resolution):
+            raise ValueError(f"Resolution {resolution} is finer than the streamed {self.base_resolution} bars")
+        feed = self._feeds.get(symbol)
+        if feed is None:
+            feed = self._feeds[symbol] = _Feed(symbol)
+            feed.task = asyncio.create_task(self._run(feed))
+        since = int(time.time()) if since is None else since
+        sub = BarSubscription(self, feed, resolution, since)
+        feed.subscribers.add(sub)
+        if len(feed.window) and feed.window.t[-1] >= since:
+            sub._mark(since)
+        return sub
+
+    def _release(self, sub: BarSubscription) -> None:
+        feed = self._feeds.get(sub.symbol)
+        if feed is None:
+            return
+        feed.subscribers.discard(sub)
+        if not feed.subscribers:
+            del self._feeds[sub.symbol]
+            feed.task.cancel()
+
+    async def _run(self, feed: _Feed) -> None:
+        while True:
+            now = int(time.time())
+            start = int(feed.window.t[-1]) if len(feed.window) else now - self.window_seconds
+            try:
+                fresh = await self.provider.get_bars(feed.symbol, self.base_resolution, start, now)
+            except Exception:
+                fresh = empty_series()  # transient upstream error: try again next poll
+            window, changed = _merge(feed.window, fresh)
+            if changed is not None:
+                cutoff = int(np.searchsorted(window.t, now - self.window_seconds))
+                feed.window = window[cutoff:]
+                for sub in list(feed.subscribers):
+                    sub._mark(changed)
+            await asyncio.sleep(self.poll_seconds)
+
+
+_hub: Optional[BarStreamHub] = None
+
+
+def get_bar_stream_hub() -> BarStreamHub:
+    """Process-wide hub polling the cache's upstream provider directly (live bars skip the cache)."""
+    global _hub
+    if _hub is None:
+        cache = get_bar_cache()
+        _hub = BarStreamHub(
+            provider=cache.upstream,
+            base_resolution=cache.base_resolution,
+            poll_seconds=get_settings().market_data_stream_poll_seconds,
+        )
+    return _hub
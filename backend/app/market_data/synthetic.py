@@ -0,0 +1,343 @@
+"""
+Synthetic market: a deterministic, offline stand-in for the market-data vendor (MockProvider),
+and realistic data at scale for load tests and benchmarks.
+Every bar is a pure function of (symbol, regime, resolution, timestamp). Random draws come from
+a counter-based hash of (symbol seed, stream, day, bar) instead of a stateful generator, so any
+two requests agree on the bars they share, a cached range never disagrees with a fresh fetch,
+and a whole range is generated in one vectorized pass (millions of 1-minute bars per second).
+Sessions are weekdays 14:30-21:00 UTC from EPOCH_DAY to HORIZON_DAY. A MarketRegime sets the
+drift, volatility clustering, gap-ups and parabolic run-ups that unwind over the following
+days, so short-side (Dux-style) multi-day setups have something to trigger on. Intraday bars
+open at the previous bar's close, so a rule needing a bar that gaps from it never fires here.
+Common symbols trade near realistic levels around ANCHOR_DAY.
+"""
+import zlib
+from dataclasses import astuple, dataclass
+from functools import lru_cache
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from app.market_data.resolution import (
+    DAY_SECONDS,
+    RESOLUTION_SECONDS,
+    SESSION_OPEN,
+    SESSION_SECONDS,
+    normalize_resolution,
+)
+from app.market_data.resample import resample
+from app.strategies.bars import BarSeries
+
+SYNTHETIC_VERSION = "2"  # bump when the bars generated for a range change
+EPOCH_DAY = 10957  # 2000-01-01; the daily path starts here
+ANCHOR_DAY = 20089  # 2025-01-01; the close on this day is the symbol's anchor price
+HORIZON_DAY = 29221  # 2050-01-01; no sessions from here on
+_DEFAULT_ANCHOR = 100.0
+
+
+@dataclass(frozen=True)
+class MarketRegime:
+    """How a synthetic market moves. Rates and sizes are per session; returns are log returns."""
+
+    drift: float = 0.0002
+    mean_reversion: float = 0.0  # daily pull of the log price back toward its anchor level
+    volatility: float = 0.015  # long-run daily volatility
+    vol_persistence: float = 0.95  # AR(1) coefficient of log volatility: volatility clustering
+    vol_of_vol: float = 0.2  # daily shock to log volatility
+    gap_prob: float = 0.03  # chance a session opens with a gap up...
+    gap_size: tuple[float, float] = (0.02, 0.08)  # ...of this size (fraction of the prior close)
+    parabolic_prob: float = 0.02  # chance a session starts a parabolic run-up...
+    parabolic_size: tuple[float, float] = (0.4, 0.9)  # ...gaining this much in total...
+    parabolic_days: int = 2  # ...over 1 to this many sessions, accelerating into each close...
+    unwind_days: int = 5  # ...then giving it all back over this many sessions
+    blowoff_prob: float = 0.5  # chance a run ends in a blow-off: a spike high into its last session
+    # that fades by the close, then a gap up the next morning that fails (the multi-day short setup)
+    volume: float = 2e6  # typical shares per session
+    volume_multiple: float = 6.0  # volume on gap and run-up sessions
+    volume_dispersion: float = 0.3  # log-normal spread of each intraday bar's volume
+
+    def key(self) -> str:
+        """Short stable id of these parameters (part of the mock provider's data version)."""
+        return f"{zlib.crc32(repr(astuple(self)).encode()):08x}"
+
+
+# Presets. "small_cap" runs hard, and with volume bursts, enough for the seeded multi-day
+# parabolic short to trade. The seeded intraday exhaustion short never does: its 3-ATR extension
+# on a bar with a 2x upper wick under the last 3 highs needs that bar to gap from the prior close
+REGIMES: dict[str, MarketRegime] = {
+    "default": MarketRegime(),
+    "calm": MarketRegime(volatility=0.008, vol_of_vol=0.1, gap_prob=0.01, parabolic_prob=0.002),
+    "volatile": MarketRegime(volatility=0.03, vol_persistence=0.97, vol_of_vol=0.3, gap_prob=0.05),
+    "small_cap": MarketRegime(
+        drift=0.0,
+        mean_reversion=0.01,
+        volatility=0.05,
+        gap_prob=0.08,
+        gap_size=(0.1, 0.5),
+        parabolic_prob=0.04,
+        parabolic_size=(0.8, 3.0),
+        parabolic_days=3,
+        unwind_days=7,
+        blowoff_prob=0.8,
+        volume=5e5,
+        volume_multiple=12.0,
+        volume_dispersion=0.5,
+    ),
+}
+
+
+def get_regime(regime: Union[str, MarketRegime, None] = None) -> MarketRegime:
+    """A MarketRegime, or a preset by name (None = "default"); raises ValueError for unknown names."""
+    if isinstance(regime, MarketRegime):
+        return regime
+    name = regime or "default"
+    if name not in REGIMES:
+        raise ValueError(f"Unknown market regime: {name}")
+    return REGIMES[name]
+
+
+# Realistic price levels for common symbols
+SYMBOL_ANCHORS: dict[str, float] = {
+    "AAPL": 228.0,
+    "MSFT": 420.0,
+    "GOOGL": 175.0,
+    "AMZN": 198.0,
+    "NVDA": 138.0,
+    "META": 525.0,
+    "TSLA": 350.0,
+    "SPY": 580.0,
+    "QQQ": 505.0,
+}
+
+
+def symbol_seed(symbol: str) -> int:
+    return zlib.crc32(symbol.upper().strip().encode())
+
+
+# --- counter-based random draws ---
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(x: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer, elementwise on uint64 (wrapping arithmetic)."""
+    x = x + _GOLDEN
+    x = (x ^ (x >> 30)) * _MIX1
+    x = (x ^ (x >> 27)) * _MIX2
+    return x ^ (x >> 31)
+
+
+def _hash(seed: int, stream: int, keys: np.ndarray) -> np.ndarray:
+    """Independent uint64 per key for one (seed, stream); stream < 2**16."""
+    salt = _mix(np.array([(seed << 16) | stream], dtype=np.uint64))
+    return _mix(np.asarray(keys, dtype=np.uint64) ^ salt)
+
+
+def _uniform(seed: int, stream: int, keys: np.ndarray) -> np.ndarray:
+    """Uniform [0, 1) per key."""
+    return (_hash(seed, stream, keys) >> 11) * 2.0**-53
+
+
+def _normal(seed: int, stream: int, keys: np.ndarray) -> np.ndarray:
+    """Standard normal per key (Box-Muller on the two 32-bit halves of one hash)."""
+    h = _hash(seed, stream, keys)
+    u1 = ((h >> 32) + 1) * 2.0**-32  # (0, 1]
+    u2 = (h & 0xFFFFFFFF) * 2.0**-32
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+def _ar1(e: np.ndarray, phi: float, block: int = 64) -> np.ndarray:
+    """
+    x[t] = phi * x[t - 1] + e[t] from x[-1] = 0 without a per-element loop: a closed form inside
+    fixed-size blocks, and the same recursion (with phi**block) over the block ends.
+    """
+    n = len(e)
+    nb = -(-n // block)
+    if nb == 0:
+        return np.zeros(0)
+    padded = np.zeros(nb * block)
+    padded[:n] = e
+    lag = np.arange(block)[:, None] - np.arange(block)[None, :]
+    weights = np.where(lag >= 0, phi ** np.maximum(lag, 0), 0.0)  # weights[j, k] = phi**(j - k), k <= j
+    x = padded.reshape(nb, block) @ weights.T
+    if nb > 1:
+        ends = _ar1(x[:, -1], phi**block, block)
+        x[1:] += np.outer(ends[:-1], phi ** np.arange(1, block + 1))
+    return x.ravel()[:n]
+
+
+# --- daily path ---
+
+_SESSIONS = np.arange(EPOCH_DAY, HORIZON_DAY, dtype=np.int64)
+_SESSIONS = _SESSIONS[(_SESSIONS + 3) % 7 < 5]  # weekdays; 1970-01-01 was a Thursday
+
+
+class _Path(NamedTuple):
+    """Per-session columns for every session to HORIZON_DAY (read-only, shared through the cache)."""
+
+    log_open: np.ndarray
+    log_close: np.ndarray
+    sigma: np.ndarray  # that session's volatility
+    volume: np.ndarray
+    run_day: np.ndarray  # session of a parabolic run-up
+    spike: np.ndarray  # blow-off: log height of the intraday high above the close
+    exhaustion: np.ndarray  # failed gap: log gap at the open that is gone by the close
+
+
+@lru_cache(maxsize=64)
+def _daily_path(seed: int, anchor: float, regime: MarketRegime) -> _Path:
+    """The symbol's daily path. It is always built whole, so it never depends on the requested range."""
+    n = len(_SESSIONS)
+    k = np.arange(n, dtype=np.uint64)
+    phi, vov = regime.vol_persistence, regime.vol_of_vol
+    log_vol = _ar1(vov * _normal(seed, 1, k), phi)
+    sigma = regime.volatility * np.exp(log_vol - vov**2 / (1 - phi**2) / 2)  # mean stays at volatility
+    r = regime.drift + sigma * _normal(seed, 2, k)
+
+    lo, hi = regime.gap_size
+    gap_day = _uniform(seed, 3, k) < regime.gap_prob
+    gap = np.where(gap_day, np.log1p(lo + (hi - lo) * _uniform(seed, 4, k)), 0.0)
+    kept = 1 - _uniform(seed, 5, k)  # share of the gap still there at the close
+
+    # Parabolic runs: +size/length per session for length sessions, then -size/unwind_days per session
+    lo, hi = regime.parabolic_size
+    starts = np.flatnonzero(_uniform(seed, 6, k) < regime.parabolic_prob)
+    size = np.log1p(lo + (hi - lo) * _uniform(seed, 7, k[starts]))
+    length = 1 + (_uniform(seed, 8, k[starts]) * max(regime.parabolic_days, 1)).astype(np.int64)
+    unwind = max(regime.unwind_days, 1)
+    run = np.zeros(n)
+    run_day = np.zeros(n, dtype=bool)
+    for off in range(max(regime.parabolic_days, 1) + regime.unwind_days):
+        idx = starts + off
+        up = (off < length) & (idx < n)
+        down = (off >= length) & (off < length + regime.unwind_days) & (idx < n)
+        np.add.at(run, idx[up], (size / length)[up])
+        np.add.at(run, idx[down], -(size / unwind)[down])
+        run_day[idx[up]] = True
+
+    ends = starts + length - 1
+    blowoff = (_uniform(seed, 12, k[starts]) < regime.blowoff_prob) & (ends + 1 < n)
+    spike = np.zeros(n)
+    exhaustion = np.zeros(n)
+    spike[ends[blowoff]] = size[blowoff] * (0.3 + 0.3 * _uniform(seed, 13, k[starts][blowoff]))
+    exhaustion[ends[blowoff] + 1] = spike[ends[blowoff]] * (0.3 + 0.4 * _uniform(seed, 14, k[starts][blowoff]))
+
+    log_close = _ar1(r + gap * kept, 1 - regime.mean_reversion) + np.cumsum(run)
+    log_close += np.log(anchor) - log_close[np.searchsorted(_SESSIONS, ANCHOR_DAY)]
+    log_open = np.empty(n)
+    log_open[0] = log_close[0]
+    log_open[1:] = log_close[:-1] + gap[1:] + exhaustion[1:] + 0.2 * sigma[1:] * _normal(seed, 9, k[1:])
+
+    active = run_day | gap_day | (exhaustion > 0)
+    volume = regime.volume * np.exp(0.35 * _normal(seed, 10, k)) * (sigma / regime.volatility)
+    volume = np.where(active, volume * regime.volume_multiple, volume)
+    path = _Path(log_open, log_close, sigma, volume, run_day, spike, exhaustion)
+    for a in path:
+        a.setflags(write=False)  # shared by every caller through the cache
+    return path
+
+
+def _session_index(start_ts: int, end_ts: int) -> np.ndarray:
+    """Indices into _SESSIONS of the sessions whose day lies in [start_ts, end_ts]."""
+    i = np.searchsorted(_SESSIONS, start_ts // DAY_SECONDS, side="left")
+    j = np.searchsorted(_SESSIONS, end_ts // DAY_SECONDS, side="right")
+    return np.arange(i, max(i, j))
+
+
+def _daily_bars(seed: int, anchor: float, regime: MarketRegime, idx: np.ndarray):
+    path = _daily_path(seed, anchor, regime)
+    o, c = np.exp(path.log_open[idx]), np.exp(path.log_close[idx])
+    wick = np.abs(_normal(seed, 11, idx)) * path.sigma[idx] * 0.4
+    h = np.maximum(o, c) * (1 + wick) * np.exp(path.spike[idx])
+    l = np.minimum(o, c) * (1 - wick)
+    return _SESSIONS[idx] * DAY_SECONDS, o, h, l, c, path.volume[idx]
+
+
+def _intraday_bars(seed: int, anchor: float, regime: MarketRegime, step: int, idx: np.ndarray):
+    """One (sessions x bars) matrix per column: a Brownian bridge from each open to its close."""
+    path = _daily_path(seed, anchor, regime)
+    m = SESSION_SECONDS // step
+    frac = np.arange(1, m + 1) / m
+    u = (2 * np.arange(m) / max(1, m - 1) - 1) ** 2  # 1 at the open and close, 0 mid-session
+    vol_shape = 1 + u
+    vol_shape /= np.sqrt((vol_shape**2).sum())  # bar variances add up to the session's
+    volume_shape = 1 + 2 * u  # U-shaped volume profile
+    volume_shape /= volume_shape.sum()
+
+    keys = (idx.astype(np.uint64)[:, None] << 12) | np.arange(m, dtype=np.uint64)
+    lo, lc = path.log_open[idx][:, None], path.log_close[idx][:, None]
+    sd = path.sigma[idx][:, None]
+    w = np.cumsum(_normal(seed, (step << 4) | 1, keys) * (vol_shape * sd), axis=1)
+    # Run-ups accelerate into the close; failed gaps sell off early; blow-offs spike late and fade
+    drift = np.where(path.run_day[idx][:, None], frac**4, frac)
+    drift = np.where(path.exhaustion[idx][:, None] > 0, np.sqrt(frac), drift)
+    bump = frac**6 * (1 - frac)
+    peak = int(np.argmax(bump))
+    bump /= bump[peak]
+    spike = path.spike[idx][:, None]
+    spike = np.where(spike > 0, spike + (lc - lo) * (1 - drift[:, peak : peak + 1]), 0.0)  # peak at close + spike
+    c = np.exp(lo + (lc - lo) * drift + spike * bump + (w - frac * w[:, -1:]))
+    o = np.empty_like(c)
+    o[:, 0] = np.exp(lo[:, 0])
+    o[:, 1:] = c[:, :-1]
+    wick = np.abs(_normal(seed, (step << 4) | 2, keys)) * (vol_shape * sd) / 2
+    h = np.maximum(o, c) * (1 + wick)
+    l = np.minimum(o, c) * (1 - wick)
+    v = path.volume[idx][:, None] * volume_shape * np.exp(regime.volume_dispersion * _normal(seed, (step << 4) | 3, keys))
+    t = _SESSIONS[idx][:, None] * DAY_SECONDS + SESSION_OPEN + np.arange(m, dtype=np.int64) * step
+    return tuple(x.ravel() for x in (t, o, h, l, c, v))
+
+
+def synthetic_bars(
+    symbol: str,
+    resolution: str,
+    start_ts: int,
+    end_ts: int,
+    regime: Union[str, MarketRegime, None] = None,
+) -> BarSeries:
+    """Bars with start_ts <= t <= end_ts; prices rounded to cents, volume to whole shares."""
+    resolution = normalize_resolution(resolution)
+    regime = get_regime(regime)
+    symbol = symbol.upper().strip()
+    seed = symbol_seed(symbol)
+    anchor = SYMBOL_ANCHORS.get(symbol, _DEFAULT_ANCHOR)
+    if resolution == "1W":
+        # Whole weeks, so a week's bar doesn't depend on where the range starts or ends
+        monday = (start_ts // DAY_SECONDS + 3) // 7 * 7 - 3
+        idx = _session_index(monday * DAY_SECONDS, end_ts + 6 * DAY_SECONDS)
+    else:
+        idx = _session_index(start_ts, end_ts)
+    if len(idx) == 0:
+        return BarSeries([], [], [], [], [], [])
+    if resolution == "1W":
+        w = resample(BarSeries(*_daily_bars(seed, anchor, regime, idx)), "1W")
+        t, o, h, l, c, v = w.t, w.o, w.h, w.l, w.c, w.v
+    elif resolution == "1D":
+        t, o, h, l, c, v = _daily_bars(seed, anchor, regime, idx)
+    else:
+        t, o, h, l, c, v = _intraday_bars(seed, anchor, regime, RESOLUTION_SECONDS[resolution], idx)
+    keep = (t >= start_ts) & (t <= end_ts)
+    o, h, l, c = (np.maximum(np.round(x[keep], 2), 0.01) for x in (o, h, l, c))
+    h = np.maximum(h, np.maximum(o, c))
+    l = np.minimum(l, np.minimum(o, c))
+    return BarSeries(t[keep], o, h, l, c, np.round(v[keep]))
+
+
+def synthetic_universe(
+    symbols: list[str],
+    resolution: str,
+    start_ts: int,
+    end_ts: int,
+    regime: Union[str, MarketRegime, None] = None,
+) -> dict[str, BarSeries]:
+    """synthetic_bars for many symbols (load tests, benchmarks, scanners)."""
+    return {s.upper().strip(): synthetic_bars(s, resolution, start_ts, end_ts, regime) for s in symbols}
+
+
+def synthetic_symbols(n: int, prefix: Optional[str] = None) -> list[str]:
+    """n distinct made-up tickers (SYN0000, SYN0001, ...) for universe-scale tests."""
+    prefix = prefix or "SYN"
+    width = max(4, len(str(n - 1)))
+    return [f"{prefix}{i:0{width}d}" for i in range(n)]
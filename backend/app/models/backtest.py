@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, ForeignKey, Float, Integer, Text
+from sqlalchemy import String, DateTime, ForeignKey, Float, Integer, Text, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -8,6 +8,7 @@ from app.database import Base
 
 class StrategyBacktestRun(Base):
     __tablename__ = "strategy_backtest_runs"
+    __table_args__ = (UniqueConstraint("strategy_id", "result_key", name="uq_strategy_backtest_runs_result_key"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     strategy_id: Mapped[int] = mapped_column(ForeignKey("strategies.id", ondelete="CASCADE"), nullable=False)
@@ -21,4 +22,5 @@ class StrategyBacktestRun(Base):
     max_drawdown: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     num_trades: Mapped[int] = mapped_column(Integer, default=0)
     params_snapshot: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON
+    result_key: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)  # services.backtest_cache key
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
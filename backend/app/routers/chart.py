@@ -1,55 +1,223 @@
 """
 Chart/bars API for TradingView datafeed.
-Returns OHLC bars for a symbol and timeframe (mock data for now).
+Returns OHLC bars for a symbol and timeframe from the OHLCV cache (local fixture data for now).
+/bars responses are encoded straight from the bar columns (JSON via orjson, or binary with
+format=binary), compressed with br/gzip, cached by content, and revalidated with ETag / 304.
+/bars?since= returns only the tail a client is missing; /stream pushes new and updated bars.
+Any range can be requested: /bars pages backwards TradingView-style (countback, and
+no_data with nextTime pointing at earlier history), at most _PAGE_BARS bars per response.
 """
-from datetime import datetime, timedelta
+import asyncio
+import gzip
+import time
+from collections import OrderedDict
 from typing import Optional
-from fastapi import APIRouter, Query
+
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.market_data.cache import get_bar_cache
+from app.market_data.encoding import BINARY_MEDIA_TYPE, bar_columns, bars_digest, encode_binary, encode_udf_json
+from app.market_data.resolution import DAY_SECONDS, normalize_resolution, resolution_seconds
+from app.market_data.stream import get_bar_stream_hub
+from app.strategies.bars import BarSeries
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses fall back to gzip
+    brotli = None
 
 router = APIRouter()
 
+_PAGE_BARS = 20_000  # longer ranges return their newest bars; clients page back from the first t
+_MAX_LOOKBACK_SECONDS = 2 * 365 * DAY_SECONDS  # how far back countback / nextTime look for earlier bars
+_MIN_COMPRESS_BYTES = 1024
+_BODY_CACHE_SIZE = 256
+_KEEPALIVE_SECONDS = 15.0
+# (etag, accepted encoding) -> (body, applied encoding); re-requests of a window skip encoding entirely
+_bodies: OrderedDict[tuple[str, str], tuple[bytes, str]] = OrderedDict()
+
+
+def _pick_encoding(accept_encoding: str) -> str:
+    offered = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        offered.add(name.strip().lower())
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return "identity"
+
+
+def _encode(bars: BarSeries, fmt: str, encoding: str, meta: dict) -> tuple[bytes, str]:
+    body = encode_binary(bars, meta) if fmt == "binary" else encode_udf_json(bars, meta)
+    if len(body) < _MIN_COMPRESS_BYTES or encoding == "identity":
+        return body, "identity"
+    if encoding == "br":
+        return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or etag.removeprefix("W/") in tags
+
+
+async def _bars_before(symbol: str, resolution: str, to_ts: int, count: int, span: int) -> BarSeries:
+    """
+    Up to the last count bars at or before to_ts. Reads the span seconds before to_ts, then walks
+    further back window by window, doubling a window while it comes up short but never past
+    _PAGE_BARS bars' worth of time, so a call reads O(count + _PAGE_BARS) bars however far back
+    (at most _MAX_LOOKBACK_SECONDS) the earlier bars are.
+    """
+    cache = get_bar_cache()
+    max_span = _PAGE_BARS * resolution_seconds(resolution)
+    span = min(span, max_span)
+    parts: list[BarSeries] = []
+    found = 0
+    hi = to_ts
+    while True:
+        bars = await cache.get_bars(symbol, resolution, hi - span, hi)
+        if len(bars):
+            parts.append(bars[-(count - found):])
+            found += len(parts[-1])
+        hi -= span + 1
+        if found >= count or to_ts - hi >= _MAX_LOOKBACK_SECONDS:
+            return BarSeries.concat(parts[::-1]) if parts else bars
+        span = min(span * 2, max_span)
 
-def _mock_bars(symbol: str, from_ts: int, to_ts: int, resolution: str) -> list[dict]:
-    """Generate mock OHLC bars. Replace with real market data source."""
-    # resolution: 1, 5, 15, 30, 60, 1D, 1W
-    delta = timedelta(hours=1) if resolution in ("1", "5", "15", "30", "60") else timedelta(days=1)
-    t = datetime.utcfromtimestamp(from_ts)
-    end = datetime.utcfromtimestamp(to_ts)
-    bars = []
-    base = 100.0
-    while t <= end and len(bars) < 300:
-        import random
-        o = base
-        base = o * (1 + (random.random() - 0.5) * 0.02)
-        h = max(o, base)
-        l = min(o, base)
-        c = base
-        v = int(random.random() * 1e6)
-        bars.append({"t": int(t.timestamp()), "o": round(o, 2), "h": round(h, 2), "l": round(l, 2), "c": round(c, 2), "v": v})
-        t += delta
-    return bars
+
+async def _bars_response(request: Request, bars: BarSeries, fmt: str, next_time: Optional[int] = None) -> Response:
+    meta = {"s": "ok"} if len(bars) else {"s": "no_data"}
+    if next_time is not None:
+        meta["nextTime"] = next_time
+    # Weak ETag: identifies the bars in this format, whichever content-encoding carries them
+    etag = f'W/"{bars_digest(bars)}-{fmt}{"" if next_time is None else f"-{next_time}"}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept, Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    key = (etag, _pick_encoding(request.headers.get("accept-encoding", "")))
+    cached = _bodies.get(key)
+    if cached is None:
+        cached = await asyncio.to_thread(_encode, bars, fmt, key[1], meta)
+        _bodies[key] = cached
+        while len(_bodies) > _BODY_CACHE_SIZE:
+            _bodies.popitem(last=False)
+    else:
+        _bodies.move_to_end(key)
+    body, encoding = cached
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    media_type = BINARY_MEDIA_TYPE if fmt == "binary" else "application/json"
+    return Response(content=body, media_type=media_type, headers=headers)
 
 
 @router.get("/bars")
 async def get_bars(
+    request: Request,
     symbol: str = Query(..., description="Symbol e.g. AAPL"),
     from_ts: int = Query(..., description="Unix timestamp from"),
     to_ts: int = Query(..., description="Unix timestamp to"),
     resolution: str = Query("1D", description="1, 5, 15, 30, 60, 1D, 1W"),
+    format: Optional[str] = Query(None, pattern="^(json|binary)$", description="json (default) or binary"),
+    since: Optional[int] = Query(None, description="Time of the client's last bar; only bars from it onward"),
+    countback: Optional[int] = Query(None, ge=1, description="Exactly this many bars ending at to_ts"),
 ):
-    """Return OHLC bars for TradingView datafeed. s: ok, t: times, o, h, l, c, v."""
-    bars = _mock_bars(symbol, from_ts, to_ts, resolution)
-    if not bars:
-        return {"s": "ok", "t": [], "o": [], "h": [], "l": [], "c": [], "v": []}
-    return {
-        "s": "ok",
-        "t": [b["t"] for b in bars],
-        "o": [b["o"] for b in bars],
-        "h": [b["h"] for b in bars],
-        "l": [b["l"] for b in bars],
-        "c": [b["c"] for b in bars],
-        "v": [b["v"] for b in bars],
-    }
+    """
+    Return OHLC bars for TradingView datafeed. s: ok, t: times, o, h, l, c, v.
+    format=binary (or Accept: application/vnd.tradsy.bars) returns the columnar binary encoding.
+    since=<t> limits the window to t onward: the client's last bar (which may have been
+    updated while forming) plus any newer ones.
+    countback=<n> returns the last n bars at or before to_ts, reaching before from_ts if needed.
+    A range (or countback) longer than one page returns its newest page: at most _PAGE_BARS bars,
+    from the last _PAGE_BARS bar intervals before to_ts. The page then carries nextTime, the
+    to_ts to request the rest with. An empty range is s: no_data, with nextTime set to the time
+    of the closest earlier bar when there is one.
+    """
+    try:
+        resolution = normalize_resolution(resolution)
+        # A page never reads more than _PAGE_BARS bars' worth of time (the newest part of the range)
+        page_from = to_ts - _PAGE_BARS * resolution_seconds(resolution) + 1
+        if since is not None:
+            bars = await get_bar_cache().get_bars(symbol, resolution, max(from_ts, since, page_from), to_ts)
+        elif countback is not None:
+            count = min(countback, _PAGE_BARS)
+            span = max(to_ts - from_ts, count * resolution_seconds(resolution))
+            bars = await _bars_before(symbol, resolution, to_ts, count, span)
+        else:
+            bars = await get_bar_cache().get_bars(symbol, resolution, max(from_ts, page_from), to_ts)
+        next_time = None
+        if countback is not None:
+            if countback > count and len(bars) == count:
+                next_time = int(bars.t[0]) - 1
+        elif max(from_ts, since if since is not None else from_ts) < page_from:
+            next_time = page_from - 1  # the range reaches before this page
+        if not len(bars) and since is None and countback is None:
+            # TradingView jumps straight to the next bar back instead of paging through the gap
+            step = resolution_seconds(resolution)
+            first = min(max(from_ts, page_from), to_ts)
+            earlier = await _bars_before(symbol, resolution, first - 1, 1, 64 * step)
+            next_time = int(earlier.t[-1]) if len(earlier) else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if format is None:
+        format = "binary" if BINARY_MEDIA_TYPE in request.headers.get("accept", "") else "json"
+    return await _bars_response(request, bars, format, next_time)
+
+
+@router.get("/stream")
+async def stream_bars(
+    symbol: str = Query(..., description="Symbol e.g. AAPL"),
+    resolution: str = Query("1", description="1, 5, 15, 30, 60, 1D, 1W"),
+    since: Optional[int] = Query(None, description="Replay bars from this time first (default: live only)"),
+):
+    """
+    SSE feed of new and updated bars for one (symbol, resolution). Events:
+    bars ({"type": "bars", "symbol", "resolution", t, o, h, l, c, v}); each event replaces
+    any bar the client has with the same t. All subscribers of a symbol share one upstream feed.
+    """
+    try:
+        resolution = normalize_resolution(resolution)
+        sub = get_bar_stream_hub().subscribe(symbol, resolution, since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    symbol = sub.symbol
+
+    def event(bars: BarSeries) -> bytes:
+        payload = {"type": "bars", "symbol": symbol, "resolution": resolution, **bar_columns(bars)}
+        return b"data: " + orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
+
+    async def event_stream():
+        async with sub:
+            if since is not None:
+                # Catch up from the cache, then let the live feed take over from the last bar sent
+                history = await get_bar_cache().get_bars(symbol, resolution, since, int(time.time()))
+                if len(history):
+                    yield event(history)
+                    sub.since = int(history.t[-1])
+            while True:
+                bars = await sub.get(timeout=_KEEPALIVE_SECONDS)
+                if bars is None:
+                    yield b": keepalive\n\n"
+                elif len(bars):
+                    yield event(bars)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 @router.get("/symbol")
@@ -178,7 +178,7 @@ async def deep_analysis(
     """Deep Analysis: inject real market context and request a professional, clean response."""
     from app.services.market_context import get_market_context
 
-    market_context = get_market_context(body.symbol, body.timeframe or "1D")
+    market_context = await get_market_context(body.symbol, body.timeframe or "1D")
     llm = SymbolChatLLM(symbol=body.symbol, market_type="stock")
     prompt = f"""Use the following market data to write a short, professional deep analysis for {body.symbol} ({body.timeframe or '1D'}).
 
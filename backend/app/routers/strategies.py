@@ -1,19 +1,55 @@
+import json
 from typing import Optional
 from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timedelta
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.strategy import Strategy, Guru
 from app.models.backtest import StrategyBacktestRun
 from app.schemas.guru import StrategyResponse
-from app.schemas.backtest import BacktestRunResponse, BacktestRequest
+from app.schemas.backtest import (
+    BacktestRunResponse,
+    BacktestRequest,
+    BacktestBatchRequest,
+    BacktestEquityPage,
+    BacktestTradesPage,
+    MonteCarloRequest,
+    MonteCarloResponse,
+    ScanRequest,
+    SweepRequest,
+    SweepResponse,
+    WalkForwardRequest,
+    WalkForwardResponse,
+)
 from app.dependencies import get_current_user_optional
-from app.services.backtest import run_backtest
+from app.services.backtest import (
+    backtest_result_key,
+    default_range,
+    read_backtest_equity,
+    read_backtest_trades,
+    run_backtest,
+    run_backtest_batch,
+    run_backtest_monte_carlo,
+    run_backtest_sweep,
+    run_backtest_walk_forward,
+    saved_results,
+    saved_unchecked_filters,
+)
+from app.services.backtest_executor import BacktestQueueFull, get_backtest_executor
+from app.services.scanner import get_scanner_hub
+from app.strategies.plan import UnsupportedRuleError, get_plan_cache
 
 router = APIRouter()
 
+_BUSY_DETAIL = "Backtest queue is full. Try again shortly."
+_BUSY_HEADERS = {"Retry-After": "5"}
+_SCAN_KEEPALIVE_SECONDS = 15.0
+
 
 @router.get("", response_model=list[StrategyResponse])
 async def list_strategies(
@@ -59,16 +95,33 @@ async def trigger_backtest(
     strategy = result.scalar_one_or_none()
     if not strategy:
         raise HTTPException(status_code=404, detail="Strategy not found")
-    end_time = datetime.utcnow()
-    start_time = end_time - timedelta(days=365)
-    metrics = await run_backtest(
-        strategy_id=strategy_id,
-        symbol=body.symbol,
-        timeframe=body.timeframe,
-        start_date=start_time,
-        end_date=end_time,
-        config_json=strategy.code_or_config,
-    )
+    start_time, end_time = default_range()
+    plan = None
+    if strategy.code_or_config:
+        # An identical run (same config, symbol, range and data) is already stored: return it
+        try:
+            plan = get_plan_cache().get(strategy.id, strategy.updated_at, strategy.code_or_config)
+            key = backtest_result_key(plan, body.symbol, body.timeframe, start_time, end_time)
+        except UnsupportedRuleError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        except Exception:
+            key = None
+        existing = await _run_by_key(db, strategy_id, key) if key else None
+        if existing:
+            return _run_response(existing)
+    try:
+        metrics = await run_backtest(
+            strategy_id=strategy_id,
+            symbol=body.symbol,
+            timeframe=body.timeframe,
+            start_date=start_time,
+            end_date=end_time,
+            config_json=strategy.code_or_config,
+            plan=plan,
+        )
+    except BacktestQueueFull:
+        raise HTTPException(status_code=503, detail=_BUSY_DETAIL, headers=_BUSY_HEADERS)
+    results = metrics.get("results")
     run = StrategyBacktestRun(
         strategy_id=strategy_id,
         symbol=metrics["symbol"],
@@ -80,11 +133,295 @@ async def trigger_backtest(
         win_rate=metrics.get("win_rate"),
         max_drawdown=metrics.get("max_drawdown"),
         num_trades=metrics.get("num_trades", 0),
+        params_snapshot=_params_snapshot(results=results, unchecked_filters=metrics.get("unchecked_filters")),
+        result_key=metrics.get("result_key"),
     )
     db.add(run)
-    await db.commit()
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent identical request stored the same run first
+        await db.rollback()
+        existing = await _run_by_key(db, strategy_id, run.result_key)
+        if existing is None:
+            raise
+        return _run_response(existing)
     await db.refresh(run)
-    return BacktestRunResponse.model_validate(run)
+    return _run_response(run)
+
+
+def _params_snapshot(**values) -> Optional[str]:
+    """params_snapshot JSON of a run: the given values that are set."""
+    values = {k: v for k, v in values.items() if v}
+    return json.dumps(values) if values else None
+
+
+def _run_response(run: StrategyBacktestRun) -> BacktestRunResponse:
+    response = BacktestRunResponse.model_validate(run)
+    response.unchecked_filters = saved_unchecked_filters(run.params_snapshot)
+    return response
+
+
+async def _run_by_key(db: AsyncSession, strategy_id: int, key: str) -> Optional[StrategyBacktestRun]:
+    result = await db.execute(
+        select(StrategyBacktestRun).where(
+            StrategyBacktestRun.strategy_id == strategy_id, StrategyBacktestRun.result_key == key
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+@router.post("/{strategy_id}/backtest/monte-carlo", response_model=MonteCarloResponse)
+async def trigger_monte_carlo(
+    strategy_id: int,
+    body: MonteCarloRequest,
+    db: AsyncSession = Depends(get_db),
+    _=Depends(get_current_user_optional),
+):
+    """
+    Resample the trades of the strategy's backtest (the stored run when there is one) num_simulations
+    times; returns percentiles of the simulated pnl % and max drawdown %.
+    """
+    result = await db.execute(select(Strategy).where(Strategy.id == strategy_id))
+    strategy = result.scalar_one_or_none()
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    if not strategy.code_or_config:
+        raise HTTPException(status_code=400, detail="Strategy has no config to backtest")
+    start_time, end_time = default_range()
+    try:
+        plan = get_plan_cache().get(strategy.id, strategy.updated_at, strategy.code_or_config)
+        existing = await _run_by_key(
+            db, strategy_id, backtest_result_key(plan, body.symbol, body.timeframe, start_time, end_time)
+        )
+        report = await run_backtest_monte_carlo(
+            strategy_id,
+            symbol=body.symbol,
+            timeframe=body.timeframe,
+            start_date=start_time,
+            end_date=end_time,
+            plan=plan,
+            results=saved_results(existing.params_snapshot) if existing else None,
+            num_simulations=body.num_simulations,
+            method=body.method,
+            seed=body.seed,
+            percentiles=body.percentiles,
+            shards=body.shards,
+        )
+    except UnsupportedRuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except BacktestQueueFull:
+        raise HTTPException(status_code=503, detail=_BUSY_DETAIL, headers=_BUSY_HEADERS)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Backtest trade log is no longer available")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return MonteCarloResponse(**report)
+
+
+@router.post("/{strategy_id}/backtest/batch")
+async def trigger_backtest_batch(
+    strategy_id: int,
+    body: BacktestBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    _=Depends(get_current_user_optional),
+):
+    """
+    Backtest one strategy across a universe of symbols.
+    Streams SSE events as runs finish: result (per symbol, status ok|error), then done.
+    Batch results are not persisted as StrategyBacktestRun rows.
+    """
+    result = await db.execute(select(Strategy).where(Strategy.id == strategy_id))
+    strategy = result.scalar_one_or_none()
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    max_symbols = get_settings().backtest_batch_max_symbols
+    if len(body.symbols) > max_symbols:
+        raise HTTPException(status_code=400, detail=f"At most {max_symbols} symbols per batch")
+    if get_backtest_executor().saturated:
+        raise HTTPException(status_code=503, detail=_BUSY_DETAIL, headers=_BUSY_HEADERS)
+    start_time, end_time = default_range()
+    config_json = strategy.code_or_config
+    try:
+        plan = get_plan_cache().get(strategy.id, strategy.updated_at, config_json) if config_json else None
+    except UnsupportedRuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception:
+        plan = None  # run_backtest_batch reports the invalid config in the stream
+
+    async def event_stream():
+        count = 0
+        try:
+            async for item in run_backtest_batch(
+                strategy_id=strategy_id,
+                symbols=body.symbols,
+                timeframe=body.timeframe,
+                start_date=start_time,
+                end_date=end_time,
+                config_json=config_json,
+                max_concurrency=body.max_concurrency,
+                plan=plan,
+            ):
+                count += 1
+                yield "data: " + json.dumps({"type": "result", **jsonable_encoder(item)}) + "\n\n"
+        except Exception as e:
+            yield "data: " + json.dumps({"type": "error", "text": str(e)}) + "\n\n"
+            return
+        yield "data: " + json.dumps({"type": "done", "count": count}) + "\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.post("/{strategy_id}/scan")
+async def scan_universe(
+    strategy_id: int,
+    body: ScanRequest,
+    db: AsyncSession = Depends(get_db),
+    _=Depends(get_current_user_optional),
+):
+    """
+    Live scan of the strategy's entry rules across a universe of symbols (default: the configured
+    scanner_universe). Streams SSE events as bars close: matches ({"type": "matches", "t",
+    "scanned", "symbols"}, plus "unchecked_filters" when a symbol filter such as float_size_max had
+    no data for some symbols), the symbols whose bar at t passed every entry rule. Clients scanning
+    the same strategy version and universe share one scan.
+    """
+    result = await db.execute(select(Strategy).where(Strategy.id == strategy_id))
+    strategy = result.scalar_one_or_none()
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    if not strategy.code_or_config:
+        raise HTTPException(status_code=400, detail="Strategy has no config to scan")
+    settings = get_settings()
+    symbols = body.symbols or [s for s in settings.scanner_universe.split(",") if s.strip()]
+    if not symbols:
+        raise HTTPException(status_code=400, detail="No symbols to scan")
+    if len(symbols) > settings.scanner_max_symbols:
+        raise HTTPException(status_code=400, detail=f"At most {settings.scanner_max_symbols} symbols per scan")
+    try:
+        plan = get_plan_cache().get(strategy.id, strategy.updated_at, strategy.code_or_config)
+        sub = get_scanner_hub().subscribe((strategy.id, strategy.updated_at), plan, symbols)
+    except UnsupportedRuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def event_stream():
+        async with sub:
+            while True:
+                scan = await sub.get(timeout=_SCAN_KEEPALIVE_SECONDS)
+                if scan is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield "data: " + json.dumps({"type": "matches", **scan.as_dict()}) + "\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.post("/{strategy_id}/sweep", response_model=SweepResponse)
+async def trigger_sweep(
+    strategy_id: int,
+    body: SweepRequest,
+    db: AsyncSession = Depends(get_db),
+    _=Depends(get_current_user_optional),
+):
+    """Grid-search strategy parameters on one symbol; returns the top_n combinations ranked by rank_by."""
+    result = await db.execute(select(Strategy).where(Strategy.id == strategy_id))
+    strategy = result.scalar_one_or_none()
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    if not strategy.code_or_config:
+        raise HTTPException(status_code=400, detail="Strategy has no config to sweep")
+    if get_backtest_executor().saturated:
+        raise HTTPException(status_code=503, detail=_BUSY_DETAIL, headers=_BUSY_HEADERS)
+    start_time, end_time = default_range()
+    try:
+        rows = await run_backtest_sweep(
+            strategy.code_or_config,
+            body.parameters,
+            symbol=body.symbol,
+            start_date=start_time,
+            end_date=end_time,
+            rank_by=body.rank_by,
+            top_n=body.top_n,
+        )
+    except UnsupportedRuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    num_combinations = 1
+    for values in body.parameters.values():
+        num_combinations *= len(values)
+    return SweepResponse(
+        strategy_id=strategy_id,
+        symbol=body.symbol,
+        timeframe=body.timeframe,
+        start_time=start_time,
+        end_time=end_time,
+        num_combinations=num_combinations,
+        results=rows,
+    )
+
+
+@router.post("/{strategy_id}/walk-forward", response_model=WalkForwardResponse)
+async def trigger_walk_forward(
+    strategy_id: int,
+    body: WalkForwardRequest,
+    db: AsyncSession = Depends(get_db),
+    _=Depends(get_current_user_optional),
+):
+    """Rolling (or anchored) train/test backtest on one symbol with aggregated out-of-sample metrics."""
+    result = await db.execute(select(Strategy).where(Strategy.id == strategy_id))
+    strategy = result.scalar_one_or_none()
+    if not strategy:
+        raise HTTPException(status_code=404, detail="Strategy not found")
+    if not strategy.code_or_config:
+        raise HTTPException(status_code=400, detail="Strategy has no config to backtest")
+    start_time, end_time = default_range()
+    try:
+        report = await run_backtest_walk_forward(
+            strategy.code_or_config,
+            symbol=body.symbol,
+            start_date=start_time,
+            end_date=end_time,
+            n_splits=body.n_splits,
+            train_bars=body.train_bars,
+            test_bars=body.test_bars,
+            anchored=body.anchored,
+            param_grid=body.parameters,
+            rank_by=body.rank_by,
+        )
+    except BacktestQueueFull:
+        raise HTTPException(status_code=503, detail=_BUSY_DETAIL, headers=_BUSY_HEADERS)
+    except UnsupportedRuleError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return WalkForwardResponse(
+        strategy_id=strategy_id,
+        symbol=body.symbol,
+        timeframe=body.timeframe,
+        start_time=start_time,
+        end_time=end_time,
+        anchored=body.anchored,
+        **report,
+    )
 
 
 @router.get("/{strategy_id}/backtests", response_model=list[BacktestRunResponse])
@@ -101,4 +438,56 @@ async def list_backtests(
         .limit(limit)
     )
     runs = result.scalars().all()
-    return [BacktestRunResponse.model_validate(r) for r in runs]
+    return [_run_response(r) for r in runs]
+
+
+async def _saved_run(db: AsyncSession, strategy_id: int, run_id: int) -> dict:
+    result = await db.execute(
+        select(StrategyBacktestRun).where(
+            StrategyBacktestRun.id == run_id, StrategyBacktestRun.strategy_id == strategy_id
+        )
+    )
+    run = result.scalar_one_or_none()
+    if not run:
+        raise HTTPException(status_code=404, detail="Backtest run not found")
+    results = saved_results(run.params_snapshot)
+    if not results:
+        raise HTTPException(status_code=404, detail="Backtest run has no saved trade log")
+    return results
+
+
+@router.get("/{strategy_id}/backtests/{run_id}/trades", response_model=BacktestTradesPage)
+async def backtest_trades(
+    strategy_id: int,
+    run_id: int,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    _=Depends(get_current_user_optional),
+):
+    """One page of a saved run's trade log, read from its columnar file."""
+    results = await _saved_run(db, strategy_id, run_id)
+    try:
+        page = read_backtest_trades(results, offset, limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Backtest trade log is no longer available")
+    return BacktestTradesPage(run_id=run_id, **page)
+
+
+@router.get("/{strategy_id}/backtests/{run_id}/equity", response_model=BacktestEquityPage)
+async def backtest_equity(
+    strategy_id: int,
+    run_id: int,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    max_points: int = Query(2000, ge=2, le=20000),
+    db: AsyncSession = Depends(get_db),
+    _=Depends(get_current_user_optional),
+):
+    """A saved run's bar-level equity curve from offset, thinned to at most max_points points."""
+    results = await _saved_run(db, strategy_id, run_id)
+    try:
+        page = read_backtest_equity(results, offset, limit, max_points)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Backtest equity curve is no longer available")
+    return BacktestEquityPage(run_id=run_id, **page)
@@ -1,6 +1,6 @@
-from typing import Optional
+from typing import Any, Optional
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class BacktestRunResponse(BaseModel):
@@ -15,6 +15,7 @@ class BacktestRunResponse(BaseModel):
     win_rate: Optional[float]
     max_drawdown: Optional[float]
     num_trades: int
+    unchecked_filters: list[str] = []  # symbol filters the bars can't check (e.g. float_size_max)
     created_at: datetime
 
     class Config:
@@ -24,3 +25,146 @@ class BacktestRunResponse(BaseModel):
 class BacktestRequest(BaseModel):
     symbol: str = "AAPL"
     timeframe: str = "1D"
+
+
+class BacktestBatchRequest(BaseModel):
+    symbols: list[str] = Field(..., min_length=1)
+    timeframe: str = "1D"
+    max_concurrency: Optional[int] = Field(None, ge=1, le=64)
+
+
+class ScanRequest(BaseModel):
+    symbols: list[str] = Field(default_factory=list)  # empty: the configured scanner_universe
+
+
+class MonteCarloRequest(BaseModel):
+    symbol: str = "AAPL"
+    timeframe: str = "1D"
+    num_simulations: int = Field(10_000, ge=100, le=100_000)
+    method: str = "bootstrap"  # "bootstrap" (trades drawn with replacement) or "permutation" (trade order shuffled)
+    seed: Optional[int] = Field(None, ge=0)
+    percentiles: list[float] = Field([5.0, 25.0, 50.0, 75.0, 95.0], min_length=1, max_length=20)
+    shards: Optional[int] = Field(None, ge=1, le=64)  # executor jobs the simulations are split into
+
+
+class MonteCarloObserved(BaseModel):
+    pnl_pct: float
+    max_drawdown: float
+
+
+class MonteCarloResponse(BaseModel):
+    strategy_id: int
+    symbol: str
+    timeframe: str
+    start_time: datetime
+    end_time: datetime
+    method: str
+    seed: int
+    num_simulations: int
+    num_trades: int
+    observed: MonteCarloObserved
+    pnl_pct: dict[str, float]  # percentile ("5", "50", ...) -> simulated pnl %
+    max_drawdown: dict[str, float]  # percentile -> simulated max drawdown %
+    prob_loss: float  # % of simulations ending below the starting equity
+    prob_deeper_drawdown: float  # % of simulations drawing down deeper than the backtest did
+
+
+class SweepRequest(BaseModel):
+    symbol: str = "AAPL"
+    timeframe: str = "1D"
+    # e.g. {"min_threshold_pct": [50, 70, 90], "risk_management.max_adverse_excursion_pct": [10, 15]}
+    parameters: dict[str, list[Any]] = Field(..., min_length=1)
+    rank_by: str = "pnl"
+    top_n: int = Field(20, ge=1, le=1000)
+
+
+class SweepResultRow(BaseModel):
+    rank: int
+    params: dict[str, Any]
+    pnl: float
+    pnl_pct: float
+    win_rate: float
+    max_drawdown: float
+    num_trades: int
+
+
+class SweepResponse(BaseModel):
+    strategy_id: int
+    symbol: str
+    timeframe: str
+    start_time: datetime
+    end_time: datetime
+    num_combinations: int
+    results: list[SweepResultRow]
+
+
+class WalkForwardRequest(BaseModel):
+    symbol: str = "AAPL"
+    timeframe: str = "1D"
+    n_splits: int = Field(5, ge=1, le=50)
+    train_bars: Optional[int] = Field(None, ge=1)
+    test_bars: Optional[int] = Field(None, ge=1)
+    anchored: bool = False
+    # Optional grid: each fold picks the best combination on its train window
+    parameters: Optional[dict[str, list[Any]]] = None
+    rank_by: str = "pnl"
+
+
+class WalkForwardMetrics(BaseModel):
+    pnl: float
+    pnl_pct: float
+    win_rate: float
+    max_drawdown: float
+    num_trades: int
+
+
+class WalkForwardFold(BaseModel):
+    fold: int
+    params: dict[str, Any]
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+    train: WalkForwardMetrics
+    test: WalkForwardMetrics
+
+
+class WalkForwardResponse(BaseModel):
+    strategy_id: int
+    symbol: str
+    timeframe: str
+    start_time: datetime
+    end_time: datetime
+    anchored: bool
+    folds: list[WalkForwardFold]
+    out_of_sample: WalkForwardMetrics
+    fold_pnl_pct: dict[str, float]
+
+
+class BacktestTrade(BaseModel):
+    entry_index: int
+    exit_index: int
+    entry_t: int
+    exit_t: int
+    entry_price: float
+    exit_price: float
+    shares: float
+    pnl: float
+    pnl_pct: float
+    reason: str
+    partial: bool  # part of the position was covered at the partial_cover_pct target
+
+
+class BacktestTradesPage(BaseModel):
+    run_id: int
+    total: int
+    offset: int
+    trades: list[BacktestTrade]
+
+
+class BacktestEquityPage(BaseModel):
+    run_id: int
+    total: int
+    offset: int
+    t: list[int]
+    equity: list[float]
@@ -1,11 +1,139 @@
 """
 Backtest runner: runs strategy logic over historical range and returns metrics.
 Uses config-driven rule engine when strategy has code_or_config (JSON).
+Runs execute in the backtest process pool so CPU-bound work stays off the event loop.
 """
+import asyncio
+import json
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import AsyncIterator, Optional
 
-from app.strategies import load_config, run_backtest_from_config
+import numpy as np
+
+from app.config import get_settings
+from app.market_data.cache import get_bar_cache
+from app.services.backtest_cache import get_backtest_result_cache, result_key
+from app.services.backtest_executor import BacktestQueueFull, get_backtest_executor
+from app.storage.backtest_results import get_backtest_result_store
+from app.strategies import StrategyConfig, load_config, run_backtest_from_config
+from app.strategies.monte_carlo import (
+    DEFAULT_PERCENTILES,
+    METHODS,
+    new_seed,
+    shard_blocks,
+    simulate_blocks,
+    summarize_simulations,
+    trade_returns,
+)
+from app.strategies.plan import StrategyPlan, UnsupportedRuleError, compile_config
+from app.strategies.rule_engine import backtest_summary, load_bars, simulate_backtest
+from app.strategies.simulator import REASONS
+from app.strategies.sweep import SweepContext, apply_params, expand_grid, rank_results
+from app.strategies.walk_forward import run_walk_forward
+
+
+@lru_cache(maxsize=32)
+def _cached_config(config_json: str) -> StrategyConfig:
+    """Per-process parse cache: a batch sends the same config JSON for every symbol."""
+    return load_config(config_json)
+
+
+@lru_cache(maxsize=32)
+def _cached_plan(config_json: str) -> StrategyPlan:
+    """Compiled plan for config JSON that doesn't come with a strategy id (see strategies.plan.PlanCache)."""
+    return compile_config(_cached_config(config_json))
+
+
+def _backtest_worker(
+    plan: StrategyPlan, symbol: str, start_date: datetime, end_date: datetime, save_results: bool = False
+) -> dict:
+    """
+    Runs in a worker process. Arguments and result must be picklable; the plan arrives compiled,
+    so workers never parse or validate config JSON. save_results writes the trade log and equity
+    curve to the result store and adds their reference as "results". Symbol filters the bars
+    can't check (e.g. float_size_max without float data) are listed under "unchecked_filters".
+    """
+    if not save_results:
+        metrics = run_backtest_from_config(plan, symbol=symbol, start_date=start_date, end_date=end_date)
+    else:
+        result = simulate_backtest(plan, symbol, start_date, end_date)
+        metrics = backtest_summary(plan, symbol, start_date, end_date, result.trades)
+        metrics["results"] = get_backtest_result_store().save(
+            result.trade_columns(),
+            {"t": result.t, "equity": result.equity.astype(np.float32)},
+            meta={"symbol": symbol, "reasons": list(REASONS)},
+        )
+    if plan.symbol_filters:
+        metrics["unchecked_filters"] = [r.name for r in plan.symbol_filters]
+    return metrics
+
+
+@lru_cache(maxsize=4)
+def _sweep_context(config_json: str, symbol: str, start_date: datetime, end_date: datetime) -> SweepContext:
+    """Per-process: every sweep chunk a worker receives reuses the same bars and indicator columns."""
+    config = _cached_config(config_json)
+    return SweepContext(config, load_bars(config, symbol, start_date, end_date))
+
+
+def _sweep_worker(
+    config_json: str, symbol: str, start_date: datetime, end_date: datetime, combos: list[dict]
+) -> list[dict]:
+    ctx = _sweep_context(config_json, symbol, start_date, end_date)
+    return [ctx.run(p) for p in combos]
+
+
+def _walk_forward_worker(
+    config_json: str, symbol: str, start_date: datetime, end_date: datetime, options: dict
+) -> dict:
+    config = _cached_config(config_json)
+    return run_walk_forward(config, load_bars(config, symbol, start_date, end_date), **options)
+
+
+def _monte_carlo_worker(
+    returns: np.ndarray, method: str, seed: int, num_simulations: int, start_block: int, stop_block: int
+) -> tuple[np.ndarray, np.ndarray]:
+    return simulate_blocks(returns, method, seed, num_simulations, start_block, stop_block)
+
+
+RANGE_STEP_SECONDS = 300
+
+
+def default_range(days: int = 365) -> tuple[datetime, datetime]:
+    """(now - days, now) with now rounded down to RANGE_STEP_SECONDS, so repeated requests share cache keys."""
+    end = datetime.utcfromtimestamp(int(time.time()) // RANGE_STEP_SECONDS * RANGE_STEP_SECONDS)
+    return end - timedelta(days=days), end
+
+
+def backtest_result_key(
+    plan: StrategyPlan, symbol: str, timeframe: str, start_date: datetime, end_date: datetime
+) -> str:
+    """Cache key of a single backtest (see services.backtest_cache)."""
+    return result_key(plan.config, symbol, timeframe, start_date, end_date, get_bar_cache().data_version)
+
+
+def _result_ttl(end_date: datetime) -> int:
+    """Results whose range reaches today can change as bars print; they expire with the bar cache's open ranges."""
+    settings = get_settings()
+    if end_date >= datetime.utcnow() - timedelta(days=1):
+        return settings.market_data_cache_open_ttl_seconds
+    return settings.backtest_result_cache_ttl_seconds
+
+
+def _empty_result(strategy_id: int, symbol: str, timeframe: str, start_date: datetime, end_date: datetime) -> dict:
+    return {
+        "strategy_id": strategy_id,
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "start_time": start_date,
+        "end_time": end_date,
+        "pnl": 0.0,
+        "pnl_pct": 0.0,
+        "win_rate": 0.0,
+        "max_drawdown": 0.0,
+        "num_trades": 0,
+    }
 
 
 async def run_backtest(
@@ -15,33 +143,295 @@ async def run_backtest(
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
     config_json: Optional[str] = None,
+    plan: Optional[StrategyPlan] = None,
 ) -> dict:
-    """Run backtest for a strategy. Uses config if provided, else placeholder."""
+    """
+    Run backtest for a strategy. Uses config if provided, else placeholder. plan is the config
+    already compiled (e.g. from the strategy plan cache); without it config_json is compiled here.
+    Config runs keep their trade log and equity curve (reference under "results") and are
+    served from the result cache when an identical run exists ("result_key" is the cache key).
+    Raises BacktestQueueFull when the backtest executor has no free slot and UnsupportedRuleError
+    when the config names rules the engine can't run.
+    """
     end_date = end_date or datetime.utcnow()
     start_date = start_date or (end_date - timedelta(days=365))
 
-    if config_json:
+    if config_json or plan:
         try:
-            config = load_config(config_json)
-            result = run_backtest_from_config(
-                config, symbol=symbol, start_date=start_date, end_date=end_date
+            plan = plan or _cached_plan(config_json)
+            key = backtest_result_key(plan, symbol, timeframe, start_date, end_date)
+            result = await get_backtest_result_cache().get_or_run(
+                key,
+                lambda: get_backtest_executor().run(
+                    _backtest_worker, plan, symbol, start_date, end_date, True
+                ),
+                _result_ttl(end_date),
             )
             return {
                 "strategy_id": strategy_id,
                 **result,
+                "result_key": key,
             }
+        except (BacktestQueueFull, UnsupportedRuleError):
+            raise
         except Exception:
             pass
 
+    return _empty_result(strategy_id, symbol, timeframe, start_date, end_date)
+
+
+async def run_backtest_batch(
+    strategy_id: int,
+    symbols: list[str],
+    timeframe: str = "1D",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    config_json: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    plan: Optional[StrategyPlan] = None,
+) -> AsyncIterator[dict]:
+    """
+    Backtest one strategy across many symbols in the process pool. The config is compiled once
+    (or passed in as plan) and every worker receives the compiled plan.
+    At most max_concurrency runs are in flight; results are yielded as they finish
+    (not in input order), each with status "ok" or "error".
+    """
+    end_date = end_date or datetime.utcnow()
+    start_date = start_date or (end_date - timedelta(days=365))
+    symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s and s.strip()))
+
+    if not config_json and plan is None:
+        for symbol in symbols:
+            yield {"status": "ok", **_empty_result(strategy_id, symbol, timeframe, start_date, end_date)}
+        return
+    plan = plan or compile_config(load_config(config_json))  # fail fast on an invalid config
+
+    executor = get_backtest_executor()
+    semaphore = asyncio.Semaphore(max_concurrency or get_settings().backtest_batch_max_concurrency)
+
+    async def run_one(symbol: str) -> dict:
+        async with semaphore:
+            try:
+                # Batches wait for executor slots rather than failing symbol by symbol
+                result = await executor.run(
+                    _backtest_worker, plan, symbol, start_date, end_date, wait=True
+                )
+                return {"status": "ok", "strategy_id": strategy_id, **result}
+            except Exception as e:
+                return {"status": "error", "strategy_id": strategy_id, "symbol": symbol, "error": str(e)}
+
+    tasks = [asyncio.create_task(run_one(s)) for s in symbols]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # Client went away or the consumer stopped early: drop runs that haven't started
+        for task in tasks:
+            task.cancel()
+
+
+async def run_backtest_sweep(
+    config_json: str,
+    param_grid: dict[str, list],
+    symbol: str = "AAPL",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    rank_by: str = "pnl",
+    top_n: Optional[int] = None,
+) -> list[dict]:
+    """
+    Grid-search param_grid for one strategy and symbol. Combinations are split into chunks
+    across the backtest executor; returns the ranked rows (see strategies.sweep.rank_results).
+    Raises UnsupportedRuleError for rules (or rule parameters) the engine can't run, ValueError
+    for unknown parameters, empty ranges, rank keys or too many combinations.
+    """
+    end_date = end_date or datetime.utcnow()
+    start_date = start_date or (end_date - timedelta(days=365))
+    config = load_config(config_json)
+    combos = expand_grid(param_grid)
+    max_combos = get_settings().backtest_sweep_max_combinations
+    if len(combos) > max_combos:
+        raise ValueError(f"Sweep has {len(combos)} combinations; the limit is {max_combos}")
+    compile_config(apply_params(config, combos[0]))
+    rank_results([], rank_by)
+
+    executor = get_backtest_executor()
+    size = max(1, -(-len(combos) // (executor.workers * 2)))
+    chunks = [combos[i : i + size] for i in range(0, len(combos), size)]
+    parts = await asyncio.gather(*(
+        executor.run(_sweep_worker, config_json, symbol, start_date, end_date, chunk, wait=True)
+        for chunk in chunks
+    ))
+    return rank_results([row for part in parts for row in part], rank_by, top_n)
+
+
+async def run_backtest_walk_forward(
+    config_json: str,
+    symbol: str = "AAPL",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    n_splits: int = 5,
+    train_bars: Optional[int] = None,
+    test_bars: Optional[int] = None,
+    anchored: bool = False,
+    param_grid: Optional[dict[str, list]] = None,
+    rank_by: str = "pnl",
+) -> dict:
+    """
+    Walk-forward backtest for one strategy and symbol as a single executor job
+    (folds share one bar series inside the worker; see strategies.walk_forward).
+    Raises UnsupportedRuleError for rules (or rule parameters) the engine can't run, ValueError
+    for unknown parameters, empty ranges, rank keys, too many combinations or a too-short range.
+    """
+    end_date = end_date or datetime.utcnow()
+    start_date = start_date or (end_date - timedelta(days=365))
+    config = load_config(config_json)
+    combos = expand_grid(param_grid or {})
+    max_combos = get_settings().backtest_sweep_max_combinations
+    if len(combos) > max_combos:
+        raise ValueError(f"Walk-forward grid has {len(combos)} combinations; the limit is {max_combos}")
+    compile_config(apply_params(config, combos[0]))
+    rank_results([], rank_by)
+
+    options = {
+        "n_splits": n_splits,
+        "train_bars": train_bars,
+        "test_bars": test_bars,
+        "anchored": anchored,
+        "param_grid": param_grid,
+        "rank_by": rank_by,
+    }
+    return await get_backtest_executor().run(
+        _walk_forward_worker, config_json, symbol, start_date, end_date, options
+    )
+
+
+def _saved_pnl(results: Optional[dict]) -> np.ndarray:
+    """pnl column of a saved trade log (empty without one). Raises KeyError when the files are gone."""
+    if not results or not results.get("num_trades"):
+        return np.empty(0)
+    _, _, cols = get_backtest_result_store().trades(results["key"], 0, results["num_trades"])
+    return np.asarray(cols["pnl"])
+
+
+async def run_backtest_monte_carlo(
+    strategy_id: int,
+    symbol: str = "AAPL",
+    timeframe: str = "1D",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    config_json: Optional[str] = None,
+    plan: Optional[StrategyPlan] = None,
+    results: Optional[dict] = None,
+    num_simulations: int = 10_000,
+    method: str = "bootstrap",
+    seed: Optional[int] = None,
+    percentiles: Optional[list[float]] = None,
+    shards: Optional[int] = None,
+) -> dict:
+    """
+    Monte Carlo resampling of a backtest's trade list (see strategies.monte_carlo). The trades
+    are read from results (a saved run's trade log reference) or else from the run run_backtest
+    returns, cached or not. Simulations are split into shards executor jobs (default: one per
+    backtest_monte_carlo_shard_simulations, at most one per worker); the same seed gives the same
+    numbers however they are sharded. Raises ValueError for an unknown method or too many
+    simulations, KeyError when the trade log's files are gone, and BacktestQueueFull and
+    UnsupportedRuleError as run_backtest does.
+    """
+    settings = get_settings()
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method {method!r}; expected one of {', '.join(METHODS)}")
+    if num_simulations > settings.backtest_monte_carlo_max_simulations:
+        raise ValueError(
+            f"Monte Carlo asks for {num_simulations} simulations; the limit is {settings.backtest_monte_carlo_max_simulations}"
+        )
+    end_date = end_date or datetime.utcnow()
+    start_date = start_date or (end_date - timedelta(days=365))
+    pnl = None
+    if results is not None:
+        try:
+            pnl = _saved_pnl(results)
+        except KeyError:
+            pass  # the saved run's files are gone: run it again
+    if pnl is None:
+        metrics = await run_backtest(
+            strategy_id, symbol, timeframe, start_date, end_date, config_json=config_json, plan=plan
+        )
+        pnl = _saved_pnl(metrics.get("results"))
+
+    returns = trade_returns(pnl)
+    seed = new_seed() if seed is None else seed
+    executor = get_backtest_executor()
+    if shards is None:
+        shards = min(executor.workers, -(-num_simulations // settings.backtest_monte_carlo_shard_simulations))
+    if len(returns) == 0:
+        parts = [simulate_blocks(returns, method, seed, num_simulations)]
+    else:
+        parts = await asyncio.gather(*(
+            executor.run(_monte_carlo_worker, returns, method, seed, num_simulations, a, b, wait=True)
+            for a, b in shard_blocks(num_simulations, shards)
+        ))
+    report = summarize_simulations(
+        returns,
+        np.concatenate([p[0] for p in parts]),
+        np.concatenate([p[1] for p in parts]),
+        method,
+        seed,
+        percentiles or DEFAULT_PERCENTILES,
+    )
     return {
         "strategy_id": strategy_id,
         "symbol": symbol,
         "timeframe": timeframe,
         "start_time": start_date,
         "end_time": end_date,
-        "pnl": 0.0,
-        "pnl_pct": 0.0,
-        "win_rate": 0.0,
-        "max_drawdown": 0.0,
-        "num_trades": 0,
+        **report,
     }
+
+
+def saved_results(params_snapshot: Optional[str]) -> Optional[dict]:
+    """The stored trade log / equity curve reference of a StrategyBacktestRun, if it has one."""
+    if not params_snapshot:
+        return None
+    try:
+        results = json.loads(params_snapshot).get("results")
+    except (ValueError, AttributeError):
+        return None
+    return results if isinstance(results, dict) and "key" in results else None
+
+
+def saved_unchecked_filters(params_snapshot: Optional[str]) -> list[str]:
+    """Symbol filters a StrategyBacktestRun's backtest could not check (see _backtest_worker)."""
+    if not params_snapshot:
+        return []
+    try:
+        names = json.loads(params_snapshot).get("unchecked_filters")
+    except (ValueError, AttributeError):
+        return []
+    return list(names) if isinstance(names, list) else []
+
+
+def _to_list(col: np.ndarray) -> list:
+    """Column values for JSON; float32 values keep their shortest decimal form (290.96, not 290.9599914550781)."""
+    if col.dtype == np.float32:
+        col = col.astype(str).astype(np.float64)
+    return col.tolist()
+
+
+def read_backtest_trades(results: dict, offset: int = 0, limit: int = 100) -> dict:
+    """One page of a saved run's trade log. Raises KeyError when the files are gone."""
+    total, meta, cols = get_backtest_result_store().trades(results["key"], offset, limit)
+    reasons = meta.get("reasons", REASONS)
+    names = list(cols)
+    rows = [dict(zip(names, values)) for values in zip(*(_to_list(cols[k]) for k in names))]
+    for row in rows:
+        row["reason"] = reasons[row["reason"]]
+    return {"total": total, "offset": offset, "trades": rows}
+
+
+def read_backtest_equity(
+    results: dict, offset: int = 0, limit: Optional[int] = None, max_points: Optional[int] = None
+) -> dict:
+    """A range of a saved run's equity curve (thinned to max_points). Raises KeyError when the files are gone."""
+    total, cols = get_backtest_result_store().equity(results["key"], offset, limit, max_points)
+    return {"total": total, "offset": offset, "t": cols["t"].tolist(), "equity": _to_list(cols["equity"])}
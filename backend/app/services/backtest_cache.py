@@ -0,0 +1,172 @@
+"""
+Content-addressed cache of backtest results.
+A result is keyed by everything that determines it: the canonical config (parsed and
+re-serialized, so key order, whitespace and omitted defaults don't matter), symbol, timeframe,
+date range, the market data's name and version, and RESULT_VERSION. Lookups go through an
+in-process LRU, then Redis (shared by every API process; skipped while Redis is unreachable).
+Identical runs already in flight are awaited instead of started again. The strategies router
+adds the database tier: a StrategyBacktestRun stored under the same key is returned instead of
+inserting a duplicate.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Optional
+
+import orjson
+
+from app.config import get_settings
+from app.strategies.config_schema import StrategyConfig
+
+RESULT_VERSION = "3"  # bump when the simulator's output changes for the same inputs
+_DATETIME_FIELDS = ("start_time", "end_time")
+_REDIS_RETRY_SECONDS = 30.0
+
+
+def config_digest(config: StrategyConfig) -> str:
+    """sha256 of the config's canonical JSON (every field, sorted keys, no whitespace)."""
+    canonical = json.dumps(config.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def result_key(
+    config: StrategyConfig,
+    symbol: str,
+    timeframe: str,
+    start_date: datetime,
+    end_date: datetime,
+    data_version: str,
+) -> str:
+    parts = (
+        RESULT_VERSION,
+        config_digest(config),
+        symbol.upper().strip(),
+        timeframe,
+        str(int(start_date.timestamp())),
+        str(int(end_date.timestamp())),
+        data_version,
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def _encode(value: dict, expires_at: float) -> bytes:
+    return orjson.dumps({"expires_at": expires_at, "value": value})
+
+
+def _decode(raw: bytes) -> tuple[float, dict]:
+    data = orjson.loads(raw)
+    value = data["value"]
+    for k in _DATETIME_FIELDS:
+        if isinstance(value.get(k), str):
+            value[k] = datetime.fromisoformat(value[k])
+    return data["expires_at"], value
+
+
+class BacktestResultCache:
+    def __init__(self, max_entries: int = 256, redis_url: Optional[str] = None, prefix: str = "backtest:result:"):
+        self.max_entries = max_entries
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._flights: dict[str, asyncio.Future] = {}
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+    def _remember(self, key: str, expires_at: float, value: dict) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _get_redis(self):
+        if not self.redis_url or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            try:
+                import redis.asyncio as redis
+
+                self._redis = redis.from_url(self.redis_url, socket_connect_timeout=0.5, socket_timeout=0.5)
+            except Exception:
+                self._redis_down()
+        return self._redis
+
+    def _redis_down(self) -> None:
+        """Skip Redis for a while instead of paying a connection timeout on every lookup."""
+        self._redis_retry_at = time.monotonic() + _REDIS_RETRY_SECONDS
+
+    async def get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._entries.move_to_end(key)
+                return entry[1]
+            del self._entries[key]
+        r = self._get_redis()
+        if r is None:
+            return None
+        try:
+            raw = await r.get(self.prefix + key)
+        except Exception:
+            self._redis_down()
+            return None
+        if raw is None:
+            return None
+        expires_at, value = _decode(raw)
+        if expires_at <= now:
+            return None
+        self._remember(key, expires_at, value)
+        return value
+
+    async def put(self, key: str, value: dict, ttl_seconds: int) -> None:
+        expires_at = time.time() + ttl_seconds
+        self._remember(key, expires_at, value)
+        r = self._get_redis()
+        if r is None:
+            return
+        try:
+            await r.set(self.prefix + key, _encode(value, expires_at), ex=max(int(ttl_seconds), 1))
+        except Exception:
+            self._redis_down()
+
+    async def get_or_run(self, key: str, run: Callable[[], Awaitable[dict]], ttl_seconds: int) -> dict:
+        """
+        The cached result for key, else run() once (concurrent callers with the same key share
+        it) and cache what it returns. Exceptions are not cached. Cancelling a caller never
+        cancels a run other callers are waiting on.
+        """
+        value = await self.get(key)
+        if value is not None:
+            return value
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._run(key, run, ttl_seconds))
+            flight.add_done_callback(lambda _: self._flights.pop(key, None))
+            self._flights[key] = flight
+        return await asyncio.shield(flight)
+
+    async def _run(self, key: str, run: Callable[[], Awaitable[dict]], ttl_seconds: int) -> dict:
+        value = await run()
+        await self.put(key, value, ttl_seconds)
+        return value
+
+    def clear(self) -> None:
+        """Drop the in-process entries (Redis entries expire on their own)."""
+        self._entries.clear()
+
+
+_cache: Optional[BacktestResultCache] = None
+
+
+def get_backtest_result_cache() -> BacktestResultCache:
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = BacktestResultCache(
+            max_entries=settings.backtest_result_cache_size,
+            redis_url=settings.redis_url or None,
+        )
+    return _cache
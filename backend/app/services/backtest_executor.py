@@ -0,0 +1,74 @@
+"""
+Dedicated executor for CPU-bound backtests.
+Runs jobs in a process pool so a heavy backtest never blocks the event loop, and bounds
+the number of jobs in flight (running + queued) so overload is rejected instead of piling up.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.config import get_settings
+
+
+class BacktestQueueFull(Exception):
+    """Raised when the executor already has workers + queue_size jobs in flight."""
+
+
+class BacktestExecutor:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = max(1, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: workers must not inherit the server's event loop, DB connections or threads
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.capacity
+
+    async def run(self, fn: Callable, *args: Any, wait: bool = False) -> Any:
+        """
+        Run fn(*args) in a worker process. fn, args and the result must be picklable.
+        wait=False raises BacktestQueueFull when saturated; wait=True waits for a free slot.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.capacity)
+        if not wait and self._slots.locked():
+            raise BacktestQueueFull("Backtest queue is full")
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_pool(), fn, *args)
+            finally:
+                self.in_flight -= 1
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_executor: Optional[BacktestExecutor] = None
+
+
+def get_backtest_executor() -> BacktestExecutor:
+    global _executor
+    if _executor is None:
+        settings = get_settings()
+        _executor = BacktestExecutor(
+            workers=settings.backtest_process_workers or os.cpu_count() or 1,
+            queue_size=settings.backtest_queue_size,
+        )
+    return _executor
@@ -0,0 +1,183 @@
+"""
+Live strategy scans: one UniverseScanner per (strategy version, universe), shared by every subscriber.
+A scan starts with its first subscriber. It warms the scanner on the bar cache's recent history (enough
+sessions to cover the plan's lookback; VWAP restarts each session, so it doesn't depend on where that
+history starts), then polls the upstream provider for the whole universe's
+base-resolution bars in one batch request every poll_seconds, resamples them to the scan resolution
+and feeds each bucket once it has closed. Subscribers read the latest tick's matches, so a slow
+client skips to the newest result instead of queueing stale ones. Feeding runs in a worker thread
+so a large universe doesn't stall the event loop.
+"""
+import asyncio
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.config import get_settings
+from app.market_data.cache import get_bar_cache
+from app.market_data.providers import MarketDataProvider
+from app.market_data.resample import bucket_start, resample
+from app.market_data.resolution import DAY_SECONDS, SESSION_SECONDS, normalize_resolution, resolution_seconds
+from app.strategies.bars import BarSeries
+from app.strategies.plan import StrategyPlan, backtest_resolution
+from app.strategies.scanner import ScanResult, UniverseScanner
+
+
+def _history_seconds(lookback: int, bar_seconds: int) -> int:
+    """Calendar time holding lookback + 1 bars of sessions, with room for weekends and holidays."""
+    per_session = max(SESSION_SECONDS // bar_seconds, 1)
+    sessions = -(-(lookback + 1) // per_session) + 1
+    return (sessions * 7 // 5 + 4) * DAY_SECONDS
+
+
+def _closed(bars: dict[str, BarSeries], resolution: str, base_resolution: str, cutoff: int) -> dict[str, BarSeries]:
+    """Each symbol's bars resampled to resolution, keeping buckets that start before cutoff."""
+    out = {}
+    for symbol, series in bars.items():
+        if resolution != base_resolution:
+            series = resample(series, resolution)
+        out[symbol] = series[: int(np.searchsorted(series.t, cutoff))]
+    return out
+
+
+class ScanSubscription:
+    """Match updates of one scan; read with get(), release with close()."""
+
+    def __init__(self, hub: "ScannerHub", scan: "_Scan"):
+        self._hub = hub
+        self._scan = scan
+        self._event = asyncio.Event()
+        self.closed = False
+
+    @property
+    def scanner(self) -> UniverseScanner:
+        return self._scan.scanner
+
+    @property
+    def resolution(self) -> str:
+        return self._scan.resolution
+
+    def _mark(self) -> None:
+        self._event.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[ScanResult]:
+        """The newest tick's result, or None if no tick was scanned within timeout."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        return self._scan.latest
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._hub._release(self)
+
+    async def __aenter__(self) -> "ScanSubscription":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+
+class _Scan:
+    def __init__(self, key: tuple, scanner: UniverseScanner, resolution: str):
+        self.key = key
+        self.scanner = scanner
+        self.resolution = resolution
+        self.latest: Optional[ScanResult] = None
+        self.subscribers: set[ScanSubscription] = set()
+        self.task: Optional[asyncio.Task] = None
+
+    def publish(self, results: list[ScanResult]) -> None:
+        if not results:
+            return
+        self.latest = results[-1]
+        for sub in list(self.subscribers):
+            sub._mark()
+
+
+class ScannerHub:
+    def __init__(
+        self,
+        history: MarketDataProvider,
+        live: MarketDataProvider,
+        base_resolution: str = "1",
+        poll_seconds: float = 15.0,
+    ):
+        self.history = history
+        self.live = live
+        self.base_resolution = normalize_resolution(base_resolution)
+        self.poll_seconds = poll_seconds
+        self._scans: dict[tuple, _Scan] = {}
+
+    def subscribe(self, key: tuple, plan: StrategyPlan, symbols: list[str]) -> ScanSubscription:
+        """
+        Subscribe to the scan of plan over symbols; key identifies the strategy version (a scan is
+        shared by subscribers with the same key and set of symbols). The scan starts with its first
+        subscriber and stops with its last. Raises UnsupportedRuleError for a config the scanner
+        can't run. Must be called from the event loop.
+        """
+        symbols = sorted({s.upper().strip() for s in symbols if s and s.strip()})
+        key = (key, tuple(symbols))
+        scan = self._scans.get(key)
+        if scan is None:
+            scanner = UniverseScanner(plan, symbols)
+            resolution = normalize_resolution(backtest_resolution(scanner.plan.config))
+            scan = self._scans[key] = _Scan(key, scanner, resolution)
+            scan.task = asyncio.create_task(self._run(scan))
+        sub = ScanSubscription(self, scan)
+        scan.subscribers.add(sub)
+        if scan.latest is not None:
+            sub._mark()
+        return sub
+
+    def _release(self, sub: ScanSubscription) -> None:
+        scan = sub._scan
+        scan.subscribers.discard(sub)
+        if not scan.subscribers and self._scans.get(scan.key) is scan:
+            del self._scans[scan.key]
+            scan.task.cancel()
+
+    def _feed(self, scan: _Scan, bars: dict[str, BarSeries], resolution: str, cutoff: int) -> list[ScanResult]:
+        return list(scan.scanner.feed(_closed(bars, scan.resolution, resolution, cutoff)))
+
+    async def _run(self, scan: _Scan) -> None:
+        scanner = scan.scanner
+        now = int(time.time())
+        cutoff = int(bucket_start(np.array([now]), scan.resolution)[0])
+        start = now - _history_seconds(scanner.plan.lookback, resolution_seconds(scan.resolution))
+        try:
+            history = await self.history.get_bars_batch(scanner.symbols, scan.resolution, start, now)
+        except Exception:
+            history = {}  # the scan warms up on live bars instead
+        scan.publish(await asyncio.to_thread(self._feed, scan, history, scan.resolution, cutoff))
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            now = int(time.time())
+            try:
+                fresh = await self.live.get_bars_batch(scanner.symbols, self.base_resolution, cutoff, now)
+            except Exception:
+                continue  # transient upstream error: the next poll asks from the same bucket
+            bucket = int(bucket_start(np.array([now]), scan.resolution)[0])
+            scan.publish(await asyncio.to_thread(self._feed, scan, fresh, self.base_resolution, bucket))
+            cutoff = bucket
+
+
+_hub: Optional[ScannerHub] = None
+
+
+def get_scanner_hub() -> ScannerHub:
+    """Process-wide hub: history from the bar cache, live bars from its upstream provider."""
+    global _hub
+    if _hub is None:
+        cache = get_bar_cache()
+        _hub = ScannerHub(
+            history=cache,
+            live=cache.upstream,
+            base_resolution=cache.base_resolution,
+            poll_seconds=get_settings().scanner_poll_seconds,
+        )
+    return _hub
@@ -0,0 +1 @@
+"""Binary file formats shared by market data and backtest storage."""
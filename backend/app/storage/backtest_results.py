@@ -0,0 +1,89 @@
+"""
+Full output of a backtest run on disk: the trade log and the bar-level equity curve as two
+columnar files (app.storage.columnar) under <root>/<key>/. A StrategyBacktestRun references
+them by key from params_snapshot. Pages are sliced from the memory-mapped files, so reading
+50 trades never loads the rest of the run.
+"""
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import numpy as np
+
+from app.config import get_settings
+from app.storage.columnar import read_columns, write_columns
+
+_KEY = re.compile(r"^[0-9a-f]{32}$")
+_TRADES = "trades.col"
+_EQUITY = "equity.col"
+
+
+class BacktestResultStore:
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def _dir(self, key: str) -> Path:
+        if not _KEY.match(key):
+            raise KeyError(key)
+        return self.root / key
+
+    def save(
+        self,
+        trades: dict[str, np.ndarray],
+        equity: dict[str, np.ndarray],
+        meta: Optional[dict[str, Any]] = None,
+    ) -> dict:
+        """Write one run's trade and equity columns; returns the reference to keep: key and row counts."""
+        key = uuid.uuid4().hex
+        path = self._dir(key)
+        write_columns(path / _TRADES, trades, meta)
+        write_columns(path / _EQUITY, equity, meta)
+        return {
+            "key": key,
+            "num_trades": len(next(iter(trades.values()), ())),
+            "num_points": len(next(iter(equity.values()), ())),
+        }
+
+    def _read(self, key: str, name: str) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+        path = self._dir(key) / name
+        if not path.exists():
+            raise KeyError(key)
+        return read_columns(path)
+
+    def trades(self, key: str, offset: int = 0, limit: int = 100) -> tuple[int, dict[str, Any], dict[str, np.ndarray]]:
+        """(total rows, meta, columns of rows offset..offset+limit); raises KeyError for an unknown key."""
+        meta, cols = self._read(key, _TRADES)
+        total = len(next(iter(cols.values()), ()))
+        return total, meta, {k: v[offset : offset + limit] for k, v in cols.items()}
+
+    def equity(
+        self, key: str, offset: int = 0, limit: Optional[int] = None, max_points: Optional[int] = None
+    ) -> tuple[int, dict[str, np.ndarray]]:
+        """
+        (total points, columns of points offset..offset+limit). max_points thins the page to every
+        k-th point (always keeping its last one) so a chart can draw a long curve at a glance.
+        """
+        _, cols = self._read(key, _EQUITY)
+        total = len(next(iter(cols.values()), ()))
+        stop = total if limit is None else min(offset + limit, total)
+        n = max(stop - offset, 0)
+        if max_points and n > max(max_points, 2):
+            step = -(-(n - 1) // (max(max_points, 2) - 1))
+            rows = np.r_[np.arange(offset, stop - 1, step), stop - 1]
+            return total, {k: v[rows] for k, v in cols.items()}
+        return total, {k: v[offset:stop] for k, v in cols.items()}
+
+    def delete(self, key: str) -> None:
+        shutil.rmtree(self._dir(key), ignore_errors=True)
+
+
+_store: Optional[BacktestResultStore] = None
+
+
+def get_backtest_result_store() -> BacktestResultStore:
+    global _store
+    if _store is None:
+        _store = BacktestResultStore(get_settings().backtest_results_dir)
+    return _store
@@ -0,0 +1,108 @@
+"""
+Compact binary columnar files, read back memory-mapped.
+Layout: 8-byte magic, u32 header length, JSON header, then each column as one contiguous
+little-endian array aligned to 64 bytes (header offsets are relative to the first column).
+Reading maps the file once and returns NumPy views into the mapping, so callers slice
+columns without copying.
+"""
+import json
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+import numpy as np
+
+MAGIC = b"TRDSYCOL"
+VERSION = 1
+_ALIGN = 64
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGN) * _ALIGN
+
+
+def _chunks(columns: dict[str, np.ndarray], meta: Optional[dict[str, Any]]) -> Iterator[bytes]:
+    """The encoded file as a sequence of byte strings (header, padding, column data)."""
+    arrays = {}
+    for name, col in columns.items():
+        col = np.asarray(col)
+        arrays[name] = np.ascontiguousarray(col, dtype=col.dtype.newbyteorder("<"))
+    rows = {len(a) for a in arrays.values()}
+    if len(rows) > 1:
+        raise ValueError("Columns must all have the same length")
+
+    specs, offset = [], 0
+    for name, arr in arrays.items():
+        specs.append({"name": name, "dtype": arr.dtype.str, "offset": offset, "nbytes": arr.nbytes})
+        offset = _aligned(offset + arr.nbytes)
+    header = {"version": VERSION, "rows": rows.pop() if rows else 0, "meta": meta or {}, "columns": specs}
+    raw_header = json.dumps(header).encode()
+    data_start = _aligned(len(MAGIC) + 4 + len(raw_header))
+
+    yield MAGIC + struct.pack("<I", len(raw_header)) + raw_header
+    pos = len(MAGIC) + 4 + len(raw_header)
+    for spec, arr in zip(specs, arrays.values()):
+        yield b"\0" * (data_start + spec["offset"] - pos)
+        yield arr.tobytes()
+        pos = data_start + spec["offset"] + spec["nbytes"]
+
+
+def encode_columns(columns: dict[str, np.ndarray], meta: Optional[dict[str, Any]] = None) -> bytes:
+    """The same layout as write_columns, in memory (e.g. as a binary HTTP body)."""
+    return b"".join(_chunks(columns, meta))
+
+
+def write_columns(
+    path: Union[str, Path],
+    columns: dict[str, np.ndarray],
+    meta: Optional[dict[str, Any]] = None,
+) -> None:
+    """
+    Write equal-length 1-D columns (plus a JSON-able meta dict) to path.
+    The file is written next to path and renamed into place, so readers never see a partial file.
+    """
+    path = Path(path)
+    chunks = _chunks(columns, meta)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _parse(buf: np.ndarray, source: str) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    if bytes(buf[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{source} is not a columnar file")
+    (header_len,) = struct.unpack("<I", bytes(buf[len(MAGIC) : len(MAGIC) + 4]))
+    start = len(MAGIC) + 4
+    header = json.loads(bytes(buf[start : start + header_len]))
+    if header.get("version") != VERSION:
+        raise ValueError(f"{source}: unsupported columnar version {header.get('version')}")
+    data_start = _aligned(start + header_len)
+    columns = {}
+    for spec in header["columns"]:
+        lo = data_start + spec["offset"]
+        chunk = buf[lo : lo + spec["nbytes"]]
+        columns[spec["name"]] = chunk.view(np.dtype(spec["dtype"]))
+    return header["meta"], columns
+
+
+def read_columns(path: Union[str, Path]) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    """
+    Map path read-only and return (meta, columns). Columns are views into the mapping;
+    the file stays mapped as long as any of them is referenced.
+    """
+    return _parse(np.memmap(path, dtype=np.uint8, mode="r"), str(path))
+
+
+def decode_columns(data: bytes) -> tuple[dict[str, Any], dict[str, np.ndarray]]:
+    """(meta, columns) from encode_columns output; columns are read-only views into data."""
+    return _parse(np.frombuffer(data, dtype=np.uint8), "buffer")
@@ -1,4 +1,5 @@
+from app.strategies.bars import Bar, BarSeries
 from app.strategies.config_schema import StrategyConfig
 from app.strategies.rule_engine import load_config, run_backtest_from_config
 
-__all__ = ["StrategyConfig", "load_config", "run_backtest_from_config"]
+__all__ = ["Bar", "BarSeries", "StrategyConfig", "load_config", "run_backtest_from_config"]
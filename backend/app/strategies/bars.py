@@ -0,0 +1,86 @@
+"""
+Bar containers for the strategy engine.
+BarSeries stores OHLCV as NumPy columns so indicators read whole arrays and
+slicing returns views instead of copying Bar objects.
+"""
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Union
+
+import numpy as np
+
+
+@dataclass
+class Bar:
+    t: int  # Unix timestamp
+    o: float
+    h: float
+    l: float
+    c: float
+    v: float
+
+
+class BarSeries:
+    """Columnar OHLCV bars: t is int64 seconds, o/h/l/c/v are float64."""
+
+    __slots__ = ("t", "o", "h", "l", "c", "v")
+
+    def __init__(self, t, o, h, l, c, v):
+        self.t = np.asarray(t, dtype=np.int64)
+        self.o = np.asarray(o, dtype=np.float64)
+        self.h = np.asarray(h, dtype=np.float64)
+        self.l = np.asarray(l, dtype=np.float64)
+        self.c = np.asarray(c, dtype=np.float64)
+        self.v = np.asarray(v, dtype=np.float64)
+
+    @classmethod
+    def from_bars(cls, bars: Iterable[Bar]) -> "BarSeries":
+        bars = list(bars)
+        return cls(
+            [b.t for b in bars],
+            [b.o for b in bars],
+            [b.h for b in bars],
+            [b.l for b in bars],
+            [b.c for b in bars],
+            [b.v for b in bars],
+        )
+
+    @classmethod
+    def concat(cls, parts: Iterable["BarSeries"]) -> "BarSeries":
+        """Join series end to end (copies; callers keep them time-ordered)."""
+        parts = list(parts)
+        if len(parts) == 1:
+            return parts[0]
+        return cls(*(np.concatenate([getattr(p, k) for p in parts]) for k in cls.__slots__))
+
+    def __len__(self) -> int:
+        return len(self.t)
+
+    def __getitem__(self, key):
+        """Integer index returns a Bar; a slice returns a BarSeries view (no copy)."""
+        if isinstance(key, slice):
+            return BarSeries(self.t[key], self.o[key], self.h[key], self.l[key], self.c[key], self.v[key])
+        return Bar(
+            t=int(self.t[key]),
+            o=float(self.o[key]),
+            h=float(self.h[key]),
+            l=float(self.l[key]),
+            c=float(self.c[key]),
+            v=float(self.v[key]),
+        )
+
+    def __iter__(self) -> Iterator[Bar]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def to_bars(self) -> list[Bar]:
+        return list(self)
+
+
+BarsLike = Union[BarSeries, list[Bar]]
+
+
+def as_series(bars: BarsLike) -> BarSeries:
+    """Adapter so callers can keep passing list[Bar]; BarSeries passes through unchanged."""
+    if isinstance(bars, BarSeries):
+        return bars
+    return BarSeries.from_bars(bars)
@@ -60,6 +60,10 @@ class BacktestAssumptions(BaseModel):
     primary_timeframe: Optional[str] = None
     intraday_execution_context: Optional[str] = None
     historical_conditions: Optional[str] = None
+    entry_fill: Optional[str] = None  # "next_open" (default) or "close" of the signal bar
+    slippage_bps: Optional[float] = None
+    commission_per_share: Optional[float] = None
+    max_hold_bars: Optional[int] = None
 
 
 class StrategyConfig(BaseModel):
@@ -1,178 +1,522 @@
 """
-Indicator and rule implementations for strategy config.
-Evaluates entry/confirmation/exit rules against bar data.
+Rule registry for strategy configs: every entry indicator, confirmation rule and exit a config
+can name, each declared once with
+- its parameter schema (type and default of every parameter it reads),
+- the precomputed IndicatorFrame columns it depends on (shared between rules that declare the same one),
+- its warm-up lookback (how many bars before row i it reads), and
+- its batch mask (entries, confirmations; the simulator executes exits itself), and
+- its scan: the same check on the newest bar only, from incremental state. The scanner runs it
+  over a whole symbol universe at once, the streaming evaluator over one symbol, bar by bar.
+strategies.plan compiles a config against RULES; names that aren't registered are refused.
+eval_entry_indicator, eval_confirmation_rule and eval_exit_rule keep the per-bar API (bars may
+be a list[Bar]): a rule's mask read at one row.
 """
 from dataclasses import dataclass
-from typing import Optional
+from numbers import Real
+from typing import Any, Callable, Optional, Union
 
+import numpy as np
 
-@dataclass
-class Bar:
-    t: int  # Unix timestamp
-    o: float
-    h: float
-    l: float
-    c: float
-    v: float
+from app.strategies.bars import Bar, BarsLike, as_series
+from app.strategies.precompute import IndicatorFrame, value_at
 
+RULE_KINDS = ("entry", "confirmation", "exit")
 
-def _sma(values: list[float], period: int) -> Optional[float]:
-    if len(values) < period:
-        return None
-    return sum(values[-period:]) / period
 
+@dataclass(frozen=True)
+class Param:
+    """One rule parameter: int or float, with the value used when a config leaves it out."""
 
-def _atr(bars: list[Bar], period: int = 14) -> Optional[float]:
-    if len(bars) < period + 1:
-        return None
-    trs = []
-    for i in range(1, min(period + 1, len(bars) + 1)):
-        idx = -i
-        high, low = bars[idx].h, bars[idx].l
-        prev_close = bars[idx - 1].c
-        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-        trs.append(tr)
-    return sum(trs) / len(trs) if trs else None
+    type: type
+    default: Union[int, float]
 
 
-def _vwap(bars: list[Bar]) -> Optional[float]:
-    if not bars:
-        return None
-    total_pv = sum((b.h + b.l + b.c) / 3 * b.v for b in bars)
-    total_v = sum(b.v for b in bars)
-    return total_pv / total_v if total_v > 0 else None
+@dataclass(frozen=True)
+class RuleSpec:
+    """
+    A rule a config can name. Parameters passed to mask / inputs / lookback are bound:
+    every schema parameter is present with its declared type.
+    - mask: batch signal, one boolean per bar of an IndicatorFrame (None for exits and symbol filters)
+    - scan: the mask's check on one tick (a strategies.scanner.UniverseTick: each row's newest
+      bar, its previous close and volume and its inputs' current values), one boolean per row;
+      past warm-up it holds exactly where the mask does
+    - inputs: frame column keys the rule reads (see IndicatorFrame.column)
+    - lookback: bars before row i the rule reads, given the bar size in seconds
+    - timeframe: "bar" rules run on the bars the config executes on; "intraday" ones too, but
+      are refused on daily bars; "daily" ones are evaluated once per session on the daily series
+      when a config executes on intraday bars with daily context (daily_plus_5min_execution)
+    - scope: "bar" rules are evaluated per bar; "symbol" rules screen which symbols to trade and
+      need reference data no bar series carries
+    """
+
+    kind: str
+    name: str
+    params: dict[str, Param]
+    mask: Optional[Callable[[IndicatorFrame, dict], np.ndarray]] = None
+    scan: Optional[Callable[[Any, dict], np.ndarray]] = None
+    inputs: Callable[[dict], tuple] = lambda p: ()
+    lookback: Callable[[dict, int], int] = lambda p, bar_seconds: 0
+    timeframe: str = "bar"
+    scope: str = "bar"
+
+    def __reduce__(self):
+        # Pickled by name (plans travel to backtest workers); the worker resolves it from its own registry
+        return get_rule, (self.kind, self.name)
+
+    def bind(self, params: dict) -> dict:
+        """params with every schema default filled in and values coerced; raises ValueError for bad types."""
+        bound = dict(params)
+        for name, spec in self.params.items():
+            value = params.get(name)
+            if value is None:
+                bound[name] = spec.default
+                continue
+            if isinstance(value, bool) or not isinstance(value, Real):
+                raise ValueError(f"{self.name}.{name} must be a number, got {value!r}")
+            if spec.type is int:
+                if value != int(value):
+                    raise ValueError(f"{self.name}.{name} must be a whole number, got {value!r}")
+                value = int(value)
+            bound[name] = spec.type(value)
+        return bound
+
+
+RULES: dict[str, dict[str, RuleSpec]] = {kind: {} for kind in RULE_KINDS}
+
+
+def register_rule(
+    kind: str,
+    name: str,
+    params: Optional[dict[str, Param]] = None,
+    inputs: Union[tuple, Callable[[dict], tuple]] = (),
+    lookback: Union[int, Callable[[dict, int], int]] = 0,
+    timeframe: str = "bar",
+    scope: str = "bar",
+    scan: Optional[Callable[[Any, dict], np.ndarray]] = None,
+):
+    """
+    Decorator adding a rule to RULES: the decorated function is its mask (None for exits and
+    symbol filters). inputs and lookback may be constants or functions of the bound parameters;
+    scan is the rule's universe check (see RuleSpec).
+    """
+    def decorator(fn: Optional[Callable]):
+        RULES[kind][name] = RuleSpec(
+            kind=kind,
+            name=name,
+            params=params or {},
+            inputs=inputs if callable(inputs) else (lambda p: inputs),
+            lookback=lookback if callable(lookback) else (lambda p, bar_seconds: lookback),
+            timeframe=timeframe,
+            scope=scope,
+            mask=fn,
+            scan=scan,
+        )
+        return fn
+    return decorator
+
+
+def get_rule(kind: str, name: str) -> Optional[RuleSpec]:
+    return RULES[kind].get(name)
+
+
+def _lagged(x: np.ndarray, lag: int, fill: float) -> np.ndarray:
+    """x shifted forward by lag bars (out[i] = x[i - lag]); the first lag slots get fill."""
+    out = np.full(len(x), fill, dtype=np.float64)
+    if lag < len(x):
+        out[lag:] = x[: len(x) - lag]
+    return out
+
+
+def _since_session_open(p: dict, bar_seconds: int) -> int:
+    """Bars back to the session's first bar (rules that read the whole session so far)."""
+    from app.market_data.resolution import session_bars  # market_data imports app.strategies.bars
+
+    return session_bars(bar_seconds)
+
+
+def _sessions_back(n: int, whole: bool = False) -> Callable[[dict, int], int]:
+    """
+    Lookback of a rule reading the n sessions before the current one: n daily bars, or on
+    intraday bars n sessions' worth (enough to reach each session's close), one more when the
+    rule reads those sessions whole (their range, not just the close).
+    """
+    def lookback(p: dict, bar_seconds: int) -> int:
+        from app.market_data.resolution import DAY_SECONDS, session_bars  # market_data imports app.strategies.bars
+
+        return n if bar_seconds >= DAY_SECONDS else (n + whole) * session_bars(bar_seconds)
+    return lookback
+
+
+PRIOR_CLOSE = ("prior_close",)
+VWAP = ("vwap",)
+SESSION_OPEN = ("session_open",)
+SESSION_VWAP = ("session_vwap",)
+
+
+def _prior_session_close(n: int) -> tuple:
+    return ("prior_session_close", n)
+
+
+# --- entry indicators (prior closes are the previous sessions' closes: on daily bars the previous
+# bars', on intraday bars the last close of each earlier session) ---
+
+
+def _scan_percent_gain_from_prior_close(tick, p: dict) -> np.ndarray:
+    pc = tick.values[_prior_session_close(1)]
+    return (pc > 0) & ((tick.c - pc) / pc * 100 >= p["min_threshold_pct"])
+
+
+@register_rule(
+    "entry",
+    "percent_gain_from_prior_close",
+    {"min_threshold_pct": Param(float, 0)},
+    (_prior_session_close(1),),
+    _sessions_back(1),
+    scan=_scan_percent_gain_from_prior_close,
+)
+def _percent_gain_from_prior_close(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    c, pc = frame.bars.c, frame.prior_session_close(1)
+    pct = (c - pc) / pc * 100
+    return (pc > 0) & (pct >= p["min_threshold_pct"])
+
+
+def _scan_two_day_percent_gain(tick, p: dict) -> np.ndarray:
+    two_ago = tick.values[_prior_session_close(2)]
+    return (two_ago > 0) & ((tick.c - two_ago) / two_ago * 100 >= p["min_threshold_pct"])
+
+
+@register_rule(
+    "entry",
+    "two_day_percent_gain",
+    {"min_threshold_pct": Param(float, 0)},
+    (_prior_session_close(2),),
+    _sessions_back(2),
+    timeframe="daily",
+    scan=_scan_two_day_percent_gain,
+)
+def _two_day_percent_gain(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    c, two_ago = frame.bars.c, frame.prior_session_close(2)
+    pct = (c - two_ago) / two_ago * 100
+    return (two_ago > 0) & (pct >= p["min_threshold_pct"])
+
+
+def _scan_gap_up_pct(tick, p: dict) -> np.ndarray:
+    pc = tick.values[_prior_session_close(1)]
+    return (pc > 0) & ((tick.values[SESSION_OPEN] - pc) / pc * 100 >= p["min_gap_pct"])
+
+
+@register_rule(
+    "entry",
+    "gap_up_pct",
+    {"min_gap_pct": Param(float, 0)},
+    (SESSION_OPEN, _prior_session_close(1)),
+    _sessions_back(1),
+    timeframe="daily",
+    scan=_scan_gap_up_pct,
+)
+def _gap_up_pct(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    """The session's open against the previous session's close."""
+    pc = frame.prior_session_close(1)
+    gap = (frame.session_open() - pc) / pc * 100
+    return (pc > 0) & (gap >= p["min_gap_pct"])
+
+
+# Share float is reference data, not a bar series: the rule screens symbols and has no mask
+register_rule("entry", "float_size_max", {"max_float_millions": Param(float, 40)}, scope="symbol")(None)
+
+
+def _scan_volume_vs_float_ratio(tick, p: dict) -> np.ndarray:
+    avg_v = tick.values[("avg_volume", 5, 0)]
+    return (tick.index < 4) | ~(avg_v > 0) | (tick.v >= avg_v * p["min_rotation_multiple"])
+
+
+@register_rule(
+    "entry",
+    "volume_vs_float_ratio",
+    {"min_rotation_multiple": Param(float, 1.0)},
+    (("avg_volume", 5, 0),),
+    4,
+    scan=_scan_volume_vs_float_ratio,
+)
+def _volume_vs_float_ratio(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    # No float data: volume against its 5-bar average stands in for rotation
+    avg_v = frame.avg_volume(5)
+    ok = frame.bars.v >= avg_v * p["min_rotation_multiple"]
+    return (frame.positions() < 4) | ~(avg_v > 0) | ok
+
+
+def _scan_percent_above_vwap(tick, p: dict) -> np.ndarray:
+    vwap = tick.values[SESSION_VWAP]
+    return ~(vwap > 0) | ((tick.c - vwap) / vwap * 100 >= p["min_pct"])
+
+
+@register_rule(
+    "entry",
+    "percent_above_vwap",
+    {"min_pct": Param(float, 0)},
+    (SESSION_VWAP,),
+    _since_session_open,
+    scan=_scan_percent_above_vwap,
+)
+def _percent_above_vwap(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    """The close against the session's VWAP (restarting at each session's first bar, as read live)."""
+    vwap_val = frame.session_vwap()
+    pct = (frame.bars.c - vwap_val) / vwap_val * 100
+    return ~(vwap_val > 0) | (pct >= p["min_pct"])
+
+
+def _scan_atr_multiple_extension(tick, p: dict) -> np.ndarray:
+    atr = tick.values[("atr", p["lookback_period"])]
+    return (atr > 0) & ((tick.c - tick.prior_close) / atr >= p["min_multiple"])
+
+
+@register_rule(
+    "entry",
+    "atr_multiple_extension",
+    {"lookback_period": Param(int, 14), "min_multiple": Param(float, 0)},
+    inputs=lambda p: (("atr", p["lookback_period"]), PRIOR_CLOSE),
+    lookback=lambda p, bar_seconds: p["lookback_period"],
+    scan=_scan_atr_multiple_extension,
+)
+def _atr_multiple_extension(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    atr_val = frame.atr(p["lookback_period"])
+    ext = (frame.bars.c - frame.prior_close()) / atr_val
+    return (atr_val > 0) & (ext >= p["min_multiple"])
+
+
+# --- confirmation rules ---
+
+
+def _scan_failed_breakout_within_n_bars(tick, p: dict) -> np.ndarray:
+    nb = p["bars"]
+    if nb < 1:
+        return np.zeros(len(tick.rows), dtype=bool)
+    return (tick.index >= nb) & (tick.values[("rolling_high", nb, 1)] >= tick.h)
+
+
+@register_rule(
+    "confirmation",
+    "failed_breakout_within_n_bars",
+    {"bars": Param(int, 3)},
+    inputs=lambda p: (("rolling_high", p["bars"], 1),) if p["bars"] >= 1 else (),
+    lookback=lambda p, bar_seconds: max(p["bars"], 0),
+    scan=_scan_failed_breakout_within_n_bars,
+)
+def _failed_breakout_within_n_bars(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    nb = p["bars"]
+    if nb < 1:
+        return np.zeros(len(frame), dtype=bool)
+    return (frame.positions() >= nb) & (frame.rolling_high(nb, lag=1) >= frame.bars.h)
+
+
+def _scan_first_lower_high_5min(tick, p: dict) -> np.ndarray:
+    return (tick.index >= 2) & (tick.h < tick.values[("rolling_high", 5, 1)])
+
+
+@register_rule(
+    "confirmation",
+    "first_lower_high_5min",
+    inputs=(("rolling_high", 5, 1),),
+    lookback=5,
+    scan=_scan_first_lower_high_5min,
+)
+def _first_lower_high_5min(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    return (frame.positions() >= 2) & (frame.bars.h < frame.rolling_high(5, lag=1))
+
+
+def _upper_wick(o: np.ndarray, h: np.ndarray, c: np.ndarray, p: dict) -> np.ndarray:
+    body = np.abs(c - o)
+    ratio = (h - np.maximum(o, c)) / body
+    return (body >= 1e-9) & (ratio >= p["min_wick_to_body_ratio"])
+
+
+def _scan_upper_wick_ratio_threshold(tick, p: dict) -> np.ndarray:
+    return _upper_wick(tick.o, tick.h, tick.c, p)
+
+
+@register_rule(
+    "confirmation",
+    "upper_wick_ratio_threshold",
+    {"min_wick_to_body_ratio": Param(float, 0)},
+    scan=_scan_upper_wick_ratio_threshold,
+)
+def _upper_wick_ratio_threshold(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    return _upper_wick(frame.bars.o, frame.bars.h, frame.bars.c, p)
+
+
+def _scan_volume_climax_bar(tick, p: dict) -> np.ndarray:
+    return (tick.index < 5) | (tick.v >= tick.values[("avg_volume", 5, 1)] * p["min_multiple_vs_5bar_avg"])
+
+
+@register_rule(
+    "confirmation",
+    "volume_climax_bar",
+    {"min_multiple_vs_5bar_avg": Param(float, 1)},
+    (("avg_volume", 5, 1),),
+    5,
+    scan=_scan_volume_climax_bar,
+)
+def _volume_climax_bar(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    avg_v = frame.avg_volume(5, lag=1)
+    return (frame.positions() < 5) | (frame.bars.v >= avg_v * p["min_multiple_vs_5bar_avg"])
+
+
+def _scan_declining_volume_on_bounce(tick, p: dict) -> np.ndarray:
+    comp = p["comparison_bars"]
+    if comp < 1:
+        return tick.index < comp
+    return (tick.index < comp) | (tick.v <= tick.prior_volume)
+
+
+@register_rule(
+    "confirmation",
+    "declining_volume_on_bounce",
+    {"comparison_bars": Param(int, 3)},
+    lookback=lambda p, bar_seconds: max(p["comparison_bars"], 1),
+    scan=_scan_declining_volume_on_bounce,
+)
+def _declining_volume_on_bounce(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    comp = p["comparison_bars"]
+    idx = frame.positions()
+    if comp < 1:
+        return idx < comp
+    v = frame.bars.v
+    return (idx < comp) | (v <= _lagged(v, 1, np.nan))
+
+
+def _scan_daily_lower_high(tick, p: dict) -> np.ndarray:
+    return (tick.index >= 2) & (tick.h < tick.values[("rolling_high", 2, 1)])
+
+
+@register_rule(
+    "confirmation",
+    "daily_lower_high",
+    inputs=(("rolling_high", 2, 1),),
+    lookback=2,
+    timeframe="daily",
+    scan=_scan_daily_lower_high,
+)
+def _daily_lower_high(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    """A high below both of the two bars before it."""
+    return (frame.positions() >= 2) & (frame.bars.h < frame.rolling_high(2, lag=1))
+
+
+def _scan_break_of_morning_support(tick, p: dict) -> np.ndarray:
+    return tick.c < tick.values[("morning_low", p["time_window_minutes"])]
+
+
+@register_rule(
+    "confirmation",
+    "break_of_morning_support",
+    {"time_window_minutes": Param(int, 30)},
+    inputs=lambda p: (("morning_low", p["time_window_minutes"]),),
+    lookback=_since_session_open,
+    timeframe="intraday",
+    scan=_scan_break_of_morning_support,
+)
+def _break_of_morning_support(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    """A close below the lowest low of the session's first time_window_minutes, after that window."""
+    return frame.bars.c < frame.morning_low(p["time_window_minutes"])
+
+
+def _scan_close_below_previous_day_midpoint(tick, p: dict) -> np.ndarray:
+    return tick.c < tick.values[("previous_day_midpoint",)]
+
+
+@register_rule(
+    "confirmation",
+    "close_below_previous_day_midpoint",
+    inputs=(("previous_day_midpoint",),),
+    lookback=_sessions_back(1, whole=True),
+    scan=_scan_close_below_previous_day_midpoint,
+)
+def _close_below_previous_day_midpoint(frame: IndicatorFrame, p: dict) -> np.ndarray:
+    """A close below the midpoint of the previous session's range (on daily bars, the previous bar's)."""
+    return frame.bars.c < frame.previous_day_midpoint()
+
+
+# --- exits (app.strategies.simulator executes them) ---
+
+register_rule("exit", "partial_cover_pct", {"target_pct": Param(float, 7), "cover_pct": Param(float, 100)})(None)
+register_rule("exit", "vwap_touch_exit", inputs=(VWAP,))(None)
+
+# A stop at the last lower high
+register_rule("exit", "structure_based_trailing")(None)
+
+# The move is the lookback_bars bars before the position opens (its lowest low is
+# the base, its highest high the top). Covers when price falls back target_pct of the way from
+# the top to the base, or to within tolerance_pct of the base.
+register_rule(
+    "exit",
+    "retrace_of_total_move_pct",
+    {"target_pct": Param(float, 50), "lookback_bars": Param(int, 20)},
+    lookback=lambda p, bar_seconds: p["lookback_bars"],
+)(None)
+register_rule(
+    "exit",
+    "cover_near_prior_breakout_base",
+    {"tolerance_pct": Param(float, 2), "lookback_bars": Param(int, 20)},
+    lookback=lambda p, bar_seconds: p["lookback_bars"],
+)(None)
+
+
+def _rule_mask(kind: str, name: str, params: dict, frame: IndicatorFrame) -> np.ndarray:
+    spec = RULES[kind].get(name)
+    if spec is None or spec.mask is None:
+        raise ValueError(f"No {kind} rule named {name}")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return spec.mask(frame, spec.bind(params))
+
+
+def entry_indicator_mask(indicator: str, params: dict, frame: IndicatorFrame) -> np.ndarray:
+    """One entry indicator as one boolean per bar over the whole series (no warm-up cut)."""
+    return _rule_mask("entry", indicator, params, frame)
+
+
+def confirmation_rule_mask(rule: str, params: dict, frame: IndicatorFrame) -> np.ndarray:
+    """One confirmation rule as one boolean per bar over the whole series (no warm-up cut)."""
+    return _rule_mask("confirmation", rule, params, frame)
+
+
+# --- per-bar forms for callers from before the registry (list[Bar] works as before) ---
+
+
+def _rule_at(kind: str, name: str, params: dict, bars: BarsLike, idx: int, frame: Optional[IndicatorFrame]) -> bool:
+    spec = RULES[kind].get(name)
+    if spec is not None and spec.scope == "symbol":
+        return True  # screens symbols, not bars
+    if frame is None:
+        frame = IndicatorFrame(as_series(bars)[: idx + 1])
+    return bool(_rule_mask(kind, name, params, frame)[idx])
 
 
 def eval_entry_indicator(
     indicator: str,
     params: dict,
-    bars: list[Bar],
+    bars: BarsLike,
     idx: int,
     prior_close: Optional[float] = None,
     context: Optional[dict] = None,
+    frame: Optional[IndicatorFrame] = None,
 ) -> bool:
-    """Return True if entry condition is satisfied."""
-    context = context or {}
-    b = bars[idx]
-    prev_bars = bars[: idx + 1]
-
-    if indicator == "percent_gain_from_prior_close":
-        if prior_close is None or prior_close <= 0:
-            return False
-        pct = (b.c - prior_close) / prior_close * 100
-        return pct >= params.get("min_threshold_pct", 0)
-
-    if indicator == "two_day_percent_gain":
-        if len(bars) < 3:
-            return False
-        two_ago = bars[max(0, idx - 2)].c
-        if two_ago <= 0:
-            return False
-        pct = (b.c - two_ago) / two_ago * 100
-        return pct >= params.get("min_threshold_pct", 0)
-
-    if indicator == "gap_up_pct":
-        if prior_close is None or prior_close <= 0 or idx == 0:
-            return False
-        gap = (b.o - prior_close) / prior_close * 100
-        return gap >= params.get("min_gap_pct", 0)
-
-    if indicator == "float_size_max":
-        max_float = params.get("max_float_millions", 40)
-        # No float data: use volume as proxy - pass if vol < 40M * 1e6
-        return True  # Stub: assume pass when no float data
-
-    if indicator == "volume_vs_float_ratio":
-        # Stub: no float data; use volume vs avg volume as proxy
-        if len(prev_bars) < 5:
-            return True
-        avg_v = sum(p.v for p in prev_bars[-5:]) / min(5, len(prev_bars))
-        return b.v >= avg_v * params.get("min_rotation_multiple", 1.0) if avg_v > 0 else True
-
-    if indicator == "percent_above_vwap":
-        vwap_val = _vwap(prev_bars)
-        if vwap_val is None or vwap_val <= 0:
-            return True
-        pct = (b.c - vwap_val) / vwap_val * 100
-        return pct >= params.get("min_pct", 0)
-
-    if indicator == "atr_multiple_extension":
-        period = params.get("lookback_period", 14)
-        atr_val = _atr(prev_bars, period)
-        if atr_val is None or atr_val <= 0 or prior_close is None:
-            return False
-        ext = (b.c - prior_close) / atr_val
-        return ext >= params.get("min_multiple", 0)
-
-    return True
+    """
+    Whether an entry indicator holds on bars[idx]: its registry mask at that row.
+    frame: precomputed indicator columns over bars; built from bars[: idx + 1] if omitted.
+    prior_close and context are ignored (the mask reads prior closes from the bars).
+    """
+    return _rule_at("entry", indicator, params, bars, idx, frame)
 
 
 def eval_confirmation_rule(
     rule: str,
     params: dict,
-    bars: list[Bar],
+    bars: BarsLike,
     idx: int,
     prior_close: Optional[float] = None,
+    frame: Optional[IndicatorFrame] = None,
 ) -> bool:
-    """Return True if confirmation rule is satisfied."""
-    b = bars[idx]
-    prev_bars = bars[: idx + 1]
-
-    if rule == "failed_breakout_within_n_bars":
-        n = params.get("bars", 3)
-        if idx < n:
-            return False
-        # Simplified: check if we had a high then lower closes
-        segment = bars[max(0, idx - n) : idx + 1]
-        if len(segment) < 2:
-            return False
-        high_idx = max(range(len(segment)), key=lambda i: segment[i].h)
-        return high_idx < len(segment) - 1
-
-    if rule == "first_lower_high_5min":
-        if idx < 2:
-            return False
-        highs = [prev_bars[i].h for i in range(max(0, idx - 5), idx + 1)]
-        return len(highs) >= 2 and highs[-1] < max(highs[:-1])
-
-    if rule == "upper_wick_ratio_threshold":
-        body = abs(b.c - b.o)
-        if body < 1e-9:
-            return False
-        upper_wick = b.h - max(b.o, b.c)
-        ratio = upper_wick / body
-        return ratio >= params.get("min_wick_to_body_ratio", 0)
-
-    if rule == "volume_climax_bar":
-        n = 5
-        if len(prev_bars) < n + 1:
-            return True
-        avg_v = sum(p.v for p in prev_bars[-n - 1 : -1]) / max(1, n)
-        return b.v >= avg_v * params.get("min_multiple_vs_5bar_avg", 1)
-
-    if rule == "declining_volume_on_bounce":
-        comp = params.get("comparison_bars", 3)
-        if idx < comp:
-            return True
-        recent = [prev_bars[i].v for i in range(idx - comp, idx + 1)]
-        return len(recent) >= 2 and recent[-1] <= recent[-2]
-
-    if rule == "daily_lower_high":
-        if idx < 2:
-            return False
-        return prev_bars[-1].h < max(prev_bars[-3].h, prev_bars[-2].h) if len(prev_bars) >= 3 else False
-
-    if rule == "break_of_morning_support":
-        return True  # Stub: need intraday structure
-
-    if rule == "close_below_previous_day_midpoint":
-        if idx < 1:
-            return False
-        prev = prev_bars[-2]
-        mid = (prev.h + prev.l) / 2
-        return b.c < mid
-
-    return True
+    """Whether a confirmation rule holds on bars[idx]: its registry mask at that row (see eval_entry_indicator)."""
+    return _rule_at("confirmation", rule, params, bars, idx, frame)
 
 
 def eval_exit_rule(
@@ -180,33 +524,28 @@ def eval_exit_rule(
     params: dict,
     entry_price: float,
     current_bar: Bar,
-    bars: list[Bar],
+    bars: BarsLike,
     position_pnl_pct: float,
+    frame: Optional[IndicatorFrame] = None,
+    idx: Optional[int] = None,
 ) -> tuple[bool, float]:
     """
-    Return (should_exit, exit_price_or_0).
+    Return (should_exit, exit_price_or_0) for the exits a bar decides on its own: the profit
+    target and the VWAP touch. Stops, trailing and retrace covers need the position's history;
+    app.strategies.simulator executes them (here they never fire).
+    bars ends at current_bar unless frame/idx locate it in a longer precomputed series.
     """
+    spec = get_rule("exit", exit_type)
+    if spec is None:
+        raise ValueError(f"No exit rule named {exit_type}")
+    p = spec.bind(params)
     if exit_type == "partial_cover_pct":
-        target = params.get("target_pct", 7)
-        if position_pnl_pct >= target:
-            return True, current_bar.c
-        return False, 0.0
-
+        return (True, current_bar.c) if position_pnl_pct >= p["target_pct"] else (False, 0.0)
     if exit_type == "vwap_touch_exit":
-        vwap_val = _vwap(bars) if bars else None
+        if frame is None:
+            frame = IndicatorFrame(as_series(bars))
+            idx = len(frame) - 1
+        vwap_val = value_at(frame.vwap(), idx) if len(frame) else None
         if vwap_val and current_bar.l <= vwap_val <= current_bar.h:
             return True, vwap_val
-        return False, 0.0
-
-    if exit_type == "structure_based_trailing":
-        return False, 0.0  # Stub
-
-    if exit_type == "retrace_of_total_move_pct":
-        target = params.get("target_pct", 50)
-        # Simplified: exit when we've retraced 50% from high
-        return False, 0.0  # Stub
-
-    if exit_type == "cover_near_prior_breakout_base":
-        return False, 0.0  # Stub
-
     return False, 0.0
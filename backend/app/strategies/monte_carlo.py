@@ -0,0 +1,143 @@
+"""
+Monte Carlo robustness of a backtest's trade list.
+Each trade becomes a return on the equity it was sized from (its pnl over the equity before it),
+and each simulation compounds num_trades of those returns from INITIAL_EQUITY: "bootstrap" draws
+them with replacement, "permutation" shuffles their order (the final pnl stays the backtest's;
+the path and its drawdown don't). Drawdown is measured on closed-trade equity, as in
+rule_engine.summarize_trades. Simulations run as (simulations x trades) matrices, BLOCK_SIZE
+simulations at a time in slices of at most _MAX_CELLS values, so memory stays bounded however many
+are asked for. Every block draws from its own seed, derived from the run's seed and its index, so
+shards of the run (block ranges, e.g. spread over the backtest process pool) produce exactly the
+simulations one process would.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.strategies.rule_engine import INITIAL_EQUITY
+
+METHODS = ("bootstrap", "permutation")
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+BLOCK_SIZE = 1024  # simulations per seeded block; shards split on block boundaries
+_MAX_CELLS = 1 << 20  # returns materialized at once (8 MB of float64)
+
+
+def trade_returns(pnl: np.ndarray) -> np.ndarray:
+    """Per-trade return on the closed-trade equity before it, for pnl in close order."""
+    pnl = np.asarray(pnl, dtype=np.float64)
+    before = INITIAL_EQUITY + np.concatenate(([0.0], np.cumsum(pnl)[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(before > 0, pnl / before, -1.0)
+
+
+def num_blocks(num_simulations: int) -> int:
+    return -(-num_simulations // BLOCK_SIZE)
+
+
+def shard_blocks(num_simulations: int, shards: int) -> list[tuple[int, int]]:
+    """Split the run's blocks into at most shards contiguous (start, stop) ranges."""
+    n = num_blocks(num_simulations)
+    shards = max(1, min(shards, n))
+    edges = np.linspace(0, n, shards + 1).round().astype(int)
+    return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+
+def _paths(returns: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Final pnl % and max drawdown % of each row of compounded returns."""
+    equity = np.cumprod(1.0 + returns, axis=1)
+    peak = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peak, 1.0, out=peak)
+    np.divide(equity, peak, out=peak)  # peak now holds equity / running peak
+    return (equity[:, -1] - 1.0) * 100, (1.0 - peak.min(axis=1)) * 100
+
+
+def simulate_blocks(
+    returns: np.ndarray,
+    method: str,
+    seed: int,
+    num_simulations: int,
+    start_block: int = 0,
+    stop_block: Optional[int] = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (final pnl %, max drawdown %) of the simulations in blocks [start_block, stop_block) of a
+    num_simulations run. Raises ValueError for an unknown method.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method {method!r}; expected one of {', '.join(METHODS)}")
+    returns = np.asarray(returns, dtype=np.float64)
+    stop_block = num_blocks(num_simulations) if stop_block is None else stop_block
+    first = start_block * BLOCK_SIZE
+    last = min(stop_block * BLOCK_SIZE, num_simulations)
+    pnl_pct = np.zeros(max(last - first, 0))
+    drawdown = np.zeros(max(last - first, 0))
+    n = len(returns)
+    if n == 0:
+        return pnl_pct, drawdown
+    rows = max(1, min(BLOCK_SIZE, _MAX_CELLS // n))
+    for block in range(start_block, stop_block):
+        rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(block,)))
+        lo = block * BLOCK_SIZE
+        hi = min(lo + BLOCK_SIZE, num_simulations)
+        for a in range(lo, hi, rows):
+            b = min(a + rows, hi)
+            if method == "bootstrap":
+                sample = returns[rng.integers(0, n, size=(b - a, n))]
+            else:
+                sample = rng.permuted(np.broadcast_to(returns, (b - a, n)), axis=1)
+            pnl_pct[a - first : b - first], drawdown[a - first : b - first] = _paths(sample)
+    return pnl_pct, drawdown
+
+
+def _percentiles(values: np.ndarray, percentiles: Sequence[float]) -> dict[str, float]:
+    if len(values) == 0:
+        return {f"{p:g}": 0.0 for p in percentiles}
+    return {f"{p:g}": round(float(v), 2) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+
+
+def summarize_simulations(
+    returns: np.ndarray,
+    pnl_pct: np.ndarray,
+    drawdown: np.ndarray,
+    method: str,
+    seed: int,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> dict:
+    """
+    Percentiles of the simulated pnl % and max drawdown % (keyed by percentile, e.g. "5"), the
+    share of simulations that lose money or draw down deeper than the backtest did (both in %),
+    and the backtest's own pnl % and max drawdown under "observed".
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    observed_pnl, observed_dd = _paths(returns[None, :]) if len(returns) else (np.zeros(1), np.zeros(1))
+    n = max(len(pnl_pct), 1)
+    return {
+        "method": method,
+        "seed": seed,
+        "num_simulations": len(pnl_pct),
+        "num_trades": len(returns),
+        "observed": {"pnl_pct": round(float(observed_pnl[0]), 2), "max_drawdown": round(float(observed_dd[0]), 2)},
+        "pnl_pct": _percentiles(pnl_pct, percentiles),
+        "max_drawdown": _percentiles(drawdown, percentiles),
+        "prob_loss": round(float(np.count_nonzero(pnl_pct < 0)) / n * 100, 2),
+        "prob_deeper_drawdown": round(float(np.count_nonzero(drawdown > observed_dd[0] + 1e-9)) / n * 100, 2),
+    }
+
+
+def new_seed() -> int:
+    """A fresh seed for a run that didn't ask for one (returned with the results so it can be repeated)."""
+    return int(np.random.SeedSequence().generate_state(1, np.uint64)[0] >> np.uint64(1))
+
+
+def run_monte_carlo(
+    pnl: np.ndarray,
+    num_simulations: int = 10_000,
+    method: str = "bootstrap",
+    seed: Optional[int] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+) -> dict:
+    """Resample a trade list's pnl (in close order) in this process; see summarize_simulations."""
+    seed = new_seed() if seed is None else seed
+    returns = trade_returns(pnl)
+    pnl_pct, drawdown = simulate_blocks(returns, method, seed, num_simulations)
+    return summarize_simulations(returns, pnl_pct, drawdown, method, seed, percentiles)
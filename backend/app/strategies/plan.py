@@ -0,0 +1,256 @@
+"""
+Compiled strategy plans.
+compile_config resolves every rule a StrategyConfig names against the rule registry
+(indicators.RULES) once: functions are looked up, parameters are checked and get their defaults
+bound, the columns the rules depend on are collected (each once, however many rules read it) and
+the warm-up lookback is the longest any rule declares. Configs naming rules the registry doesn't
+have, rules that need intraday bars on a daily backtest, or malformed parameters are refused
+with UnsupportedRuleError rather than run with rules that silently pass or fail.
+Configs with primary_timeframe daily_plus_5min_execution execute on 5-minute bars with daily
+context: their daily rules (RuleSpec.timeframe "daily") are compiled into daily_signals, masked
+once per session on the frame's daily series, and each 5-minute bar takes the result of the
+last completed session through the frame's day_of index map. Every other rule runs per 5-minute bar.
+The simulator and the streaming evaluator take a plan and call its functions
+directly, so nothing compares rule names per bar. PlanCache keeps one plan per strategy id and
+recompiles it when the strategy's updated_at changes.
+"""
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional, Union
+
+import numpy as np
+
+from app.strategies.config_schema import StrategyConfig
+from app.strategies.indicators import RuleSpec, get_rule
+from app.strategies.precompute import IndicatorFrame
+
+DAY_SECONDS = 86400
+MIN_LOOKBACK = 2  # every plan skips at least the bars without a prior close / two-bar history
+DAILY_PLUS_INTRADAY = "daily_plus_5min_execution"  # primary_timeframe: daily rules, 5-minute execution
+DAILY_PLUS_INTRADAY_RESOLUTION = "5min"
+
+# (config list, registry kind, attribute holding the rule name)
+_SECTIONS = (
+    ("entries", "entry", "indicator"),
+    ("confirmation_rules", "confirmation", "rule"),
+    ("exits", "exit", "type"),
+)
+
+
+class UnsupportedRuleError(ValueError):
+    """A config names rules the engine can't run; problems lists one message per rule."""
+
+    def __init__(self, problems: list[str]):
+        self.problems = problems
+        super().__init__("Unsupported strategy rules: " + "; ".join(problems))
+
+
+def _primary_timeframe(config: StrategyConfig) -> str:
+    return (config.backtest_assumptions and config.backtest_assumptions.primary_timeframe) or "5min"
+
+
+def has_daily_context(config: StrategyConfig) -> bool:
+    """The config executes on intraday bars and evaluates its daily rules on the daily series."""
+    return _primary_timeframe(config) == DAILY_PLUS_INTRADAY
+
+
+def backtest_resolution(config: StrategyConfig) -> str:
+    """Bar resolution a config backtests on: its primary timeframe, or the execution bars of a daily-context one."""
+    tf = _primary_timeframe(config)
+    return DAILY_PLUS_INTRADAY_RESOLUTION if tf == DAILY_PLUS_INTRADAY else tf
+
+
+def _bar_seconds(resolution: str) -> int:
+    from app.market_data.resolution import resolution_seconds  # market_data imports app.strategies.bars
+
+    try:
+        return resolution_seconds(resolution)
+    except ValueError:
+        return DAY_SECONDS
+
+
+@dataclass(frozen=True)
+class BoundRule:
+    """A registry rule with the parameters one config gives it (defaults filled in)."""
+
+    spec: RuleSpec
+    params: dict
+
+    @property
+    def name(self) -> str:
+        return self.spec.name
+
+
+@dataclass(frozen=True)
+class StrategyPlan:
+    config: StrategyConfig
+    signals: tuple[BoundRule, ...]  # entries then confirmation rules; a bar signals when every mask holds
+    daily_signals: tuple[BoundRule, ...]  # daily-context plans: rules masked on the daily series
+    exits: tuple[BoundRule, ...]  # in config order
+    symbol_filters: tuple[BoundRule, ...]  # screen symbols (e.g. float_size_max); not checked on bars
+    inputs: tuple[tuple, ...]  # IndicatorFrame.column keys every rule reads, each once
+    daily_inputs: tuple[tuple, ...]  # column keys daily_signals read on frame.daily()
+    lookback: int  # bars before row i any rule reads; no signals on the first lookback bars
+    sessions: int  # sessions before row i's those lookback bars reach on regular-session bars
+
+    def warm(self, frame: IndicatorFrame) -> None:
+        """Compute every column the plan's rules read (shared ones once)."""
+        for key in self.inputs:
+            frame.column(key)
+        if self.daily_signals:
+            daily = frame.daily()
+            for key in self.daily_inputs:
+                daily.column(key)
+
+    def signal_mask(
+        self,
+        frame: IndicatorFrame,
+        rule_mask: Optional[Callable[[BoundRule, IndicatorFrame], np.ndarray]] = None,
+    ) -> np.ndarray:
+        """
+        AND of every entry and confirmation mask past the warm-up: True where the strategy would
+        enter. Daily rules are masked once per session and reach each bar from the session
+        before it. rule_mask(rule, frame) replaces the rule's own mask (e.g. a sweep's cached masks).
+        """
+        rule_mask = rule_mask or _own_mask
+        mask = frame.positions() >= self.lookback
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for rule in self.signals:
+                mask &= rule_mask(rule, frame)
+            if self.daily_signals:
+                daily = frame.daily()
+                on_day = np.ones(len(daily), dtype=bool)
+                for rule in self.daily_signals:
+                    on_day &= rule_mask(rule, daily)
+                mask &= frame.from_previous_session(on_day, False)
+        return mask
+
+    def window_start(self, t: np.ndarray, i: int) -> int:
+        """
+        First row of a window (bar times t) to keep for rows i on to compute as on the whole
+        series: lookback bars back, and back to the start of the session `sessions` before row
+        i's, which lies further back when sessions hold more bars than a regular one.
+        """
+        start = max(i - self.lookback, 0)
+        if self.sessions and 0 < i < len(t):
+            day = t[: i + 1] // DAY_SECONDS
+            opens = np.flatnonzero(day[1:] != day[:-1]) + 1
+            k = len(opens) - self.sessions
+            start = min(start, int(opens[k - 1]) if k > 0 else 0)
+        return start
+
+    def exit_params(self, name: str) -> Optional[dict]:
+        """Bound parameters of the exit of this type (the last one if listed twice), or None."""
+        found = None
+        for rule in self.exits:
+            if rule.name == name:
+                found = rule.params
+        return found
+
+
+def _own_mask(rule: BoundRule, frame: IndicatorFrame) -> np.ndarray:
+    return rule.spec.mask(frame, rule.params)
+
+
+PlanLike = Union[StrategyConfig, StrategyPlan]
+
+
+def compile_config(config: StrategyConfig) -> StrategyPlan:
+    """Resolve config's rules against the registry and bind their parameters; raises UnsupportedRuleError."""
+    from app.market_data.resolution import session_bars  # market_data imports app.strategies.bars
+
+    resolution = backtest_resolution(config)
+    bar_seconds = _bar_seconds(resolution)
+    daily_context = has_daily_context(config)
+    bound: dict[str, list[BoundRule]] = {kind: [] for _, kind, _ in _SECTIONS}
+    daily: list[BoundRule] = []
+    filters: list[BoundRule] = []
+    problems: list[str] = []
+    for list_name, kind, attr in _SECTIONS:
+        for item in getattr(config, list_name):
+            name = getattr(item, attr)
+            spec = get_rule(kind, name)
+            if spec is None:
+                problems.append(f"{list_name}.{name} is not implemented")
+                continue
+            if spec.timeframe == "intraday" and bar_seconds >= DAY_SECONDS:
+                problems.append(f"{list_name}.{name} needs intraday bars; this config backtests on {resolution}")
+                continue
+            try:
+                rule = BoundRule(spec, spec.bind(item.parameters))
+            except ValueError as e:
+                problems.append(f"{list_name}.{e}")
+                continue
+            if spec.scope == "symbol":
+                filters.append(rule)
+            elif daily_context and spec.timeframe == "daily" and spec.mask is not None:
+                daily.append(rule)
+            else:
+                bound[kind].append(rule)
+    if problems:
+        raise UnsupportedRuleError(problems)
+
+    rules = bound["entry"] + bound["confirmation"] + bound["exit"]
+    inputs = dict.fromkeys(key for r in rules for key in r.spec.inputs(r.params))
+    daily_inputs = dict.fromkeys(key for r in daily for key in r.spec.inputs(r.params))
+    lookbacks = [r.spec.lookback(r.params, bar_seconds) for r in rules]
+    # A daily rule reading n sessions back, seen from the session after: the n + 1 sessions it
+    # reads and the current one must lie whole inside the bars a chunk keeps
+    per_session = session_bars(bar_seconds)
+    lookbacks += [(r.spec.lookback(r.params, DAY_SECONDS) + 2) * per_session for r in daily]
+    lookback = max([MIN_LOOKBACK] + lookbacks)
+    return StrategyPlan(
+        config=config,
+        signals=tuple(bound["entry"] + bound["confirmation"]),
+        daily_signals=tuple(daily),
+        exits=tuple(bound["exit"]),
+        symbol_filters=tuple(filters),
+        inputs=tuple(inputs),
+        daily_inputs=tuple(daily_inputs),
+        lookback=lookback,
+        sessions=-(-lookback // per_session),
+    )
+
+
+def as_plan(config: PlanLike) -> StrategyPlan:
+    """Accept a compiled plan or a StrategyConfig (compiled here)."""
+    if isinstance(config, StrategyPlan):
+        return config
+    return compile_config(config)
+
+
+class PlanCache:
+    """Compiled plans by strategy id; an entry is reused while the strategy's updated_at is unchanged."""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[datetime, StrategyPlan]] = OrderedDict()
+
+    def get(self, strategy_id: int, updated_at: Optional[datetime], config_json: str) -> StrategyPlan:
+        """The plan for the strategy as of updated_at; raises for an invalid config (nothing is cached)."""
+        entry = self._entries.get(strategy_id)
+        if entry is not None and updated_at is not None and entry[0] == updated_at:
+            self._entries.move_to_end(strategy_id)
+            return entry[1]
+        plan = compile_config(StrategyConfig.model_validate(json.loads(config_json)))
+        if updated_at is not None:
+            self._entries[strategy_id] = (updated_at, plan)
+            self._entries.move_to_end(strategy_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return plan
+
+    def invalidate(self, strategy_id: int) -> None:
+        self._entries.pop(strategy_id, None)
+
+
+_cache: Optional[PlanCache] = None
+
+
+def get_plan_cache() -> PlanCache:
+    global _cache
+    if _cache is None:
+        _cache = PlanCache()
+    return _cache
@@ -0,0 +1,175 @@
+"""
+Portfolio backtests: many (strategy, symbol) streams trading one account.
+Each stream is an EventSimulator over its own bars and signal mask (both built up front,
+vectorized), and all of them share an Account: entries are sized from the account's equity,
+the open short notional is capped at max_exposure times equity, and max_trades_per_day /
+max_daily_loss_pct count every stream's trades. A heap holds each stream's next event keyed
+by (bar time, event kind, stream), so the merged pass visits events in time order (exits
+before fills before new signals at the same time) and costs O(events log streams) on top of
+the per-stream precompute, instead of a step per stream for every bar time.
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.strategies.bars import BarsLike, as_series
+from app.strategies.plan import PlanLike, as_plan
+from app.strategies.precompute import precompute_indicators
+from app.strategies.rule_engine import INITIAL_EQUITY, MIN_BARS, RiskLimits, load_bars, summarize_trades
+from app.strategies.simulator import FILL_DTYPE, Account, EventSimulator
+
+# FILL_DTYPE with the stream each fill belongs to
+PORTFOLIO_FILL_DTYPE = np.dtype([("stream", np.int32)] + FILL_DTYPE.descr)
+
+
+@dataclass(frozen=True)
+class PortfolioStream:
+    config: PlanLike
+    symbol: str
+    bars: BarsLike
+
+
+@dataclass
+class PortfolioResult:
+    trades: list[dict]  # in the order they closed; each also has stream, symbol and strategy
+    fills: np.ndarray  # PORTFOLIO_FILL_DTYPE rows, by time
+    t: np.ndarray  # every bar time of any stream
+    equity: np.ndarray  # account equity marked to market at each of those times
+
+    def summary(self) -> dict:
+        return summarize_trades(self.trades)
+
+
+def _marks(fills: np.ndarray, closes: np.ndarray, commission_per_share: float) -> np.ndarray:
+    """A stream's realized plus open pnl at each of its bars, rebuilt from its fills."""
+    cash = np.zeros(len(closes))
+    shares = np.zeros(len(closes))
+    flow = -fills["qty"] * fills["price"] - np.abs(fills["qty"]) * commission_per_share
+    np.add.at(cash, fills["index"], flow)
+    np.add.at(shares, fills["index"], fills["qty"])
+    return np.cumsum(cash) + np.cumsum(shares) * closes
+
+
+def _account_curve(times: list[np.ndarray], marks: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    """Merge per-stream pnl series into account equity: sum their changes in time order, keep each time's last value."""
+    if not times:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    t = np.concatenate(times)
+    deltas = np.concatenate([np.diff(m, prepend=0.0) for m in marks])
+    order = np.argsort(t, kind="stable")
+    t = t[order]
+    equity = INITIAL_EQUITY + np.cumsum(deltas[order])
+    last = np.r_[t[1:] != t[:-1], True]
+    return t[last], equity[last]
+
+
+def simulate_portfolio(
+    streams: Iterable[PortfolioStream],
+    max_daily_loss_pct: Optional[float] = None,
+    max_trades_per_day: Optional[int] = None,
+    max_exposure: Optional[float] = 1.0,
+) -> PortfolioResult:
+    """
+    Run every stream against one account in a single time-ordered pass. The daily limits
+    default to the strictest any stream's config sets; max_exposure=None lifts the capital cap.
+    Streams with fewer than MIN_BARS bars don't trade.
+    """
+    streams = list(streams)
+    plans = [as_plan(s.config) for s in streams]
+    limits = [RiskLimits.from_config(p.config) for p in plans]
+    account = Account(
+        max_daily_loss_pct=max_daily_loss_pct if max_daily_loss_pct is not None
+        else min((x.max_daily_loss_pct for x in limits), default=3.0),
+        max_trades_per_day=max_trades_per_day if max_trades_per_day is not None
+        else min((x.max_trades_per_day for x in limits), default=5),
+        max_exposure=max_exposure,
+    )
+
+    sims: list[EventSimulator] = []
+    ids: list[int] = []
+    closes: list[np.ndarray] = []
+    times: list[np.ndarray] = []
+    for sid, (stream, plan, lim) in enumerate(zip(streams, plans, limits)):
+        bars = as_series(stream.bars)
+        if len(bars) < MIN_BARS:
+            continue
+        frame = precompute_indicators(bars, plan)
+        sim = EventSimulator(plan, limits=lim, account=account)
+        sim.load(frame, plan.signal_mask(frame), len(bars), final=True)
+        sims.append(sim)
+        ids.append(sid)
+        closes.append(bars.c)
+        times.append(bars.t)
+
+    heap = []
+    for k, sim in enumerate(sims):
+        event = sim.next_event()
+        if event is not None:
+            heap.append((*event, k))
+    heapq.heapify(heap)
+    trades: list[dict] = []
+    while heap:
+        _, _, k = heapq.heappop(heap)
+        sim = sims[k]
+        closed = len(sim.trades)
+        sim.step()
+        if len(sim.trades) > closed:
+            stream = streams[ids[k]]
+            trades.append({
+                **sim.trades[-1],
+                "stream": ids[k],
+                "symbol": stream.symbol,
+                "strategy": sim.config.name,
+            })
+        event = sim.next_event()
+        if event is not None:
+            heapq.heappush(heap, (*event, k))
+
+    parts, marks = [], []
+    for sid, sim, c in zip(ids, sims, closes):
+        f = sim.result().fills
+        part = np.empty(len(f), PORTFOLIO_FILL_DTYPE)
+        part["stream"] = sid
+        for name in FILL_DTYPE.names:
+            part[name] = f[name]
+        parts.append(part)
+        marks.append(_marks(f, c, sim.options.commission_per_share))
+    fills = np.concatenate(parts) if parts else np.empty(0, PORTFOLIO_FILL_DTYPE)
+    fills = fills[np.argsort(fills["t"], kind="stable")]
+    t, equity = _account_curve(times, marks)
+    return PortfolioResult(trades=trades, fills=fills, t=t, equity=equity)
+
+
+def run_portfolio_backtest(
+    streams: Iterable[tuple[PlanLike, str]],
+    start_date: datetime,
+    end_date: datetime,
+    **limits,
+) -> dict:
+    """
+    simulate_portfolio over (config or plan, symbol) pairs, with bars read from the bar cache.
+    Returns the account's summary metrics plus num_trades and pnl per stream.
+    """
+    pairs = [(as_plan(config), symbol) for config, symbol in streams]
+    result = simulate_portfolio(
+        (PortfolioStream(plan, symbol, load_bars(plan.config, symbol, start_date, end_date)) for plan, symbol in pairs),
+        **limits,
+    )
+    per_stream = [
+        {"strategy": plan.config.name, "symbol": symbol, "num_trades": 0, "pnl": 0.0} for plan, symbol in pairs
+    ]
+    for trade in result.trades:
+        row = per_stream[trade["stream"]]
+        row["num_trades"] += 1
+        row["pnl"] += trade["pnl"]
+    for row in per_stream:
+        row["pnl"] = round(row["pnl"], 2)
+    return {
+        "start_time": start_date,
+        "end_time": end_date,
+        **result.summary(),
+        "streams": per_stream,
+    }
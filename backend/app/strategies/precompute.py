@@ -0,0 +1,284 @@
+"""
+Indicator precompute stage: builds whole-series indicator columns once per backtest.
+Every column is O(n) (cumulative sums or fixed-width windows) and only looks backward,
+so column[i] depends on bars[: i + 1] alone. Missing values (warm-up) are NaN.
+A frame can also cover one chunk of a longer series: given a FrameOrigin (running sums and
+the previous close carried from the chunk before), its columns continue the whole-series
+arithmetic, so every row a plan keeps its warm-up for (StrategyPlan.window_start) is bit-for-bit the same.
+Intraday frames also carry a daily series (one bar per UTC session, aggregated from their own
+bars) and day_of, the index map from each bar to its session's row, so daily columns reach
+intraday rows by one fancy-index instead of a lookup per bar.
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from app.strategies.bars import BarSeries, BarsLike, as_series
+
+
+def _cumsum0(x: np.ndarray, start: float = 0.0) -> np.ndarray:
+    """
+    Running sum with a leading start value (the total before x) so window sums are
+    cs[i + 1] - cs[i + 1 - n]. Accumulated left to right, like one cumsum over the whole series.
+    """
+    out = np.empty(len(x) + 1, dtype=np.float64)
+    out[0] = start
+    out[1:] = x
+    np.cumsum(out, out=out)
+    return out
+
+
+def _window_mean(cs: np.ndarray, n: int, lag: int = 0) -> np.ndarray:
+    """Mean of the n values ending at i - lag, from running sums cs; NaN until a full window exists."""
+    size = len(cs) - 1
+    out = np.full(size, np.nan)
+    if n <= 0 or size < n + lag:
+        return out
+    sums = cs[n:] - cs[:-n]  # sums[k] covers x[k : k + n]
+    out[n - 1 + lag :] = sums[: size - n + 1 - lag] / n
+    return out
+
+
+def _window_max(x: np.ndarray, n: int, lag: int = 0) -> np.ndarray:
+    """Max of up to n values ending at i - lag (partial windows allowed at the start)."""
+    out = np.full(len(x), np.nan)
+    if n <= 0 or len(x) <= lag:
+        return out
+    padded = np.concatenate((np.full(n - 1, -np.inf), x))
+    m = sliding_window_view(padded, n).max(axis=1)
+    out[lag:] = m[: len(x) - lag]
+    return out
+
+
+def _window_min(x: np.ndarray, n: int, lag: int = 0) -> np.ndarray:
+    return -_window_max(-x, n, lag)
+
+
+@dataclass
+class FrameOrigin:
+    """Where a frame's bars start in a longer series, and the state its columns continue from."""
+
+    index: int = 0  # position of bars[0] in the whole series
+    prior_close: Optional[float] = None  # close of the bar before bars[0]
+    totals: dict[str, float] = field(default_factory=dict)  # running sums up to bars[0], by input
+
+
+_SUMMED_INPUTS = ("o", "h", "l", "c", "v", "typical_pv", "true_range")
+
+
+class IndicatorFrame:
+    """
+    Lazily computed, cached indicator columns over one BarSeries.
+    Columns are keyed by (name, params) so rules that share an input (e.g. ATR(14)) share the array.
+    """
+
+    def __init__(self, bars: BarsLike, origin: Optional[FrameOrigin] = None):
+        self.bars: BarSeries = as_series(bars)
+        self.origin = origin or FrameOrigin()
+        self._cache: dict[tuple, np.ndarray] = {}
+        self._daily: Optional["IndicatorFrame"] = None
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def positions(self) -> np.ndarray:
+        """Index of each bar in the whole series."""
+        return np.arange(self.origin.index, self.origin.index + len(self.bars))
+
+    def running_sum(self, name: str) -> np.ndarray:
+        """_cumsum0 of an input column (a bar field, typical_pv or true_range), continuing from the origin."""
+        def build():
+            if self.origin.index and name not in self.origin.totals:
+                raise ValueError(f"Running sum of {name} was not carried into this frame")
+            x = getattr(self.bars, name) if len(name) == 1 else getattr(self, name)()
+            return _cumsum0(x, self.origin.totals.get(name, 0.0))
+        return self._get(("running_sum", name), build)
+
+    def origin_at(self, k: int) -> FrameOrigin:
+        """Origin for a frame starting at bars[k], carrying every running sum this frame holds."""
+        totals = {}
+        for name in _SUMMED_INPUTS:
+            cs = self._cache.get(("running_sum", name))
+            if cs is not None:
+                totals[name] = float(cs[k])
+        prior = float(self.bars.c[k - 1]) if k > 0 else self.origin.prior_close
+        return FrameOrigin(self.origin.index + k, prior, totals)
+
+    def _get(self, key: tuple, build) -> np.ndarray:
+        col = self._cache.get(key)
+        if col is None:
+            col = build()
+            self._cache[key] = col
+        return col
+
+    def prior_close(self) -> np.ndarray:
+        """Close of the previous bar (bar 0 uses its own close)."""
+        def build():
+            c = self.bars.c
+            out = np.empty_like(c)
+            if len(c):
+                out[0] = c[0] if self.origin.prior_close is None else self.origin.prior_close
+                out[1:] = c[:-1]
+            return out
+        return self._get(("prior_close",), build)
+
+    def typical_pv(self) -> np.ndarray:
+        b = self.bars
+        return self._get(("typical_pv",), lambda: (b.h + b.l + b.c) / 3 * b.v)
+
+    def vwap(self) -> np.ndarray:
+        """Cumulative VWAP from the first bar of the series."""
+        def build():
+            pv = self.running_sum("typical_pv")[1:]
+            vol = self.running_sum("v")[1:]
+            out = np.full(len(vol), np.nan)
+            ok = vol > 0
+            out[ok] = pv[ok] / vol[ok]
+            return out
+        return self._get(("vwap",), build)
+
+    def session_vwap(self) -> np.ndarray:
+        """
+        VWAP of each bar's session so far, restarting at the session's first bar: differences of
+        the running sums against their values at that bar (on daily bars, the bar's typical price).
+        """
+        def build():
+            day = self.day_of()
+            opens = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])[day]
+            pv_cs, vol_cs = self.running_sum("typical_pv"), self.running_sum("v")
+            pv = pv_cs[1:] - pv_cs[opens]
+            vol = vol_cs[1:] - vol_cs[opens]
+            out = np.full(len(vol), np.nan)
+            ok = vol > 0
+            out[ok] = pv[ok] / vol[ok]
+            return out
+        return self._get(("session_vwap",), build)
+
+    def true_range(self) -> np.ndarray:
+        def build():
+            b = self.bars
+            tr = b.h - b.l
+            k = 1 if self.origin.prior_close is None else 0  # bar 0 of the whole series has no prior close
+            if len(b) > k:
+                pc = self.prior_close()[k:]
+                h, l = b.h[k:], b.l[k:]
+                tr[k:] = np.maximum(h - l, np.maximum(np.abs(h - pc), np.abs(l - pc)))
+            return tr
+        return self._get(("true_range",), build)
+
+    def atr(self, period: int = 14) -> np.ndarray:
+        """Simple-average ATR over the last `period` true ranges; NaN until bar `period`."""
+        def build():
+            out = _window_mean(self.running_sum("true_range"), period)
+            if period > 0:
+                out[: max(period - self.origin.index, 0)] = np.nan  # first TR has no prior close
+            return out
+        return self._get(("atr", period), build)
+
+    def sma(self, period: int, column: str = "c") -> np.ndarray:
+        return self._get(("sma", period, column), lambda: _window_mean(self.running_sum(column), period))
+
+    def avg_volume(self, n: int, lag: int = 0) -> np.ndarray:
+        """Average volume of the n bars ending at i - lag."""
+        return self._get(("avg_volume", n, lag), lambda: _window_mean(self.running_sum("v"), n, lag))
+
+    def rolling_high(self, n: int, lag: int = 0) -> np.ndarray:
+        return self._get(("rolling_high", n, lag), lambda: _window_max(self.bars.h, n, lag))
+
+    def rolling_low(self, n: int, lag: int = 0) -> np.ndarray:
+        return self._get(("rolling_low", n, lag), lambda: _window_min(self.bars.l, n, lag))
+
+    def morning_low(self, minutes: int) -> np.ndarray:
+        """
+        Lowest low of the bars that opened in the first `minutes` of the regular session, from the
+        first bar after that window to the day's end; NaN before and inside the window and on days
+        without a morning bar.
+        """
+        from app.market_data.resolution import DAY_SECONDS, SESSION_OPEN  # market_data imports app.strategies.bars
+
+        def build():
+            t = self.bars.t
+            out = np.full(len(t), np.nan)
+            if not len(t):
+                return out
+            tod = t % DAY_SECONDS
+            morning = (tod >= SESSION_OPEN) & (tod < SESSION_OPEN + minutes * 60)
+            day = t // DAY_SECONDS
+            starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+            lows = np.minimum.reduceat(np.where(morning, self.bars.l, np.inf), starts)
+            lows = np.repeat(lows, np.diff(np.r_[starts, len(t)]))
+            ok = (tod >= SESSION_OPEN + minutes * 60) & np.isfinite(lows)
+            out[ok] = lows[ok]
+            return out
+        return self._get(("morning_low", minutes), build)
+
+    def day_of(self) -> np.ndarray:
+        """Row of each bar's session (UTC day) in daily(): 0 for the frame's first session."""
+        from app.market_data.resolution import DAY_SECONDS  # market_data imports app.strategies.bars
+
+        def build():
+            day = self.bars.t // DAY_SECONDS
+            return np.cumsum(np.r_[False, day[1:] != day[:-1]], dtype=np.int64)
+        return self._get(("day_of",), build)
+
+    def daily(self) -> "IndicatorFrame":
+        """
+        Frame over one bar per session of this frame's bars (first open, max high, min low, last
+        close, summed volume). The first session may be cut off by the start of a chunk; rules
+        reading daily rows declare lookbacks that keep the rows they read whole.
+        """
+        from app.market_data.resample import resample  # market_data imports app.strategies.bars
+
+        if self._daily is None:
+            self._daily = IndicatorFrame(resample(self.bars, "1D"))
+        return self._daily
+
+    def from_previous_session(self, daily_col: np.ndarray, fill, sessions: int = 1) -> np.ndarray:
+        """
+        A column over daily() mapped onto this frame's bars: each bar gets the value of the session
+        `sessions` before its own (fill in the first `sessions` sessions).
+        """
+        prev = self.day_of() - sessions
+        out = np.full(len(prev), fill, dtype=daily_col.dtype)
+        ok = prev >= 0
+        out[ok] = daily_col[prev[ok]]
+        return out
+
+    def previous_day_midpoint(self) -> np.ndarray:
+        """Midpoint of the previous session's range (NaN in the frame's first session)."""
+        def build():
+            d = self.daily().bars
+            return self.from_previous_session((d.h + d.l) / 2, np.nan)
+        return self._get(("previous_day_midpoint",), build)
+
+    def session_open(self) -> np.ndarray:
+        """Open of each bar's session (on daily bars, the bar's own open)."""
+        return self._get(("session_open",), lambda: self.daily().bars.o[self.day_of()])
+
+    def prior_session_close(self, sessions: int = 1) -> np.ndarray:
+        """Close of the session `sessions` before each bar's (on daily bars, that many bars back; NaN before)."""
+        return self._get(
+            ("prior_session_close", sessions), lambda: self.from_previous_session(self.daily().bars.c, np.nan, sessions)
+        )
+
+    def column(self, key: tuple) -> np.ndarray:
+        """A column by the key rules declare as an input: (method name, *arguments), e.g. ("atr", 14)."""
+        return getattr(self, key[0])(*key[1:])
+
+
+def value_at(col: np.ndarray, idx: int) -> Optional[float]:
+    """Column value as float, or None for NaN (not enough history)."""
+    v = float(col[idx])
+    return None if v != v else v
+
+
+def precompute_indicators(bars: BarsLike, config=None, origin: Optional[FrameOrigin] = None) -> IndicatorFrame:
+    """Build an IndicatorFrame and warm the columns a config's (or compiled plan's) rules read."""
+    from app.strategies.plan import as_plan  # the plan compiles against rules built on this module
+
+    frame = IndicatorFrame(bars, origin)
+    if config is not None:
+        as_plan(config).warm(frame)
+    return frame
@@ -0,0 +1,337 @@
+"""
+Strategy scanner: a config's entry rules over a whole symbol universe, one cross-section per tick.
+Per-symbol state (bar count, the last close, the session's open and earlier sessions' closes,
+the running VWAP sums and their values at the session's open, rolling-window totals) is held in
+arrays with one row per symbol and updated at once for every symbol that printed a bar in the
+tick. Each entry rule's scan
+(indicators.RuleSpec.scan, registered next to its mask) is a vectorized check over those rows, and
+a tick stacks the checks into one (rules x symbols) matrix whose column-wise AND is the match.
+The checks use IndicatorFrame's arithmetic, so a symbol matches on the bars where the backtest's
+entry mask holds past warm-up (plan.signal_mask of scan_plan on its own bars).
+Daily entries of a daily-context plan run on a second universe of completed sessions, checked when
+a symbol's session finishes, as streaming.DailySignals does (the streaming evaluator runs the same
+checks on one symbol's ticks). float_size_max screens the symbols whose float is known; the rest
+pass, as in the backtest, which has no float data, and each ScanResult lists the filter under
+unchecked_filters as a backtest's metrics do.
+"""
+from dataclasses import dataclass, field
+from typing import Iterator, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.strategies.bars import BarsLike, BarSeries, as_series
+from app.strategies.plan import DAY_SECONDS, BoundRule, PlanLike, StrategyPlan, UnsupportedRuleError, compile_config
+
+
+class UniverseRollingMean:
+    """
+    streaming.RollingMean for every symbol at once: a ring of each row's last n + lag + 1 running
+    totals, so a window mean is one difference (the same arithmetic as IndicatorFrame's columns).
+    """
+
+    def __init__(self, size: int, n: int, lag: int = 0):
+        self.n = n
+        self.lag = lag
+        self._slots = n + lag + 1
+        self._total = np.zeros(size)
+        self._totals = np.zeros((size, self._slots))  # slot k % slots holds the total after k pushes
+        self._count = np.zeros(size, dtype=np.int64)
+
+    def push(self, rows: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Push x for rows; their means (NaN until a full window exists)."""
+        total = self._total[rows] + x
+        count = self._count[rows] + 1
+        self._total[rows] = total
+        self._count[rows] = count
+        self._totals[rows, count % self._slots] = total
+        out = np.full(len(rows), np.nan)
+        if self.n > 0:
+            ok = count >= self.n + self.lag
+            r, m = rows[ok], count[ok]
+            out[ok] = (self._totals[r, (m - self.lag) % self._slots] - self._totals[r, (m - self.n - self.lag) % self._slots]) / self.n
+        return out
+
+
+class UniverseRollingMax:
+    """
+    streaming.RollingHigh for every symbol at once: a ring of each row's last n + lag values, the
+    window's max taken over up to n of them (partial windows at the start, as IndicatorFrame's).
+    """
+
+    def __init__(self, size: int, n: int, lag: int = 0):
+        self.n = n
+        self.lag = lag
+        self._slots = max(n + lag, 1)
+        self._ring = np.full((size, self._slots), -np.inf)  # slot k % slots holds push k
+        self._count = np.zeros(size, dtype=np.int64)
+
+    def push(self, rows: np.ndarray, x: np.ndarray) -> np.ndarray:
+        """Push x for rows; the max of up to n values ending lag pushes ago (NaN until lag + 1 pushes)."""
+        count = self._count[rows]
+        self._ring[rows, count % self._slots] = x
+        count = count + 1
+        self._count[rows] = count
+        out = np.full(len(rows), np.nan)
+        if self.n > 0:
+            ok = count > self.lag
+            r, k = rows[ok], (count[ok] - self.lag - 1)[:, None] - np.arange(self.n)
+            out[ok] = np.where(k >= 0, self._ring[r[:, None], k % self._slots], -np.inf).max(axis=1)
+        return out
+
+
+@dataclass
+class UniverseTick:
+    """One tick's columns for the rows that printed: the new bar and what the rules read."""
+
+    rows: np.ndarray
+    index: np.ndarray  # each row's bar count before this bar (its position in its series)
+    o: np.ndarray
+    h: np.ndarray
+    l: np.ndarray
+    c: np.ndarray
+    v: np.ndarray
+    prior_close: np.ndarray  # previous bar's close (the bar's own on a symbol's first bar)
+    prior_volume: np.ndarray  # previous bar's volume (NaN on a symbol's first bar)
+    values: dict[tuple, np.ndarray]  # rolling and session inputs by IndicatorFrame.column key
+
+
+class _Universe:
+    """Bar state of every symbol for one timeframe, with the rolling inputs the rules declare."""
+
+    def __init__(self, size: int, inputs: Sequence[tuple]):
+        from app.market_data.resolution import SESSION_OPEN  # market_data imports app.strategies.bars
+
+        self._session_start = SESSION_OPEN
+        self.count = np.zeros(size, dtype=np.int64)
+        self._last = np.zeros(size)
+        self._last_v = np.full(size, np.nan)
+        self._day = np.full(size, -1, dtype=np.int64)
+        self._session_open = np.zeros(size)
+        self._back = {k: k[1] for k in inputs if k[0] == "prior_session_close"}
+        # Column j: close of the session j + 1 before each row's current one
+        self._closes = np.full((size, max(self._back.values(), default=0)), np.nan)
+        # Running VWAP sums since each row's first bar, and their values when its session opened
+        self._pv = np.zeros(size)
+        self._volume = np.zeros(size)
+        self._open_pv = np.zeros(size)
+        self._open_volume = np.zeros(size)
+        self._avg_volume = {k: UniverseRollingMean(size, k[1], k[2]) for k in inputs if k[0] == "avg_volume"}
+        self._atr = {k: UniverseRollingMean(size, k[1]) for k in inputs if k[0] == "atr"}
+        self._highs = {k: UniverseRollingMax(size, k[1], k[2]) for k in inputs if k[0] == "rolling_high"}
+        self._morning = {k: np.full(size, np.inf) for k in inputs if k[0] == "morning_low"}
+        # The current session's range, and the previous one's midpoint
+        self._midpoint = np.full(size, np.nan) if ("previous_day_midpoint",) in inputs else None
+        self._high = np.zeros(size)
+        self._low = np.zeros(size)
+
+    def update(self, rows, t, o, h, l, c, v) -> UniverseTick:
+        index = self.count[rows]
+        first = index == 0
+        last = np.where(first, c, self._last[rows])
+        last_v = self._last_v[rows]
+        self._last[rows] = c
+        self._last_v[rows] = v
+        self.count[rows] = index + 1
+
+        day = t // DAY_SECONDS
+        new = day != self._day[rows]
+        self._day[rows] = day
+        fresh = rows[new]
+        self._session_open[fresh] = o[new]
+        self._open_pv[fresh] = self._pv[fresh]
+        self._open_volume[fresh] = self._volume[fresh]
+        if self._closes.shape[1]:
+            self._closes[fresh, 1:] = self._closes[fresh, :-1]
+            self._closes[fresh, 0] = np.where(first[new], np.nan, last[new])
+        for low in self._morning.values():
+            low[fresh] = np.inf
+        if self._midpoint is not None:
+            self._midpoint[fresh] = np.where(first[new], np.nan, (self._high[fresh] + self._low[fresh]) / 2)
+            self._high[fresh] = h[new]
+            self._low[fresh] = l[new]
+            self._high[rows] = np.maximum(self._high[rows], h)
+            self._low[rows] = np.minimum(self._low[rows], l)
+
+        self._pv[rows] += (h + l + c) / 3 * v
+        self._volume[rows] += v
+        pv = self._pv[rows] - self._open_pv[rows]
+        volume = self._volume[rows] - self._open_volume[rows]
+        vwap = np.full(len(rows), np.nan)
+        ok = volume > 0
+        vwap[ok] = pv[ok] / volume[ok]
+
+        values = {key: mean.push(rows, v) for key, mean in self._avg_volume.items()}
+        values[("session_vwap",)] = vwap
+        values[("session_open",)] = self._session_open[rows]
+        for key, mx in self._highs.items():
+            values[key] = mx.push(rows, h)
+        if self._morning:
+            tod = t % DAY_SECONDS
+            for key, low in self._morning.items():
+                cutoff = self._session_start + key[1] * 60
+                morning = (tod >= self._session_start) & (tod < cutoff)
+                low[rows[morning]] = np.minimum(low[rows[morning]], l[morning])
+                values[key] = np.where((tod >= cutoff) & (low[rows] < np.inf), low[rows], np.nan)
+        if self._midpoint is not None:
+            values[("previous_day_midpoint",)] = self._midpoint[rows]
+        for key, n in self._back.items():
+            values[key] = self._closes[rows, n - 1]
+        if self._atr:
+            tr = np.where(first, h - l, np.maximum(h - l, np.maximum(np.abs(h - last), np.abs(l - last))))
+            for key, mean in self._atr.items():
+                atr = mean.push(rows, tr)
+                atr[index + 1 <= key[1]] = np.nan  # the first true range has no prior close
+                values[key] = atr
+        return UniverseTick(rows, index, o, h, l, c, v, last, last_v, values)
+
+
+def check_all(checks: list, tick: UniverseTick) -> np.ndarray:
+    """Every check on every row of the tick as one (rules x rows) matrix, ANDed down each column."""
+    if not checks:
+        return np.ones(len(tick.rows), dtype=bool)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.vstack([fn(tick, p) for fn, p in checks]).all(axis=0)
+
+
+def resolve_checks(rules: tuple[BoundRule, ...]) -> list:
+    """Each rule's incremental check (RuleSpec.scan) with its parameters; raises UnsupportedRuleError."""
+    missing = [f"{r.spec.kind}.{r.name} has no incremental check" for r in rules if r.spec.scan is None]
+    if missing:
+        raise UnsupportedRuleError(missing)
+    return [(r.spec.scan, r.params) for r in rules]
+
+
+class _DailySessions:
+    """
+    Daily entries of a daily-context plan. Each row aggregates its current session the way
+    IndicatorFrame.daily() does; when a bar opens a new session the finished one is pushed into a
+    universe of daily bars and checked, and ok holds the result for the new session's bars.
+    """
+
+    def __init__(self, size: int, rules: tuple[BoundRule, ...]):
+        self._checks = resolve_checks(rules)
+        self._days = _Universe(size, [k for r in rules for k in r.spec.inputs(r.params)])
+        self._day = np.full(size, -1, dtype=np.int64)
+        self._o = np.zeros(size)
+        self._h = np.zeros(size)
+        self._l = np.zeros(size)
+        self._c = np.zeros(size)
+        self._v = np.zeros(size)
+        self.ok = np.zeros(size, dtype=bool)
+
+    def update(self, rows, t, o, h, l, c, v) -> np.ndarray:
+        day = t // DAY_SECONDS
+        new = day != self._day[rows]
+        done = rows[new & (self._day[rows] >= 0)]
+        if len(done):
+            tick = self._days.update(
+                done, self._day[done] * DAY_SECONDS, self._o[done], self._h[done], self._l[done], self._c[done], self._v[done]
+            )
+            self.ok[done] = check_all(self._checks, tick)
+        fresh = rows[new]
+        self._day[fresh] = day[new]
+        self._o[fresh] = o[new]
+        self._h[fresh] = -np.inf
+        self._l[fresh] = np.inf
+        self._v[fresh] = 0.0
+        self._h[rows] = np.maximum(self._h[rows], h)
+        self._l[rows] = np.minimum(self._l[rows], l)
+        self._c[rows] = c
+        self._v[rows] += v
+        return self.ok[rows]
+
+
+def scan_plan(config: PlanLike) -> StrategyPlan:
+    """
+    The config's entries compiled on their own (confirmations time a trade within a setup and
+    exits manage it; neither decides which symbols are in play). Raises UnsupportedRuleError.
+    """
+    config = config.config if isinstance(config, StrategyPlan) else config
+    plan = compile_config(config.model_copy(update={"confirmation_rules": [], "exits": []}))
+    if not (plan.signals or plan.daily_signals or plan.symbol_filters):
+        raise UnsupportedRuleError(["entries: the config has no entry rules to scan"])
+    return plan
+
+
+@dataclass
+class ScanResult:
+    t: int  # bar time of the tick
+    scanned: int  # symbols that printed a bar in it
+    symbols: list[str]  # those whose bar matched every entry rule
+    unchecked_filters: list[str] = field(default_factory=list)  # symbol filters some symbols passed unchecked
+
+    def as_dict(self) -> dict:
+        out = {"t": self.t, "scanned": self.scanned, "symbols": self.symbols}
+        if self.unchecked_filters:
+            out["unchecked_filters"] = self.unchecked_filters
+        return out
+
+
+class UniverseScanner:
+    """
+    Entry-rule scan of a fixed symbol universe. Feed closed bars with update() (one tick's rows) or
+    feed() (per-symbol series, split into ticks by bar time). floats maps symbols to share float in
+    millions for float_size_max.
+    """
+
+    def __init__(self, config: PlanLike, symbols: Sequence[str], floats: Optional[Mapping[str, float]] = None):
+        self.plan = plan = scan_plan(config)
+        self.symbols = list(dict.fromkeys(s.upper().strip() for s in symbols if s and s.strip()))
+        self._row = {s: i for i, s in enumerate(self.symbols)}
+        size = len(self.symbols)
+        self._bars = _Universe(size, plan.inputs)
+        self._checks = resolve_checks(plan.signals)
+        self._daily = _DailySessions(size, plan.daily_signals) if plan.daily_signals else None
+        self._last_t = np.full(size, np.iinfo(np.int64).min, dtype=np.int64)
+        self.eligible = np.ones(size, dtype=bool)
+        float_m = np.array([(floats or {}).get(s, np.nan) for s in self.symbols], dtype=np.float64)
+        for rule in plan.symbol_filters:
+            if rule.name == "float_size_max":
+                self.eligible &= ~(float_m > rule.params["max_float_millions"])
+        self.unchecked_filters = [r.name for r in plan.symbol_filters] if np.isnan(float_m).any() else []
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def update(self, rows, t, o, h, l, c, v) -> np.ndarray:
+        """
+        One tick: rows (distinct symbol indices) printed the bars o..v at times t (one per row, or a
+        scalar). Returns the rows that matched, in the order given.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        t = np.broadcast_to(np.asarray(t, dtype=np.int64), rows.shape)
+        o, h, l, c, v = (np.asarray(x, dtype=np.float64) for x in (o, h, l, c, v))
+        self._last_t[rows] = t
+        tick = self._bars.update(rows, t, o, h, l, c, v)
+        ok = (tick.index >= self.plan.lookback) & self.eligible[rows]
+        if self._daily is not None:
+            ok &= self._daily.update(rows, t, o, h, l, c, v)
+        ok &= check_all(self._checks, tick)
+        return rows[ok]
+
+    def feed(self, bars: Mapping[str, BarsLike]) -> Iterator[ScanResult]:
+        """
+        Per-symbol bars (each time-ordered; bars at or before one a symbol already had are skipped)
+        merged into ticks by bar time and scanned in time order; one ScanResult per tick.
+        """
+        rows, parts = [], []
+        for symbol, series in bars.items():
+            row = self._row.get(symbol.upper().strip())
+            series = as_series(series) if series is not None else None
+            if row is None or series is None or not len(series):
+                continue
+            series = series[int(np.searchsorted(series.t, self._last_t[row], side="right")) :]
+            if len(series):
+                rows.append(np.full(len(series), row, dtype=np.int64))
+                parts.append(series)
+        if not parts:
+            return
+        row = np.concatenate(rows)
+        merged = BarSeries.concat(parts)
+        order = np.lexsort((row, merged.t))
+        row = row[order]
+        t, o, h, l, c, v = (getattr(merged, k)[order] for k in ("t", "o", "h", "l", "c", "v"))
+        starts = np.flatnonzero(np.r_[True, t[1:] != t[:-1]])
+        for a, b in zip(starts, np.r_[starts[1:], len(t)]):
+            matched = self.update(row[a:b], t[a:b], o[a:b], h[a:b], l[a:b], c[a:b], v[a:b])
+            yield ScanResult(int(t[a]), int(b - a), [self.symbols[i] for i in matched], self.unchecked_filters)
@@ -0,0 +1,664 @@
+"""
+Event-driven backtest core: orders, fills and positions driven by a queue of bar events.
+
+The simulator does not step through every bar. A small heap holds what can happen next (the
+next tradable entry signal, a pending order's fill, the first bar an open position's exits
+trigger on) and the loop jumps from one event to the next. Exits are found with vectorized
+scans over blocks of bars, so holding a position for thousands of bars costs a few array
+operations. Fills go into a preallocated record array and the equity curve into a
+preallocated float array; nothing is allocated per bar.
+
+Execution model (short-only, like every strategy config):
+- An entry signal on bar i sells short at bar i + 1's open (entry_fill "close": bar i's close),
+  sized at position_pct of current equity. Slippage and per-share commission apply to every fill.
+- While short, the first exit to trigger covers; on the same bar they rank in this order:
+  hard stop max_adverse_excursion_pct above entry (a gap through it fills at the open),
+  structure_based_trailing (a stop at the last lower high), partial_cover_pct (covers cover_pct
+  of the shares at target_pct profit, the rest keeps running), retrace_of_total_move_pct /
+  cover_near_prior_breakout_base (cover at a level set at entry from the run-up before it: the
+  given retrace of the move, or near its base), vwap_touch_exit (covers at VWAP), max_hold_bars,
+  and the session close when the config trades intraday bars.
+- max_trades_per_day caps entries per day; once a day's realized loss reaches
+  max_daily_loss_pct of its starting equity there are no more entries that day; a losing trade
+  blocks entries for cooldown_after_loss_minutes. Equity and the daily limits live in an Account,
+  which the streams of a portfolio (app.strategies.portfolio) share.
+"""
+import heapq
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.strategies.bars import BarSeries, BarsLike, as_series
+from app.strategies.config_schema import StrategyConfig
+from app.strategies.plan import PlanLike, as_plan, has_daily_context
+from app.strategies.precompute import FrameOrigin, IndicatorFrame, precompute_indicators
+from app.strategies.rule_engine import (
+    INITIAL_EQUITY,
+    MIN_BARS,
+    RiskLimits,
+    backtest_resolution,
+    summarize_trades,
+)
+
+DAY = 86400
+ENTRY_FILLS = ("next_open", "close")
+
+# Fill reasons; FILL_DTYPE's reason column indexes this tuple
+REASONS = (
+    "entry",
+    "max_adverse_excursion",
+    "structure_based_trailing",
+    "partial_cover_pct",
+    "vwap_touch_exit",
+    "max_hold",
+    "session_close",
+    "end_of_data",
+    "retrace_of_total_move_pct",
+    "cover_near_prior_breakout_base",
+)
+ENTRY, STOP, TRAIL, TARGET, VWAP, MAX_HOLD, SESSION_CLOSE, END_OF_DATA, RETRACE, BASE = range(len(REASONS))
+
+# One row per fill; qty < 0 sells short, qty > 0 covers
+FILL_DTYPE = np.dtype([
+    ("trade", np.int32),
+    ("index", np.int64),
+    ("t", np.int64),
+    ("qty", np.float64),
+    ("price", np.float64),
+    ("reason", np.int8),
+])
+
+# Event kinds; on the same bar exits run before fills before new signals
+_EXIT, _FILL, _SIGNAL = range(3)
+_FIRST_BLOCK = 64  # bars in an exit scan's first block; later blocks grow 4x
+_MAX_BLOCK = 16384
+
+
+@dataclass(frozen=True)
+class ExecutionOptions:
+    """How orders fill; read from backtest_assumptions."""
+
+    entry_fill: str = "next_open"
+    slippage_bps: float = 0.0
+    commission_per_share: float = 0.0
+    max_hold_bars: Optional[int] = None
+    flatten_at_close: bool = False  # cover open positions on the last bar of each session
+
+    @classmethod
+    def from_config(cls, config: StrategyConfig) -> "ExecutionOptions":
+        from app.market_data.resolution import is_intraday  # market_data imports app.strategies.bars
+
+        ba = config.backtest_assumptions
+        entry_fill = (ba and ba.entry_fill) or "next_open"
+        if entry_fill not in ENTRY_FILLS:
+            raise ValueError(f"entry_fill must be one of {', '.join(ENTRY_FILLS)}")
+        try:
+            intraday = is_intraday(backtest_resolution(config))
+        except ValueError:
+            intraday = False
+        # Daily-context strategies hold across sessions; only intraday ones flatten at the close
+        intraday = intraday and not has_daily_context(config)
+        return cls(
+            entry_fill=entry_fill,
+            slippage_bps=(ba and ba.slippage_bps) or 0.0,
+            commission_per_share=(ba and ba.commission_per_share) or 0.0,
+            max_hold_bars=(ba and ba.max_hold_bars) or None,
+            flatten_at_close=intraday,
+        )
+
+
+@dataclass
+class Account:
+    """Realized equity and the daily limits entries are checked against."""
+
+    max_daily_loss_pct: float
+    max_trades_per_day: int
+    equity: float = INITIAL_EQUITY
+    max_exposure: Optional[float] = None  # open short notional allowed, as a multiple of equity
+    exposure: float = 0.0  # entry notional of the shares still short
+    day: Optional[int] = None
+    day_trades: int = 0
+    day_pnl: float = 0.0
+    day_equity: float = INITIAL_EQUITY  # equity when the day started
+    day_halted: bool = False  # the day's realized loss reached max_daily_loss_pct
+
+    @classmethod
+    def from_limits(cls, limits: RiskLimits) -> "Account":
+        return cls(limits.max_daily_loss_pct, limits.max_trades_per_day)
+
+    def roll(self, day: int) -> None:
+        if day != self.day:
+            self.day = day
+            self.day_trades = 0
+            self.day_pnl = 0.0
+            self.day_equity = self.equity
+            self.day_halted = False
+
+    def allows(self, day: int) -> bool:
+        """An entry on day is within the daily limits (a day not started yet always is)."""
+        return day != self.day or not (self.day_halted or self.day_trades >= self.max_trades_per_day)
+
+    def has_room(self, position_pct: float) -> bool:
+        """A new short of position_pct of equity stays within max_exposure."""
+        if self.max_exposure is None:
+            return True
+        return self.exposure + self.equity * position_pct <= self.equity * self.max_exposure * (1 + 1e-9)
+
+    def book(self, day: int, pnl: float) -> None:
+        """Add a closed trade's pnl, on the day it closed."""
+        self.equity += pnl
+        self.roll(day)
+        self.day_pnl += pnl
+        if self.day_pnl <= -self.day_equity * self.max_daily_loss_pct / 100:
+            self.day_halted = True
+
+
+@dataclass
+class Position:
+    """An open short: shares still short and the state its exit scan resumes from."""
+
+    trade: int
+    entry_index: int
+    entry_t: int
+    entry_price: float  # after slippage
+    shares: float
+    initial_shares: float
+    stop: float
+    target: Optional[float]  # None once the partial cover has filled
+    cover_level: Optional[float]  # retrace / base level (the higher one when both apply)
+    cover_reason: int
+    scanned: int  # next bar the exit scan looks at
+    last_high: float  # high of the bar before `scanned` (lower highs compare against it)
+    trail: float = np.inf  # lowest lower high so far: the trailing stop
+    cash: float = 0.0  # short proceeds minus covers and commissions; the pnl once flat
+    cover_value: float = 0.0  # shares covered x price, for the average exit price
+    partial: bool = False
+
+
+@dataclass
+class SimulationResult:
+    trades: list[dict]
+    fills: np.ndarray  # FILL_DTYPE rows
+    t: np.ndarray  # bar times of the equity curve
+    equity: np.ndarray  # mark-to-market equity at each bar's close
+
+    def summary(self) -> dict:
+        return summarize_trades(self.trades)
+
+    def trade_columns(self) -> dict[str, np.ndarray]:
+        """The trade log as typed columns; reason indexes REASONS."""
+        trades = self.trades
+        return {
+            "entry_index": np.array([x["entry_index"] for x in trades], dtype=np.int64),
+            "exit_index": np.array([x["exit_index"] for x in trades], dtype=np.int64),
+            "entry_t": np.array([x["entry_t"] for x in trades], dtype=np.int64),
+            "exit_t": np.array([x["exit_t"] for x in trades], dtype=np.int64),
+            "entry_price": np.array([x["entry_price"] for x in trades], dtype=np.float32),
+            "exit_price": np.array([x["exit_price"] for x in trades], dtype=np.float32),
+            "shares": np.array([x["shares"] for x in trades], dtype=np.float32),
+            "pnl": np.array([x["pnl"] for x in trades], dtype=np.float64),
+            "pnl_pct": np.array([x["pnl_pct"] for x in trades], dtype=np.float32),
+            "reason": np.array([REASONS.index(x["reason"]) for x in trades], dtype=np.int8),
+            "partial": np.array([x["partial"] for x in trades], dtype=bool),
+        }
+
+
+def _first(mask: np.ndarray) -> int:
+    """Index of the first True in mask, or len(mask)."""
+    k = int(np.argmax(mask)) if len(mask) else 0
+    return k if len(mask) and mask[k] else len(mask)
+
+
+class EventSimulator:
+    """
+    One config (or its compiled plan) on one symbol. feed() takes the series as one frame or as consecutive windows
+    (each an IndicatorFrame whose origin is its first bar's index); all indices are whole-series.
+    account defaults to one of its own; pass a shared one to trade several simulators against
+    the same equity and daily limits, stepping them in time order with load() / next_event() / step().
+    """
+
+    def __init__(
+        self,
+        config: PlanLike,
+        options: Optional[ExecutionOptions] = None,
+        limits: Optional[RiskLimits] = None,
+        start: int = 0,
+        account: Optional[Account] = None,
+    ):
+        self.plan = plan = as_plan(config)
+        self.config = config = plan.config
+        self.options = options or ExecutionOptions.from_config(config)
+        self.limits = limits or RiskLimits.from_config(config)
+        rm = config.risk_management
+        self.cooldown_seconds = ((rm and rm.cooldown_after_loss_minutes) or 0) * 60
+        partial = plan.exit_params("partial_cover_pct")
+        self.target_pct = None if partial is None else float(partial["target_pct"])
+        self.cover_fraction = 1.0 if partial is None else min(max(float(partial["cover_pct"]), 0.0), 100.0) / 100
+        self.trailing = plan.exit_params("structure_based_trailing") is not None
+        self.vwap_exit = plan.exit_params("vwap_touch_exit") is not None
+        self.retrace = plan.exit_params("retrace_of_total_move_pct")
+        self.base = plan.exit_params("cover_near_prior_breakout_base")
+        self.next_open = self.options.entry_fill == "next_open"
+        self.slippage = self.options.slippage_bps / 10_000
+
+        self.account = account or Account.from_limits(self.limits)
+        self.position: Optional[Position] = None
+        self.trades: list[dict] = []
+        self._fills = np.empty(64, FILL_DTYPE)
+        self._n_fills = 0
+        self._curve = np.empty(0)
+        self._times = np.empty(0, dtype=np.int64)
+        self._marked = 0  # equity is written for bars before this
+        self._queue: list[tuple] = []
+        self._cursor = start  # entry signals count from this bar on
+        self._cooldown_until = -1
+        self._reserved = 0.0  # exposure a queued next-open fill holds
+
+    # --- feeding bars ---
+
+    def feed(self, frame: IndicatorFrame, signals: np.ndarray, stop: int, final: bool) -> None:
+        """
+        Process every event that frame's bars decide, up to whole-series bar stop. Unless final,
+        the last bar waits for the next window (a fill there needs the following bar's open).
+        """
+        self.load(frame, signals, stop, final)
+        while self.next_event() is not None:
+            self.step()
+        self._mark(self._limit)
+
+    def load(self, frame: IndicatorFrame, signals: np.ndarray, stop: int, final: bool) -> None:
+        """Point the simulator at frame's bars (see feed) without processing any event."""
+        bars = frame.bars
+        self._offset = frame.origin.index
+        self._t, self._o, self._h, self._l, self._c = bars.t, bars.o, bars.h, bars.l, bars.c
+        self._vwap = frame.vwap() if self.vwap_exit else None
+        self._candidates = np.flatnonzero(signals[: stop - self._offset])
+        self._limit = stop if final else min(stop, self._offset + len(bars) - 1)
+        self._end = stop - self._offset if final else len(bars)  # bars a scan may peek at
+        self._final = final
+        self._reserve(self._limit)
+
+    def next_event(self) -> Optional[tuple[int, int]]:
+        """(bar time, event kind) of the next event the loaded bars decide, or None."""
+        if not self._queue:
+            self._schedule()
+            if not self._queue:
+                return None
+        bar, kind, _ = self._queue[0]
+        if bar >= self._limit:
+            return None
+        return int(self._t[bar - self._offset]), kind
+
+    def step(self) -> None:
+        """Process the event next_event() returned."""
+        bar, kind, payload = heapq.heappop(self._queue)
+        self._mark(bar)
+        if kind == _EXIT:
+            self._exit(bar, *payload)
+        elif kind == _FILL:
+            self._open(bar)
+        else:
+            self._signal(bar)
+
+    def resume_index(self) -> int:
+        """First bar the next feed() still reads (a window may drop everything before it)."""
+        need = min(self._cursor, self._limit)
+        if self.position is not None:
+            need = min(need, self.position.scanned - 1)
+        if self._queue:
+            need = min(need, self._queue[0][0] - 1)
+        return max(need, 0)
+
+    @property
+    def num_fills(self) -> int:
+        return self._n_fills
+
+    def fills_since(self, k: int) -> np.ndarray:
+        """FILL_DTYPE rows recorded after the first k (a view, valid until the next event)."""
+        return self._fills[k : self._n_fills]
+
+    def result(self) -> SimulationResult:
+        return SimulationResult(
+            trades=self.trades,
+            fills=self._fills[: self._n_fills].copy(),
+            t=self._times[: self._marked].copy(),
+            equity=self._curve[: self._marked].copy(),
+        )
+
+    # --- events ---
+
+    def _schedule(self) -> None:
+        """Queue the next event: the position's next exit, or the next tradable signal."""
+        pos = self.position
+        if pos is not None:
+            hit = self._scan(pos, pos.scanned - self._offset, self._limit - self._offset)
+            if hit is not None:
+                heapq.heappush(self._queue, (hit[0] + self._offset, _EXIT, hit[1:]))
+            elif self._final and self._limit > pos.entry_index:
+                last = self._limit - 1
+                heapq.heappush(self._queue, (last, _EXIT, (END_OF_DATA, float(self._c[last - self._offset]))))
+            else:
+                pos.scanned = max(pos.scanned, self._limit)
+            return
+        i = self._next_signal()
+        if i is not None:
+            heapq.heappush(self._queue, (i + self._offset, _SIGNAL, ()))
+
+    def _next_signal(self) -> Optional[int]:
+        """Next signal bar (local index) the risk limits allow, advancing the cursor past blocked ones."""
+        t = self._t
+        lim = self._limit - self._offset
+        if self._final:
+            lim -= 1  # nothing left to fill on or exit into
+        while True:
+            k = int(np.searchsorted(self._candidates, self._cursor - self._offset))
+            if k >= len(self._candidates) or self._candidates[k] >= lim:
+                self._cursor = max(self._cursor, lim + self._offset)
+                return None
+            i = int(self._candidates[k])
+            ts = int(t[i])
+            if ts < self._cooldown_until:
+                self._cursor = int(np.searchsorted(t, self._cooldown_until)) + self._offset
+                continue
+            day = ts // DAY
+            if not self.account.allows(day):
+                self._cursor = int(np.searchsorted(t, (day + 1) * DAY)) + self._offset
+                continue
+            return i
+
+    def _signal(self, bar: int) -> None:
+        i = bar - self._offset
+        self._cursor = bar + 1
+        day = int(self._t[i]) // DAY
+        account = self.account
+        if not account.allows(day) or not account.has_room(self.limits.position_pct):
+            return  # a shared account's trades or capital were used up after this signal was queued
+        if not self.next_open:
+            account.roll(day)
+            account.day_trades += 1
+            self._open(bar)
+            return
+        if self.options.flatten_at_close and self._t[i + 1] // DAY != self._t[i] // DAY:
+            return  # day order: the session closed before it could fill
+        account.roll(day)
+        account.day_trades += 1
+        self._reserved = account.equity * self.limits.position_pct  # held against max_exposure until the fill
+        account.exposure += self._reserved
+        heapq.heappush(self._queue, (bar + 1, _FILL, ()))
+
+    def _open(self, bar: int) -> None:
+        i = bar - self._offset
+        price = float(self._o[i] if self.next_open else self._c[i]) * (1 - self.slippage)
+        shares = self.account.equity * self.limits.position_pct / price
+        self.account.exposure += shares * price - self._reserved
+        self._reserved = 0.0
+        cover_level, cover_reason = self._cover_level(i if self.next_open else i + 1, price)
+        pos = self.position = Position(
+            trade=len(self.trades),
+            entry_index=bar,
+            entry_t=int(self._t[i]),
+            entry_price=price,
+            shares=shares,
+            initial_shares=shares,
+            stop=price * (1 + self.limits.max_adverse_pct / 100),
+            target=None if self.target_pct is None else price * (1 - self.target_pct / 100),
+            cover_level=cover_level,
+            cover_reason=cover_reason,
+            scanned=bar if self.next_open else bar + 1,
+            last_high=float(self._h[i - 1] if self.next_open else self._h[i]),
+            cash=shares * (price - self.options.commission_per_share),
+        )
+        self._record(pos.trade, bar, -shares, price, ENTRY)
+        self._mark_bar(bar)
+
+    def _cover_level(self, end: int, price: float) -> tuple[Optional[float], int]:
+        """
+        The retrace / base cover level for a short opened at price after local bar end - 1, from
+        the move over the lookback_bars bars before it; levels at or above price don't apply.
+        """
+        best, reason = None, RETRACE
+        for params, kind in ((self.retrace, RETRACE), (self.base, BASE)):
+            if params is None:
+                continue
+            lo = max(end - params["lookback_bars"], 0)
+            top = float(self._h[lo:end].max())
+            base = float(self._l[lo:end].min())
+            if kind == RETRACE:
+                level = top - params["target_pct"] / 100 * (top - base)
+            else:
+                level = base * (1 + params["tolerance_pct"] / 100)
+            if level < price and (best is None or level > best):
+                best, reason = level, kind
+        return best, reason
+
+    def _exit(self, bar: int, reason: int, price: float) -> None:
+        pos = self.position
+        shares = pos.shares
+        if reason == TARGET:
+            shares = min(pos.initial_shares * self.cover_fraction, pos.shares)
+            pos.target = None
+            pos.partial = True
+        fill = price * (1 + self.slippage)
+        pos.cash -= shares * (fill + self.options.commission_per_share)
+        pos.cover_value += shares * fill
+        pos.shares -= shares
+        self.account.exposure -= shares * pos.entry_price
+        self._record(pos.trade, bar, shares, fill, reason)
+        pos.scanned = bar + 1
+        if pos.shares > pos.initial_shares * 1e-9:
+            self._mark_bar(bar)
+            return
+
+        i = bar - self._offset
+        pnl = pos.cash
+        self.trades.append({
+            "entry_index": pos.entry_index,
+            "exit_index": bar,
+            "entry_t": pos.entry_t,
+            "exit_t": int(self._t[i]),
+            "entry_price": pos.entry_price,
+            "exit_price": pos.cover_value / pos.initial_shares,
+            "shares": pos.initial_shares,
+            "pnl_pct": pnl / (pos.entry_price * pos.initial_shares) * 100,
+            "pnl": pnl,
+            "reason": REASONS[reason],
+            "partial": pos.partial,
+        })
+        self.position = None
+        self.account.book(int(self._t[i]) // DAY, pnl)
+        if pnl < 0 and self.cooldown_seconds:
+            self._cooldown_until = int(self._t[i]) + self.cooldown_seconds
+        self._cursor = max(self._cursor, bar + 1)
+        self._mark_bar(bar)
+
+    # --- exit scan ---
+
+    def _scan(self, pos: Position, a: int, b: int) -> Optional[tuple[int, int, float]]:
+        """First exit in local bars [a, b) as (bar, reason, price); None leaves pos ready to resume at b."""
+        size = _FIRST_BLOCK
+        while a < b:
+            e = min(a + size, b)
+            hit = self._scan_block(pos, a, e)
+            if hit is not None:
+                return hit
+            a = e
+            size = min(size * 4, _MAX_BLOCK)
+        return None
+
+    def _scan_block(self, pos: Position, a: int, e: int) -> Optional[tuple[int, int, float]]:
+        h = self._h[a:e]
+        l = self._l[a:e]
+        n = e - a
+        best, reason = n, None
+
+        k = _first(h >= pos.stop)
+        if k < best:
+            best, reason = k, STOP
+        if self.trailing:
+            # A lower high is a bar whose high is under the previous bar's; the stop sits at the
+            # lowest one so far, and only bars after it can trigger it.
+            prev = np.empty(n)
+            prev[0] = pos.last_high
+            prev[1:] = h[:-1]
+            lower = np.where(h < prev, h, np.inf)
+            level = np.empty(n)
+            level[0] = pos.trail
+            np.minimum.accumulate(lower[:-1], out=level[1:])
+            np.minimum(level[1:], pos.trail, out=level[1:])
+            k = _first(h >= level)
+            if k < best:
+                best, reason = k, TRAIL
+        if pos.target is not None:
+            k = _first(l <= pos.target)
+            if k < best:
+                best, reason = k, TARGET
+        if pos.cover_level is not None:
+            k = _first(l <= pos.cover_level)
+            if k < best:
+                best, reason = k, pos.cover_reason
+        if self.vwap_exit:
+            v = self._vwap[a:e]
+            k = _first((l <= v) & (v <= h))
+            if k < best:
+                best, reason = k, VWAP
+        if self.options.max_hold_bars:
+            k = pos.entry_index + self.options.max_hold_bars - self._offset - a
+            if 0 <= k < best:
+                best, reason = k, MAX_HOLD
+        if self.options.flatten_at_close:
+            day = self._t[a : min(e + 1, self._end)] // DAY
+            k = _first(day[1:] != day[:-1])
+            if k < min(best, len(day) - 1):
+                best, reason = k, SESSION_CLOSE
+
+        j = min(best, n - 1)
+        if self.trailing:
+            pos.trail = float(min(level[j], lower[j]))
+        pos.last_high = float(h[j])
+        if reason is None:
+            return None
+
+        i = a + best
+        o = float(self._o[i])
+        if reason == STOP:
+            price = max(pos.stop, o)
+        elif reason == TRAIL:
+            price = max(float(level[best]), o)
+        elif reason == TARGET:
+            price = min(pos.target, o)
+        elif reason in (RETRACE, BASE):
+            price = min(pos.cover_level, o)
+        elif reason == VWAP:
+            price = float(self._vwap[i])
+        else:
+            price = float(self._c[i])
+        return i, reason, price
+
+    # --- arrays ---
+
+    def _record(self, trade: int, bar: int, qty: float, price: float, reason: int) -> None:
+        if self._n_fills == len(self._fills):
+            self._fills = np.resize(self._fills, 2 * len(self._fills))
+        self._fills[self._n_fills] = (trade, bar, self._t[bar - self._offset], qty, price, reason)
+        self._n_fills += 1
+
+    def _reserve(self, n: int) -> None:
+        if n > len(self._curve):
+            size = max(n, 2 * len(self._curve))
+            curve = np.empty(size)
+            curve[: self._marked] = self._curve[: self._marked]
+            times = np.empty(size, dtype=np.int64)
+            times[: self._marked] = self._times[: self._marked]
+            self._curve, self._times = curve, times
+
+    def _mark(self, stop: int) -> None:
+        """Write mark-to-market equity for bars [marked, stop) under the current position."""
+        if stop <= self._marked:
+            return
+        self._times[self._marked : stop] = self._t[self._marked - self._offset : stop - self._offset]
+        pos = self.position
+        equity = self.account.equity
+        if pos is None:
+            self._curve[self._marked : stop] = equity
+        else:
+            closes = self._c[self._marked - self._offset : stop - self._offset]
+            np.multiply(closes, -pos.shares, out=self._curve[self._marked : stop])
+            self._curve[self._marked : stop] += equity + pos.cash
+        self._marked = stop
+
+    def _mark_bar(self, bar: int) -> None:
+        """Rewrite bar's equity after a fill on it."""
+        self._marked = min(self._marked, bar)
+        self._mark(bar + 1)
+
+
+def simulate(
+    config: PlanLike,
+    bars: BarsLike,
+    frame: Optional[IndicatorFrame] = None,
+    signals: Optional[np.ndarray] = None,
+    start: int = 0,
+    stop: Optional[int] = None,
+    options: Optional[ExecutionOptions] = None,
+) -> SimulationResult:
+    """
+    Run the event-driven simulation over bars[start:stop] (indicators keep the history before
+    start). frame / signals may be passed in when they are shared across runs (e.g. sweeps).
+    """
+    bars = as_series(bars)
+    stop = len(bars) if stop is None else min(stop, len(bars))
+    start = max(start, 0)
+    if stop - start < MIN_BARS:
+        stop = max(stop, 0)
+        return SimulationResult([], np.empty(0, FILL_DTYPE), bars.t[:stop].copy(), np.full(stop, INITIAL_EQUITY))
+
+    plan = as_plan(config)
+    sim = EventSimulator(plan, options, start=start)
+    frame = frame or precompute_indicators(bars, plan)
+    signals = plan.signal_mask(frame) if signals is None else signals
+    sim.feed(frame, signals, stop, final=True)
+    return sim.result()
+
+
+def simulate_chunked(
+    config: PlanLike,
+    chunks: Iterable[BarSeries],
+    options: Optional[ExecutionOptions] = None,
+) -> SimulationResult:
+    """
+    simulate() over a series arriving in consecutive chunks (e.g. rule_engine.iter_bars),
+    holding one chunk plus a short overlap of bars at a time; the result is the same as on the
+    joined series. Only the equity curve and its bar times (16 bytes a bar) grow with the range.
+    """
+    plan = as_plan(config)
+    sim = EventSimulator(plan, options)
+    origin = FrameOrigin()
+    window: Optional[BarSeries] = None
+    seen = 0
+
+    chunks = iter(chunks)
+    chunk = next(chunks, None)
+    while chunk is not None:
+        following = next(chunks, None)
+        final = following is None
+        window = chunk if window is None else BarSeries.concat([window, chunk])
+        seen += len(chunk)
+        chunk = following
+        if seen < MIN_BARS:
+            if final:
+                return simulate(plan, window, options=options)
+            continue
+
+        frame = precompute_indicators(window, plan, origin)
+        sim.feed(frame, plan.signal_mask(frame), origin.index + len(window), final)
+        if final:
+            break
+
+        # Keep only the bars the next window's events and indicator rows look back on
+        keep = plan.window_start(window.t, sim.resume_index() - origin.index)
+        origin = frame.origin_at(keep)
+        window = window[keep:]
+    if window is None:
+        return simulate(plan, BarSeries([], [], [], [], [], []), options=options)
+    return sim.result()
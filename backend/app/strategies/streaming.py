@@ -0,0 +1,466 @@
+"""
+Streaming strategy evaluation for live bar feeds.
+Incremental indicators keep O(1) state per update and use the same arithmetic as
+IndicatorFrame, so values match the precomputed columns exactly. Each bar's rules are checked by
+their scans (RuleSpec.scan, the checks the universe scanner runs) over those values.
+StreamingEvaluator drives the backtest's event-driven simulator bar by bar; its trades match
+run_backtest_from_config() on the same data.
+Daily rules of a daily-context plan are evaluated once per session, when its last bar is in.
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from app.strategies.bars import Bar, BarSeries, as_series
+from app.strategies.plan import DAY_SECONDS, BoundRule, PlanLike, UnsupportedRuleError, as_plan
+from app.strategies.precompute import FrameOrigin, IndicatorFrame
+from app.strategies.rule_engine import MIN_BARS
+from app.strategies.scanner import UniverseTick, check_all, resolve_checks
+from app.strategies.simulator import REASONS, EventSimulator, ExecutionOptions
+
+
+class SessionVWAP:
+    """
+    VWAP of the current session so far (IndicatorFrame.session_vwap): running sums since the
+    first bar, less their values when the session opened.
+    """
+
+    def __init__(self):
+        self.pv = 0.0
+        self.volume = 0.0
+        self._day: Optional[int] = None
+        self._open_pv = self._open_volume = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, bar: Bar) -> Optional[float]:
+        day = bar.t // DAY_SECONDS
+        if day != self._day:
+            self._day, self._open_pv, self._open_volume = day, self.pv, self.volume
+        self.pv += (bar.h + bar.l + bar.c) / 3 * bar.v
+        self.volume += bar.v
+        volume = self.volume - self._open_volume
+        self.value = (self.pv - self._open_pv) / volume if volume > 0 else None
+        return self.value
+
+
+class RollingMean:
+    """
+    Mean of the n values pushed `lag` updates ago and earlier.
+    Uses differences of a running total, like IndicatorFrame's window columns.
+    """
+
+    def __init__(self, n: int, lag: int = 0):
+        self.n = n
+        self.lag = lag
+        self._total = 0.0
+        self._totals: deque[float] = deque([0.0], maxlen=n + lag + 1)
+        self.value: Optional[float] = None
+
+    def push(self, x: float) -> Optional[float]:
+        self._total += x
+        self._totals.append(self._total)
+        if self.n > 0 and len(self._totals) == self.n + self.lag + 1:
+            self.value = (self._totals[-1 - self.lag] - self._totals[0]) / self.n
+        else:
+            self.value = None
+        return self.value
+
+
+class RollingVolumeAverage(RollingMean):
+    """N-bar average volume (IndicatorFrame.avg_volume)."""
+
+    def update(self, bar: Bar) -> Optional[float]:
+        return self.push(bar.v)
+
+
+class RollingATR:
+    """Simple-average true range over `period` bars (IndicatorFrame.atr)."""
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self._mean = RollingMean(period)
+        self._prev_close: Optional[float] = None
+        self._count = 0
+        self.value: Optional[float] = None
+
+    def update(self, bar: Bar) -> Optional[float]:
+        pc = self._prev_close
+        if pc is None:
+            tr = bar.h - bar.l
+        else:
+            tr = max(bar.h - bar.l, max(abs(bar.h - pc), abs(bar.l - pc)))
+        self._prev_close = bar.c
+        self._count += 1
+        mean = self._mean.push(tr)
+        self.value = mean if self.period > 0 and self._count > self.period else None
+        return self.value
+
+
+class _RollingMax:
+    """Max of up to n values ending `lag` pushes ago; monotonic deque, amortized O(1)."""
+
+    def __init__(self, n: int, lag: int = 0):
+        self.n = n
+        self.lag = lag
+        self._count = 0
+        self._pending: deque[tuple[int, float]] = deque()
+        self._window: deque[tuple[int, float]] = deque()
+        self.value: Optional[float] = None
+
+    def push(self, x: float) -> Optional[float]:
+        self._pending.append((self._count, x))
+        self._count += 1
+        if len(self._pending) <= self.lag or self.n <= 0:
+            self.value = None
+            return None
+        j, y = self._pending.popleft()
+        while self._window and self._window[-1][1] <= y:
+            self._window.pop()
+        self._window.append((j, y))
+        while self._window[0][0] <= j - self.n:
+            self._window.popleft()
+        self.value = self._window[0][1]
+        return self.value
+
+
+class RollingHigh(_RollingMax):
+    """Highest high of up to n bars ending `lag` bars ago (IndicatorFrame.rolling_high)."""
+
+    def update(self, bar: Bar) -> Optional[float]:
+        return self.push(bar.h)
+
+
+class RollingLow:
+    """Lowest low of up to n bars ending `lag` bars ago (IndicatorFrame.rolling_low)."""
+
+    def __init__(self, n: int, lag: int = 0):
+        self._max = _RollingMax(n, lag)
+        self.value: Optional[float] = None
+
+    def update(self, bar: Bar) -> Optional[float]:
+        m = self._max.push(-bar.l)
+        self.value = None if m is None else -m
+        return self.value
+
+
+class MorningLow:
+    """
+    Lowest low of the session's bars that opened in its first `minutes`, once that window has
+    passed (IndicatorFrame.morning_low).
+    """
+
+    def __init__(self, minutes: int):
+        from app.market_data.resolution import DAY_SECONDS, SESSION_OPEN  # market_data imports app.strategies.bars
+
+        self._day_seconds = DAY_SECONDS
+        self._open = SESSION_OPEN
+        self._cutoff = SESSION_OPEN + minutes * 60
+        self._day: Optional[int] = None
+        self._low = float("inf")
+        self.value: Optional[float] = None
+
+    def update(self, bar: Bar) -> Optional[float]:
+        day = bar.t // self._day_seconds
+        if day != self._day:
+            self._day = day
+            self._low = float("inf")
+        tod = bar.t % self._day_seconds
+        if tod < self._cutoff:
+            if tod >= self._open:
+                self._low = min(self._low, bar.l)
+            self.value = None
+        else:
+            self.value = self._low if self._low < float("inf") else None
+        return self.value
+
+
+class PreviousDayMidpoint:
+    """Midpoint of the previous session's range (IndicatorFrame.previous_day_midpoint)."""
+
+    def __init__(self):
+        self._day: Optional[int] = None
+        self._high = self._low = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, bar: Bar) -> Optional[float]:
+        day = bar.t // DAY_SECONDS
+        if day != self._day:
+            if self._day is not None:
+                self.value = (self._high + self._low) / 2
+            self._day, self._high, self._low = day, bar.h, bar.l
+        else:
+            self._high = max(self._high, bar.h)
+            self._low = min(self._low, bar.l)
+        return self.value
+
+
+class SessionOpen:
+    """Open of the current session's first bar (IndicatorFrame.session_open)."""
+
+    def __init__(self):
+        self._day: Optional[int] = None
+        self.value: Optional[float] = None
+
+    def update(self, bar: Bar) -> Optional[float]:
+        day = bar.t // DAY_SECONDS
+        if day != self._day:
+            self._day, self.value = day, bar.o
+        return self.value
+
+
+class PriorSessionClose:
+    """Close of the session n before the current one (IndicatorFrame.prior_session_close)."""
+
+    def __init__(self, n: int = 1):
+        self._day: Optional[int] = None
+        self._close = 0.0
+        self._closes: deque[float] = deque(maxlen=n)  # the last n finished sessions' closes, oldest first
+        self.value: Optional[float] = None
+
+    def update(self, bar: Bar) -> Optional[float]:
+        day = bar.t // DAY_SECONDS
+        if day != self._day:
+            if self._day is not None:
+                self._closes.append(self._close)
+                if len(self._closes) == self._closes.maxlen:
+                    self.value = self._closes[0]
+            self._day = day
+        self._close = bar.c
+        return self.value
+
+
+# Streaming counterparts of the IndicatorFrame columns rules declare as inputs (by key name)
+_INDICATORS = {
+    "atr": RollingATR,
+    "avg_volume": RollingVolumeAverage,
+    "rolling_high": RollingHigh,
+    "rolling_low": RollingLow,
+    "morning_low": MorningLow,
+    "previous_day_midpoint": PreviousDayMidpoint,
+    "session_open": SessionOpen,
+    "prior_session_close": PriorSessionClose,
+    "session_vwap": SessionVWAP,
+}
+
+
+_ROW = np.zeros(1, dtype=np.int64)
+
+
+class SymbolTicks:
+    """
+    One symbol's rule inputs, kept by the incremental indicators above (one per input key), as
+    one-row scanner.UniverseTicks: the rules' scans (RuleSpec.scan) read them as the scanner's.
+    """
+
+    def __init__(self, inputs: tuple[tuple, ...]):
+        self.inputs = {key: _INDICATORS[key[0]](*key[1:]) for key in inputs if key[0] in _INDICATORS}
+        self.count = 0
+        self._last: Optional[Bar] = None
+
+    def update(self, bar: Bar) -> UniverseTick:
+        for ind in self.inputs.values():
+            ind.update(bar)
+        last = self._last
+        tick = UniverseTick(
+            _ROW,
+            np.array([self.count]),
+            *(np.array([x], dtype=np.float64) for x in (bar.o, bar.h, bar.l, bar.c, bar.v)),
+            np.array([bar.c if last is None else last.c]),
+            np.array([np.nan if last is None else last.v]),
+            {key: np.array([np.nan if ind.value is None else ind.value]) for key, ind in self.inputs.items()},
+        )
+        self.count += 1
+        self._last = bar
+        return tick
+
+
+class DailySignals:
+    """
+    A daily-context plan's daily rules. When a bar opens a new session the finished one is
+    aggregated the way IndicatorFrame.daily() does it, pushed through the daily inputs and checked
+    by every rule's scan; ok holds the result for the new session's bars.
+    """
+
+    def __init__(self, rules: tuple[BoundRule, ...]):
+        self._checks = resolve_checks(rules)
+        self._days = SymbolTicks(tuple(dict.fromkeys(k for r in rules for k in r.spec.inputs(r.params))))
+        self._day: Optional[int] = None
+        self._bars: list[Bar] = []
+        self.ok = False
+
+    def update(self, bar: Bar) -> bool:
+        day = bar.t // DAY_SECONDS
+        if day != self._day:
+            if self._bars:
+                self._finish_session()
+            self._day = day
+            self._bars = []
+        self._bars.append(bar)
+        return self.ok
+
+    def _finish_session(self) -> None:
+        from app.market_data.resample import resample  # market_data imports app.strategies.bars
+
+        tick = self._days.update(resample(as_series(self._bars), "1D")[0])
+        self.ok = bool(check_all(self._checks, tick)[0])
+
+
+@dataclass
+class Signal:
+    kind: str  # entry (a short fill) | exit (a cover fill)
+    index: int
+    t: int
+    price: float  # fill price, after slippage
+    pnl_pct: Optional[float] = None  # the trade's, on the cover that closes it
+    reason: Optional[str] = None  # exits: simulator.REASONS
+    shares: Optional[float] = None
+
+
+_FIELDS = ("t", "o", "h", "l", "c", "v")
+
+
+def _symbol_ok(filters: tuple[BoundRule, ...], float_millions: Optional[float]) -> bool:
+    """Whether the symbol passes every symbol filter; raises UnsupportedRuleError for one it can't check."""
+    missing = [f"entries.{r.name} has no streaming check" for r in filters if r.name != "float_size_max"]
+    if float_millions is None and not missing:
+        missing = [f"entries.{r.name} needs the symbol's float (float_millions)" for r in filters]
+    if missing:
+        raise UnsupportedRuleError(missing)
+    return all(float_millions <= r.params["max_float_millions"] for r in filters)
+
+
+class StreamingEvaluator:
+    """
+    Feed closed bars with update(bar) and call finish() at end of data; the trades match
+    run_backtest_from_config on the same bars. Each bar's entry signal comes from the rules' scans
+    over SymbolTicks, and the backtest's EventSimulator is fed one bar at a time the way
+    simulate_chunked feeds chunks (every exit, the cooldown, entry_fill, slippage and commission
+    run as in a backtest), over a window trimmed to the bars its events still read. An event on
+    a bar is decided once the bar after it is in (a next-open fill and a session close need it),
+    so update() reports the fills of the bars before the new one. Signals are held until
+    MIN_BARS bars have arrived, matching the backtest's minimum. float_millions is the symbol's
+    float, which float_size_max needs (a backtest lists that filter as unchecked instead); without
+    it a config using the filter raises UnsupportedRuleError.
+    """
+
+    def __init__(
+        self, config: PlanLike, options: Optional[ExecutionOptions] = None, float_millions: Optional[float] = None
+    ):
+        self.plan = plan = as_plan(config)
+        self.config = plan.config
+        self.simulator = EventSimulator(plan, options)
+        # Symbol filters screen the stream once; float_size_max needs the symbol's float to do it
+        self._eligible = _symbol_ok(plan.symbol_filters, float_millions)
+
+        # One incremental indicator per input the plan's rules declare, read by the rules' scans
+        self._ticks = SymbolTicks(plan.inputs)
+        self._checks = resolve_checks(plan.signals)
+        self._daily = DailySignals(plan.daily_signals) if plan.daily_signals else None
+
+        self._index = -1
+        # The simulator's window: bars [_start, _n) of the buffers, bar _start at origin.index
+        self._buffers = {k: np.empty(256, dtype=np.int64 if k == "t" else np.float64) for k in _FIELDS}
+        self._signals = np.empty(256, dtype=bool)
+        self._start = self._n = 0
+        self._origin = FrameOrigin()
+        self._reported = 0  # simulator fills already turned into signals
+        self._held: list[Signal] = []
+
+    @property
+    def trades(self) -> list[dict]:
+        return self.simulator.trades if self._index + 1 >= MIN_BARS else []
+
+    @property
+    def equity(self) -> float:
+        return self.simulator.account.equity
+
+    def _entry_ok(self, bar: Bar) -> bool:
+        self._index += 1
+        tick = self._ticks.update(bar)
+        daily_ok = self._daily is None or self._daily.update(bar)
+        return (
+            self._eligible
+            and self._index >= self.plan.lookback
+            and daily_ok
+            and bool(check_all(self._checks, tick)[0])
+        )
+
+    # --- the simulator's window ---
+
+    def _append(self, bar: Bar, ok: bool) -> None:
+        if self._n == len(self._signals):
+            size = self._n - self._start
+            grow = 2 if size * 2 > len(self._signals) else 1
+            for k, buf in self._buffers.items():
+                out = np.empty(len(buf) * grow, dtype=buf.dtype)
+                out[:size] = buf[self._start : self._n]
+                self._buffers[k] = out
+            out = np.empty(len(self._signals) * grow, dtype=bool)
+            out[:size] = self._signals[self._start : self._n]
+            self._signals = out
+            self._start, self._n = 0, size
+        for k in _FIELDS:
+            self._buffers[k][self._n] = getattr(bar, k)
+        self._signals[self._n] = ok
+        self._n += 1
+
+    def _feed(self, final: bool) -> list[Signal]:
+        a, b = self._start, self._n
+        frame = IndicatorFrame(BarSeries(*(self._buffers[k][a:b] for k in _FIELDS)), self._origin)
+        sim = self.simulator
+        sim.feed(frame, self._signals[a:b], self._index + 1, final)
+        # Drop bars no later event reads (keeping the overlap), a batch at a time
+        keep = self.plan.window_start(self._buffers["t"][a:b], sim.resume_index() - self._origin.index)
+        if keep >= max(self.plan.lookback, 64):
+            self._origin = frame.origin_at(keep)
+            self._start += keep
+        return self._fill_signals()
+
+    def _fill_signals(self) -> list[Signal]:
+        sim = self.simulator
+        fills = sim.fills_since(self._reported)
+        signals = []
+        for k, f in enumerate(fills):
+            index, t, qty, price = int(f["index"]), int(f["t"]), float(f["qty"]), float(f["price"])
+            if qty < 0:
+                signals.append(Signal("entry", index, t, price, shares=-qty))
+                continue
+            trade = int(f["trade"])
+            closes = trade < len(sim.trades) and (k + 1 == len(fills) or int(fills[k + 1]["trade"]) != trade)
+            pnl_pct = sim.trades[trade]["pnl_pct"] if closes else None
+            signals.append(Signal("exit", index, t, price, pnl_pct, REASONS[f["reason"]], qty))
+        self._reported = sim.num_fills
+        return signals
+
+    def _emit(self, signals: list[Signal]) -> list[Signal]:
+        if self._index + 1 < MIN_BARS:
+            self._held.extend(signals)
+            return []
+        if self._held:
+            signals = self._held + signals
+            self._held = []
+        return signals
+
+    def update(self, bar: Bar) -> list[Signal]:
+        """Ingest the next closed bar; return the fills it decided (on the bar before it)."""
+        self._append(bar, self._entry_ok(bar))
+        return self._emit(self._feed(final=False))
+
+    def finish(self) -> list[Signal]:
+        """End of data: the last bar's events, and the cover of a position still open."""
+        if self._index + 1 < MIN_BARS:
+            self._held = []
+            return []
+        return self._emit(self._feed(final=True))
+
+
+def stream_signals(config: PlanLike, bars, float_millions: Optional[float] = None) -> list[Signal]:
+    """Run a StreamingEvaluator over a finished bar sequence and return every signal."""
+    evaluator = StreamingEvaluator(config, float_millions=float_millions)
+    signals: list[Signal] = []
+    for bar in bars:
+        signals.extend(evaluator.update(bar))
+    signals.extend(evaluator.finish())
+    return signals
@@ -0,0 +1,140 @@
+"""
+Parameter sweep (grid search) over a StrategyConfig.
+All combinations share one bar series, one IndicatorFrame and a cache of per-rule signal masks,
+so a combination only pays for the masks and trade loop that actually changed.
+"""
+import itertools
+import json
+from typing import Any, Optional
+
+import numpy as np
+
+from app.strategies.bars import BarsLike, as_series
+from app.strategies.config_schema import PositionSizing, RiskManagement, StrategyConfig
+from app.strategies.indicators import get_rule
+from app.strategies.plan import BoundRule, PlanLike, UnsupportedRuleError, as_plan
+from app.strategies.precompute import IndicatorFrame
+from app.strategies.rule_engine import summarize_trades
+from app.strategies.simulator import simulate
+
+RANK_KEYS = ("pnl", "pnl_pct", "win_rate", "max_drawdown", "num_trades")
+# config list -> (registry kind, attribute holding the rule name)
+_RULE_LISTS = {
+    "entries": ("entry", "indicator"),
+    "confirmation_rules": ("confirmation", "rule"),
+    "exits": ("exit", "type"),
+}
+_SECTIONS = {
+    "risk_management": RiskManagement,
+    "position_sizing": PositionSizing,
+}
+
+
+def expand_grid(param_grid: dict[str, list]) -> list[dict[str, Any]]:
+    """Cartesian product of parameter ranges, in a stable order; raises ValueError for an empty range."""
+    if not param_grid:
+        return [{}]
+    empty = [name for name, values in param_grid.items() if not values]
+    if empty:
+        raise ValueError(f"Sweep parameters need at least one value: {', '.join(empty)}")
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+
+def apply_params(config: StrategyConfig, params: dict[str, Any]) -> StrategyConfig:
+    """
+    Return a copy of config with params applied. Keys are one of:
+    - "risk_management.<field>" / "position_sizing.<field>"
+    - "entries.<indicator>.<param>", "confirmation_rules.<rule>.<param>", "exits.<type>.<param>"
+    - "<param>": every rule parameter or risk/sizing field with that name
+    Raises UnsupportedRuleError for a parameter the named rule doesn't take, ValueError when a key
+    matches nothing.
+    """
+    config = config.model_copy(deep=True)
+    for key, value in params.items():
+        if not _set_param(config, key.split("."), value):
+            raise ValueError(f"Unknown sweep parameter: {key}")
+    return config
+
+
+def _set_param(config: StrategyConfig, path: list[str], value: Any) -> bool:
+    if len(path) == 1:
+        name = path[0]
+        hit = False
+        for list_name in _RULE_LISTS:
+            for rule in getattr(config, list_name):
+                if name in rule.parameters:
+                    rule.parameters[name] = value
+                    hit = True
+        for section_name, section_cls in _SECTIONS.items():
+            section = getattr(config, section_name)
+            if section is not None and name in section_cls.model_fields:
+                setattr(section, name, value)
+                hit = True
+        return hit
+
+    if len(path) == 2 and path[0] in _SECTIONS:
+        section_cls = _SECTIONS[path[0]]
+        if path[1] not in section_cls.model_fields:
+            return False
+        if getattr(config, path[0]) is None:
+            setattr(config, path[0], section_cls())
+        setattr(getattr(config, path[0]), path[1], value)
+        return True
+
+    if len(path) == 3 and path[0] in _RULE_LISTS:
+        kind, name_attr = _RULE_LISTS[path[0]]
+        spec = get_rule(kind, path[1])
+        if spec is not None and path[2] not in spec.params:
+            raise UnsupportedRuleError([f"{path[0]}.{path[1]} has no parameter {path[2]}"])
+        hit = False
+        for rule in getattr(config, path[0]):
+            if getattr(rule, name_attr) == path[1]:
+                rule.parameters[path[2]] = value
+                hit = True
+        return hit
+
+    return False
+
+
+class SweepContext:
+    """Bars, indicator columns and rule masks shared by every combination of one sweep."""
+
+    def __init__(self, config: StrategyConfig, bars: BarsLike):
+        self.config = config
+        self.frame = IndicatorFrame(as_series(bars))
+        self._masks: dict[tuple, np.ndarray] = {}
+
+    def _mask(self, rule: BoundRule, frame: IndicatorFrame) -> np.ndarray:
+        # frame is self.frame or its daily series (daily-context plans)
+        key = (frame is self.frame, rule.spec.kind, rule.name, json.dumps(rule.params, sort_keys=True, default=str))
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = rule.spec.mask(frame, rule.params)
+            self._masks[key] = mask
+        return mask
+
+    def signals(self, config: PlanLike) -> np.ndarray:
+        return as_plan(config).signal_mask(self.frame, self._mask)
+
+    def trades(self, params: dict[str, Any], start: int = 0, stop: Optional[int] = None) -> list[dict]:
+        """Trades for one combination, optionally limited to bars[start:stop]."""
+        plan = as_plan(apply_params(self.config, params))
+        return simulate(
+            plan, self.frame.bars, frame=self.frame, signals=self.signals(plan), start=start, stop=stop
+        ).trades
+
+    def run(self, params: dict[str, Any], start: int = 0, stop: Optional[int] = None) -> dict:
+        """Backtest one combination; returns {"params": ..., **summary metrics}."""
+        return {"params": params, **summarize_trades(self.trades(params, start, stop))}
+
+
+def rank_results(rows: list[dict], rank_by: str = "pnl", top_n: Optional[int] = None) -> list[dict]:
+    """Best first; max_drawdown ranks ascending, everything else descending. Adds a 1-based rank."""
+    if rank_by not in RANK_KEYS:
+        raise ValueError(f"rank_by must be one of {', '.join(RANK_KEYS)}")
+    ranked = sorted(rows, key=lambda r: r[rank_by], reverse=rank_by != "max_drawdown")
+    if top_n is not None:
+        ranked = ranked[:top_n]
+    return [{"rank": i + 1, **r} for i, r in enumerate(ranked)]
+
@@ -0,0 +1,123 @@
+"""
+Walk-forward backtesting: rolling (or anchored) train/test windows over one bar series.
+Every fold reads the same BarSeries, IndicatorFrame and signal masks; a window is just a
+[start, stop) range for the trade loop, so k folds cost about one pass plus the loops.
+"""
+from dataclasses import dataclass
+from statistics import mean, pstdev
+from typing import Any, Optional
+
+from app.strategies.bars import BarsLike
+from app.strategies.config_schema import StrategyConfig
+from app.strategies.rule_engine import MIN_BARS, summarize_trades
+from app.strategies.sweep import SweepContext, apply_params, expand_grid, rank_results
+
+
+@dataclass(frozen=True)
+class WalkForwardWindow:
+    fold: int
+    train_start: int
+    train_stop: int
+    test_start: int
+    test_stop: int
+
+
+def walk_forward_windows(
+    n_bars: int,
+    n_splits: int = 5,
+    train_bars: Optional[int] = None,
+    test_bars: Optional[int] = None,
+    anchored: bool = False,
+) -> list[WalkForwardWindow]:
+    """
+    Fold k trains on the window before its test window and tests on the next test_bars bars.
+    Defaults split the series into n_splits + 1 equal blocks (train = one block, test = the next).
+    anchored=True grows the train window from bar 0 instead of rolling it.
+    """
+    if n_splits < 1:
+        raise ValueError("n_splits must be at least 1")
+    block = n_bars // (n_splits + 1)
+    test_bars = test_bars or block
+    train_bars = train_bars or block
+    if test_bars < MIN_BARS or train_bars < MIN_BARS:
+        raise ValueError(f"Windows need at least {MIN_BARS} bars; series has {n_bars}")
+
+    windows = []
+    test_start = n_bars - n_splits * test_bars
+    if test_start < train_bars:
+        raise ValueError("Series too short for the requested windows")
+    for k in range(n_splits):
+        t0 = test_start + k * test_bars
+        windows.append(WalkForwardWindow(
+            fold=k + 1,
+            train_start=0 if anchored else t0 - train_bars,
+            train_stop=t0,
+            test_start=t0,
+            test_stop=t0 + test_bars,
+        ))
+    return windows
+
+
+def _run_fold(
+    ctx: SweepContext,
+    window: WalkForwardWindow,
+    combos: list[dict[str, Any]],
+    rank_by: str,
+) -> dict:
+    if len(combos) > 1:
+        rows = [ctx.run(p, window.train_start, window.train_stop) for p in combos]
+        best = rank_results(rows, rank_by, top_n=1)[0]
+        params, train = best["params"], best
+    else:
+        params = combos[0]
+        train = ctx.run(params, window.train_start, window.train_stop)
+    test_trades = ctx.trades(params, window.test_start, window.test_stop)
+    bars_t = ctx.frame.bars.t
+    return {
+        "fold": window.fold,
+        "params": params,
+        "train_start": int(bars_t[window.train_start]),
+        "train_end": int(bars_t[window.train_stop - 1]),
+        "test_start": int(bars_t[window.test_start]),
+        "test_end": int(bars_t[window.test_stop - 1]),
+        "train": {k: train[k] for k in ("pnl", "pnl_pct", "win_rate", "max_drawdown", "num_trades")},
+        "test": summarize_trades(test_trades),
+        "_test_trades": test_trades,
+    }
+
+
+def run_walk_forward(
+    config: StrategyConfig,
+    bars: BarsLike,
+    n_splits: int = 5,
+    train_bars: Optional[int] = None,
+    test_bars: Optional[int] = None,
+    anchored: bool = False,
+    param_grid: Optional[dict[str, list]] = None,
+    rank_by: str = "pnl",
+) -> dict:
+    """
+    Evaluate config on each train window and the following out-of-sample test window.
+    With param_grid, each fold picks the best combination on its train window (by rank_by)
+    and tests that. Folds run one after another against the shared series (no copies); the
+    simulation holds the GIL, so threads would not overlap them, and services.backtest runs each
+    walk-forward as one backtest executor job, which is where runs are spread across processes.
+    Returns {"folds": [...], "out_of_sample": summary of all test trades, "fold_pnl_pct": {...}}.
+    """
+    ctx = SweepContext(config, bars)
+    windows = walk_forward_windows(len(ctx.frame), n_splits, train_bars, test_bars, anchored)
+    combos = expand_grid(param_grid or {})
+    rank_results([], rank_by)  # validate rank_by up front
+    folds = [_run_fold(ctx, w, combos, rank_by) for w in windows]
+
+    oos_trades = [t for f in folds for t in f.pop("_test_trades")]
+    fold_pnl = [f["test"]["pnl_pct"] for f in folds]
+    return {
+        "folds": folds,
+        "out_of_sample": summarize_trades(oos_trades),
+        "fold_pnl_pct": {
+            "mean": round(mean(fold_pnl), 2),
+            "std": round(pstdev(fold_pnl), 2),
+            "positive_folds": sum(1 for x in fold_pnl if x > 0),
+        },
+    }
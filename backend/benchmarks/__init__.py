@@ -0,0 +1,8 @@
+"""
+Benchmarks for the backtest engine, run from backend/:
+
+    python -m benchmarks run --out benchmarks/baseline.json
+    python -m benchmarks compare benchmarks/baseline.json [current.json] [--threshold 0.2]
+
+See benchmarks.suite for what is measured and how runs are compared.
+"""
@@ -0,0 +1,98 @@
+"""
+python -m benchmarks run [--sizes N ...] [--repeat R] [--only TEXT] [--no-memory] [--out FILE]
+python -m benchmarks compare BASELINE [CURRENT] [--threshold F] [--memory-threshold F] [--raw]
+
+compare without CURRENT runs the baseline's cases now (same sizes and repeat). It prints every
+shared case (bars/sec change adjusted for machine speed unless --raw, peak memory change, and the
+machine's speed change measured alongside it) and exits with status 1 when any case regressed
+past the threshold or a backtest case that traded in the baseline made no trades.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.suite import DEFAULT_SIZES, compare, run_suite
+
+
+def _load(path: str) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def _write(report: dict, path: str) -> None:
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def _pct(x) -> str:
+    return "" if x is None else f"{x * 100:+.1f}%"
+
+
+def cmd_run(args) -> int:
+    report = run_suite(args.sizes, args.repeat, not args.no_memory, args.only, log=print)
+    if args.out:
+        _write(report, args.out)
+        print(f"wrote {len(report['cases'])} cases to {args.out}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    baseline = _load(args.baseline)
+    if args.only:
+        baseline["cases"] = {k: v for k, v in baseline["cases"].items() if args.only in k}
+    if args.current:
+        current = _load(args.current)
+    else:
+        cases = baseline["cases"].values()
+        current = run_suite(
+            sorted({c["bars"] for c in cases}),
+            baseline.get("repeat", 5),
+            memory=any(c.get("peak_mb") is not None for c in cases),
+            only=args.only,
+            log=print,
+        )
+        if args.out:
+            _write(current, args.out)
+    result = compare(baseline, current, args.threshold, args.memory_threshold, not args.raw)
+    print(f"\n{'case':<70} {'bars/s':>9} {'memory':>9} {'machine':>9}")
+    for row in result["rows"]:
+        flag = "  REGRESSED: " + ", ".join(row["regressions"]) if row["regressions"] else ""
+        print(
+            f"{row['case']:<70} {_pct(row.get('speed_change')):>9} {_pct(row.get('memory_change')):>9}"
+            f" {_pct(row.get('machine_change')):>9}{flag}"
+        )
+    for name in result["missing"]:
+        print(f"{name:<70} missing from the current run")
+    n = len(result["regressions"])
+    print(f"\n{n} regression(s) beyond {result['threshold']:.0%} speed / {result['memory_threshold']:.0%} memory")
+    return 1 if n else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Backtest engine benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="time the suite and optionally write a baseline")
+    run.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="bar counts")
+    run.add_argument("--repeat", type=int, default=5, help="timed runs per case (best is kept)")
+    run.add_argument("--only", help="only cases whose name contains this")
+    run.add_argument("--no-memory", action="store_true", help="skip the traced peak-memory run")
+    run.add_argument("--out", help="JSON file to write")
+    run.set_defaults(fn=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="flag regressions against a baseline")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current", nargs="?", help="a report from `run`; omitted: run the suite now")
+    cmp_.add_argument("--threshold", type=float, default=0.2, help="allowed bars/sec drop (0.2 = 20%%)")
+    cmp_.add_argument("--memory-threshold", type=float, help="allowed peak memory growth (default: --threshold)")
+    cmp_.add_argument("--raw", action="store_true", help="compare bars/sec as measured, not adjusted for machine speed")
+    cmp_.add_argument("--only", help="only cases whose name contains this")
+    cmp_.add_argument("--out", help="write the fresh run here (when running now)")
+    cmp_.set_defaults(fn=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
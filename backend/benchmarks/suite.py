@@ -0,0 +1,254 @@
+"""
+Backtest engine benchmark suite.
+Cases are timed on synthetic 5-minute small-cap bars (app.market_data.synthetic, deterministic,
+no network):
+- backtest/<config>/<bars>: run_backtest_from_config for each seeded Steven Dux config with the
+  thresholds of BENCH_OVERRIDES, loosened so the configs trade on the bench bars and the timing
+  covers fills and exits, not just the masks.
+- rule/<kind>.<name>/<bars>: each registered entry / confirmation mask with its default
+  parameters, on a fresh IndicatorFrame so the columns it reads are computed too
+Each case records the best of repeat samples as seconds (per run; cases under
+MIN_SAMPLE_SECONDS are looped within a sample) and bars_per_sec, the best time of a fixed numpy
+workload sampled alternately with it as calibration_seconds, and the peak traced allocation
+(tracemalloc, which numpy reports to) of one more run as peak_mb; tracing is kept out of the
+timed runs. Backtest cases also record num_trades. compare() flags cases whose bars/sec
+dropped, or whose peak memory grew, by more than a threshold fraction of the baseline, and
+backtest cases that stopped trading (their timing no longer covers the trading paths).
+"""
+import gc
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+from app.market_data.resolution import DAY_SECONDS, SESSION_SECONDS, resolution_seconds
+from app.market_data.synthetic import EPOCH_DAY, HORIZON_DAY, synthetic_bars
+from app.strategies import BarSeries, load_config, run_backtest_from_config
+from app.strategies.indicators import RULES
+from app.strategies.plan import compile_config
+from app.strategies.precompute import IndicatorFrame
+from app.strategies.steven_dux_configs import DUX_MULTIDAY_PARABOLIC, DUX_PARABOLIC_EXHAUSTION
+from app.strategies.sweep import apply_params
+
+SUITE_VERSION = 2  # bump when cases change meaning; compare() refuses other versions
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+SEEDED_CONFIGS = (DUX_PARABOLIC_EXHAUSTION, DUX_MULTIDAY_PARABOLIC)
+# Sweep parameters (strategies.sweep.apply_params) applied to the seeded configs, by config name
+BENCH_OVERRIDES = {
+    "Dux_Parabolic_Exhaustion_Intraday_v3": {
+        "min_threshold_pct": 5,
+        "min_rotation_multiple": 0.8,
+        "min_pct": 1,
+        "min_multiple": -1,
+        "min_wick_to_body_ratio": 0,
+        "min_multiple_vs_5bar_avg": 0.8,
+    },
+    "Dux_MultiDay_Parabolic_Unwind_v3": {"min_threshold_pct": 10, "min_gap_pct": 2, "min_rotation_multiple": 1.0},
+}
+BENCH_SYMBOL = "BENCH"
+BENCH_RESOLUTION = "5min"
+BENCH_REGIME = "small_cap"
+MIN_SAMPLE_SECONDS = 0.05  # shorter cases are looped so timer noise stays small
+
+
+def bench_configs() -> list:
+    """The seeded configs with their BENCH_OVERRIDES applied."""
+    configs = [load_config(c) for c in SEEDED_CONFIGS]
+    return [apply_params(c, BENCH_OVERRIDES.get(c.name, {})) for c in configs]
+
+
+def bench_bars(n: int, resolution: str = BENCH_RESOLUTION) -> BarSeries:
+    """
+    The first n synthetic BENCH_REGIME bars of BENCH_SYMBOL from EPOCH_DAY (about 50 years of
+    5-minute sessions at most).
+    """
+    per_session = SESSION_SECONDS // resolution_seconds(resolution)
+    days = -(-n // per_session) * 7 // 5 + 7  # weekdays only
+    start = EPOCH_DAY * DAY_SECONDS
+    end = min(EPOCH_DAY + days, HORIZON_DAY) * DAY_SECONDS
+    bars = synthetic_bars(BENCH_SYMBOL, resolution, start, end, BENCH_REGIME)
+    if len(bars) < n:
+        raise ValueError(f"Synthetic market has only {len(bars)} {resolution} bars; asked for {n}")
+    return bars[:n]
+
+
+def _calibration() -> None:
+    """A fixed numpy workload (sort, cumulative sums, elementwise math) measuring the machine, not the engine."""
+    x = np.random.default_rng(0).random(200_000)
+    np.sort(x)
+    np.cumsum(np.sqrt(x) * np.log1p(x))
+    np.maximum.accumulate(x)
+
+
+def _loops(fn: Callable[[], object]) -> int:
+    """Calls per sample so that a sample lasts at least MIN_SAMPLE_SECONDS."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= MIN_SAMPLE_SECONDS:
+            return loops
+        loops *= 2 if elapsed <= 0 else max(2, min(10, int(MIN_SAMPLE_SECONDS / elapsed) + 1))
+
+
+def _sample(fn: Callable[[], object], loops: int) -> float:
+    gc.collect()
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - t0) / loops
+
+
+def _time(fn: Callable[[], object], repeat: int) -> tuple[float, float]:
+    """
+    Best seconds per call of fn over repeat samples, and of _calibration over samples taken
+    alternately with them (so both see the same machine load).
+    """
+    loops, cal_loops = _loops(fn), _loops(_calibration)
+    best = cal = float("inf")
+    for _ in range(max(repeat, 1)):
+        cal = min(cal, _sample(_calibration, cal_loops))
+        best = min(best, _sample(fn, loops))
+    return best, cal
+
+
+def _peak_mb(fn: Callable[[], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / 2**20, 3)
+
+
+def _measure(fn: Callable[[], object], bars: int, repeat: int, memory: bool) -> dict:
+    seconds, calibration = _time(fn, repeat)
+    return {
+        "bars": bars,
+        "seconds": round(seconds, 6),
+        "bars_per_sec": round(bars / seconds, 1) if seconds > 0 else None,
+        "calibration_seconds": round(calibration, 6),
+        "peak_mb": _peak_mb(fn) if memory else None,
+    }
+
+
+def _rules() -> list:
+    """Registered rules with a batch mask that runs on bars alone."""
+    return [
+        spec
+        for kind in ("entry", "confirmation")
+        for spec in RULES[kind].values()
+        if spec.mask is not None and spec.scope == "bar"
+    ]
+
+
+def _mask(rule, params: dict, bars: BarSeries) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):  # as StrategyPlan.signal_mask runs them
+        return rule.mask(IndicatorFrame(bars), params)
+
+
+def run_suite(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    repeat: int = 5,
+    memory: bool = True,
+    only: Optional[str] = None,
+    log: Optional[Callable[[str], None]] = None,
+) -> dict:
+    """
+    Time every case at each size; only keeps cases whose name contains it. Repeats are capped
+    at one for runs of a million bars or more. Returns the JSON-ready report compare() reads.
+    """
+    plans = [compile_config(c) for c in bench_configs()]
+    rules = _rules()
+    cases: dict[str, dict] = {}
+    for n in sorted(sizes):
+        bars = bench_bars(n)
+        reps = 1 if n >= 1_000_000 else repeat
+        jobs = [
+            (f"backtest/{p.config.name}/{n}", lambda p=p: run_backtest_from_config(p, BENCH_SYMBOL, bars=bars))
+            for p in plans
+        ]
+        jobs += [
+            (f"rule/{r.kind}.{r.name}/{n}", lambda r=r, p=r.bind({}): _mask(r, p, bars))
+            for r in rules
+        ]
+        for name, fn in jobs:
+            if only and only not in name:
+                continue
+            cases[name] = _measure(fn, n, reps, memory)
+            if name.startswith("backtest/"):
+                cases[name]["num_trades"] = fn()["num_trades"]
+            if log:
+                c = cases[name]
+                trades = f" {c['num_trades']:>7} trades" if "num_trades" in c else ""
+                log(f"{name:<70} {c['seconds']:>10.4f}s {c['bars_per_sec'] or 0:>14,.0f} bars/s {c['peak_mb'] or 0:>9.1f} MB{trades}")
+    return {
+        "suite_version": SUITE_VERSION,
+        "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "repeat": repeat,
+        "cases": cases,
+    }
+
+
+def compare(
+    baseline: dict,
+    current: dict,
+    threshold: float = 0.2,
+    memory_threshold: Optional[float] = None,
+    normalize: bool = True,
+) -> dict:
+    """
+    Cases of current against baseline. A case regresses when its bars/sec fell by more than
+    threshold (0.2 = 20%) of the baseline's, or its peak memory grew by more than memory_threshold
+    (default threshold). With normalize, each case's speed is first scaled by the calibration
+    time measured alongside it in either run, so a slower (or busier) machine doesn't read as a
+    slower engine. A backtest case that traded in baseline but not in current regresses too ("no
+trades").
+    Returns rows for every shared case (with "regressions" naming what regressed), plus the case
+    names only one side has. Raises ValueError for other suite versions.
+    """
+    memory_threshold = threshold if memory_threshold is None else memory_threshold
+    for report in (baseline, current):
+        if report.get("suite_version") != SUITE_VERSION:
+            raise ValueError(f"Benchmark report has suite_version {report.get('suite_version')}; expected {SUITE_VERSION}")
+    base, cur = baseline["cases"], current["cases"]
+    rows = []
+    for name in sorted(base.keys() & cur.keys()):
+        b, c = base[name], cur[name]
+        row = {"case": name, "regressions": []}
+        if b.get("bars_per_sec") and c.get("bars_per_sec"):
+            machine = 1.0
+            if normalize and b.get("calibration_seconds") and c.get("calibration_seconds"):
+                machine = c["calibration_seconds"] / b["calibration_seconds"]
+                row["machine_change"] = 1 / machine - 1
+            row["speed_change"] = c["bars_per_sec"] * machine / b["bars_per_sec"] - 1
+            if row["speed_change"] < -threshold:
+                row["regressions"].append("speed")
+        if b.get("peak_mb") and c.get("peak_mb") is not None:
+            row["memory_change"] = c["peak_mb"] / b["peak_mb"] - 1
+            if row["memory_change"] > memory_threshold:
+                row["regressions"].append("memory")
+        if name.startswith("backtest/") and b.get("num_trades") and not c.get("num_trades"):
+            row["regressions"].append("no trades")
+        rows.append(row)
+    return {
+        "threshold": threshold,
+        "memory_threshold": memory_threshold,
+        "rows": rows,
+        "regressions": [r for r in rows if r["regressions"]],
+        "missing": sorted(base.keys() - cur.keys()),
+        "new": sorted(cur.keys() - base.keys()),
+    }
@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+
+from app.market_data.cache import BarCache
+from app.market_data.providers import MockProvider
+from app.market_data.resample import resample
+from app.market_data.resolution import DAY_SECONDS
+
+START = 19_003 * DAY_SECONDS  # Tuesday 2022-01-11
+
+
+class CountingProvider(MockProvider):
+    """Synthetic bars, recording the (start, end) of every upstream request."""
+
+    def __init__(self):
+        super().__init__("small_cap")
+        self.requests: list[tuple[int, int]] = []
+
+    def fetch_bars(self, symbol, resolution, start_ts, end_ts):
+        self.requests.append((start_ts, end_ts))
+        return super().fetch_bars(symbol, resolution, start_ts, end_ts)
+
+
+def _same(a, b) -> bool:
+    return all(np.array_equal(getattr(a, k), getattr(b, k)) for k in ("t", "o", "h", "l", "c", "v"))
+
+
+def test_round_trip_through_files(tmp_path):
+    upstream = CountingProvider()
+    lo, hi = START, START + 5 * DAY_SECONDS - 1
+    bars = BarCache(tmp_path, upstream).fetch_bars("abc", "1", lo, hi)
+    assert len(bars) and _same(bars, MockProvider("small_cap").fetch_bars("ABC", "1", lo, hi))
+
+    # A new cache over the same directory serves the stored file, and resamples it
+    reopened = BarCache(tmp_path, upstream)
+    assert _same(reopened.fetch_bars("ABC", "1", lo, hi), bars)
+    assert _same(reopened.fetch_bars("ABC", "5", lo, hi), resample(bars, "5"))
+    assert len(upstream.requests) == 1
+
+
+def test_miss_fetches_only_the_uncovered_days(tmp_path):
+    upstream = CountingProvider()
+    cache = BarCache(tmp_path, upstream)
+    cache.fetch_bars("ABC", "1", START + 7 * DAY_SECONDS, START + 14 * DAY_SECONDS - 1)
+    # Page back one week, then ask for the whole span
+    earlier = cache.fetch_bars("ABC", "1", START, START + 7 * DAY_SECONDS - 1)
+    whole = cache.fetch_bars("ABC", "1", START, START + 14 * DAY_SECONDS - 1)
+
+    assert upstream.requests == [
+        (START + 7 * DAY_SECONDS, START + 14 * DAY_SECONDS - 1),
+        (START, START + 7 * DAY_SECONDS - 1),
+    ]
+    assert _same(whole, MockProvider("small_cap").fetch_bars("ABC", "1", START, START + 14 * DAY_SECONDS - 1))
+    assert _same(earlier, whole[: len(earlier)])
+    assert len(list((tmp_path / cache.data_version / "1" / "ABC").iterdir())) == 1
+
+
+def test_stale_open_range_refetches_its_tail(tmp_path):
+    upstream = CountingProvider()
+    cache = BarCache(tmp_path, upstream, open_ttl_seconds=0)
+    now = int(time.time())
+    today = now // DAY_SECONDS * DAY_SECONDS
+    cache.fetch_bars("ABC", "1", today - 30 * DAY_SECONDS, now)
+    cache.fetch_bars("ABC", "1", now - 3600, now)
+
+    assert upstream.requests[0][0] == today - 30 * DAY_SECONDS
+    assert upstream.requests[1] == (today, today + DAY_SECONDS - 1)
@@ -0,0 +1,58 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.routers.chart as chart
+from app.market_data.cache import BarCache
+from app.market_data.providers import MockProvider
+from app.market_data.resolution import DAY_SECONDS
+
+NOW = 1_759_957_200  # Wednesday 2025-10-08 21:00 UTC, the session close
+LO = NOW - 30 * DAY_SECONDS
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    cache = BarCache(tmp_path, MockProvider())
+    monkeypatch.setattr(chart, "get_bar_cache", lambda: cache)
+    monkeypatch.setattr(chart, "_PAGE_BARS", 500)
+    app = FastAPI()
+    app.include_router(chart.router)
+    return TestClient(app), cache
+
+
+def _get(client, **params) -> dict:
+    r = client.get("/bars", params={"symbol": "AAPL", "resolution": "1", "format": "json", **params})
+    assert r.status_code == 200
+    return r.json()
+
+
+def test_long_range_pages_back_through_next_time(client):
+    client, cache = client
+    first = _get(client, from_ts=LO, to_ts=NOW)
+    assert first["s"] == "ok" and len(first["t"]) <= 500 and first["nextTime"] < first["t"][0]
+
+    t, to = [], NOW
+    while True:
+        page = _get(client, from_ts=LO, to_ts=to)
+        t = page["t"] + t
+        if page.get("nextTime") is None or page["nextTime"] < LO:
+            break
+        to = page["nextTime"]
+    assert t == cache.fetch_bars("AAPL", "1", LO, NOW).t.tolist()
+
+
+def test_long_countback_pages_back_through_next_time(client):
+    client, cache = client
+    t, to = [], NOW
+    while len(t) < 1200:
+        page = _get(client, from_ts=NOW - 60, to_ts=to, countback=1200 - len(t))
+        t = page["t"] + t
+        to = page["nextTime"] if len(t) < 1200 else None
+    assert t == cache.fetch_bars("AAPL", "1", LO, NOW).t[-1200:].tolist()
+
+
+def test_range_within_one_page_has_no_next_time(client):
+    client, _ = client
+    page = _get(client, from_ts=NOW - 3600, to_ts=NOW)
+    assert "nextTime" not in page
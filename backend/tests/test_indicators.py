@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from app.strategies.bars import as_series
+from app.strategies.indicators import (
+    RULES,
+    Bar,
+    confirmation_rule_mask,
+    entry_indicator_mask,
+    eval_confirmation_rule,
+    eval_entry_indicator,
+    eval_exit_rule,
+)
+from app.strategies.precompute import IndicatorFrame
+
+
+def _bars(n: int = 120) -> list[Bar]:
+    r = np.random.default_rng(4)
+    c = 10 * np.cumprod(1 + (r.random(n) - 0.48) * 0.06)
+    o = np.r_[10.0, c[:-1]]
+    t0 = 19_003 * 86400 + 14 * 3600 + 1800
+    return [
+        Bar(t0 + 300 * i, o[i], max(o[i], c[i]) * 1.01, min(o[i], c[i]) * 0.99, c[i], 1e5 * (1 + r.random()))
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("kind", ["entry", "confirmation"])
+def test_per_bar_wrappers_read_the_mask(kind):
+    bars = _bars()
+    frame = IndicatorFrame(as_series(bars))
+    for name, spec in RULES[kind].items():
+        if spec.mask is None:
+            continue
+        params = spec.bind({})
+        if kind == "entry":
+            mask = entry_indicator_mask(name, params, frame)
+            got = [eval_entry_indicator(name, params, bars, i) for i in range(len(bars))]
+        else:
+            mask = confirmation_rule_mask(name, params, frame)
+            got = [eval_confirmation_rule(name, params, bars, i) for i in range(len(bars))]
+        assert got == mask.tolist(), name
+
+
+def test_exit_rule_wrapper():
+    bars = _bars()
+    assert eval_exit_rule("partial_cover_pct", {"target_pct": 5}, 10.0, bars[3], bars[:4], 6.0) == (True, bars[3].c)
+    assert eval_exit_rule("partial_cover_pct", {"target_pct": 5}, 10.0, bars[3], bars[:4], 4.0) == (False, 0.0)
+    assert eval_exit_rule("structure_based_trailing", {}, 10.0, bars[3], bars[:4], 6.0) == (False, 0.0)
+    with pytest.raises(ValueError):
+        eval_exit_rule("no_such_exit", {}, 10.0, bars[3], bars[:4], 0.0)
@@ -0,0 +1,59 @@
+from typing import Optional
+
+import numpy as np
+
+from app.market_data.resolution import DAY_SECONDS, SESSION_OPEN, session_bars
+from app.strategies.bars import BarSeries
+from app.strategies.config_schema import StrategyConfig
+from app.strategies.plan import compile_config
+from app.strategies.precompute import precompute_indicators
+from app.strategies.simulator import simulate, simulate_chunked
+
+
+def _sessions(*levels: float, step: int = 300) -> BarSeries:
+    """One full regular session of flat bars at each price level, on consecutive days."""
+    m = session_bars(step)
+    t = np.concatenate([(19000 + d) * DAY_SECONDS + SESSION_OPEN + np.arange(m) * step for d in range(len(levels))])
+    c = np.repeat(np.asarray(levels, dtype=np.float64), m)
+    return BarSeries(t, c, c * 1.001, c * 0.999, c, np.full(len(c), 1e5))
+
+
+def _gainer(threshold: float = 5, max_hold_bars: Optional[int] = None) -> StrategyConfig:
+    return StrategyConfig.model_validate(
+        {
+            "name": "gainer",
+            "entries": [{"indicator": "percent_gain_from_prior_close", "parameters": {"min_threshold_pct": threshold}}],
+            "backtest_assumptions": {"primary_timeframe": "5min", "max_hold_bars": max_hold_bars},
+        }
+    )
+
+
+def test_session_lookbacks_count_session_bars():
+    plan = compile_config(_gainer())
+    assert plan.lookback == session_bars(300) == 78
+    assert plan.sessions == 1
+
+
+def test_signal_in_second_session_survives_warm_up():
+    bars = _sessions(10.0, 11.0)
+    plan = compile_config(_gainer())
+    mask = plan.signal_mask(precompute_indicators(bars, plan))
+    assert not mask[:78].any()
+    assert mask[78:].all()
+
+    trades = simulate(plan, bars).trades
+    assert trades and trades[0]["entry_index"] >= 78
+
+
+def test_chunks_keep_whole_sessions_on_extended_hours_bars():
+    # Round-the-clock bars: a session holds 288 bars, more than the plan's 78-bar lookback
+    n = 5 * 288
+    t = 19000 * DAY_SECONDS + np.arange(n) * 300
+    c = 10.0 * 1.1 ** (np.arange(n) // 288) + np.sin(np.arange(n)) * 0.05
+    bars = BarSeries(t, c, c * 1.01, c * 0.99, c, np.full(n, 1e5))
+    plan = compile_config(_gainer(threshold=8, max_hold_bars=100))
+    whole = simulate(plan, bars)
+    chunked = simulate_chunked(plan, (bars[a : a + 50] for a in range(0, n, 50)))
+    assert len(whole.trades) > 4
+    assert chunked.trades == whole.trades
+    assert np.array_equal(chunked.equity, whole.equity)
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from app.market_data.resample import bucket_start, resample
+from app.market_data.resolution import DAY_SECONDS, SESSION_OPEN
+from app.market_data.synthetic import synthetic_bars
+
+START = 19_003 * DAY_SECONDS  # Tuesday 2022-01-11
+END = START + 16 * DAY_SECONDS
+
+
+@pytest.fixture(scope="module")
+def minutes():
+    return synthetic_bars("ABC", "1", START, END, "small_cap")
+
+
+@pytest.mark.parametrize("resolution", ["5", "60", "1D", "1W"])
+def test_resample_aggregates_ohlcv_per_bucket(minutes, resolution):
+    out = resample(minutes, resolution)
+    keys = bucket_start(minutes.t, resolution)
+    assert out.t.tolist() == sorted(set(keys.tolist()))
+    for i, t in enumerate(out.t):
+        rows = np.flatnonzero(keys == t)
+        assert out.o[i] == minutes.o[rows[0]] and out.c[i] == minutes.c[rows[-1]]
+        assert out.h[i] == minutes.h[rows].max() and out.l[i] == minutes.l[rows].min()
+        assert out.v[i] == minutes.v[rows].sum()
+
+
+def test_buckets_align_to_the_session_and_week():
+    hours = bucket_start(np.array([START + SESSION_OPEN, START + SESSION_OPEN + 3599]), "60")
+    assert (hours == START + SESSION_OPEN).all()  # hourly bars start at the open, :30
+    week = bucket_start(np.array([START + SESSION_OPEN]), "1W")[0]
+    assert week == START - DAY_SECONDS and (week // DAY_SECONDS + 3) % 7 == 0  # Monday
+
+
+def test_resample_is_composable(minutes):
+    five = resample(minutes, "5")
+    for resolution in ("15", "60", "1D"):
+        a, b = resample(five, resolution), resample(minutes, resolution)
+        assert all(np.array_equal(getattr(a, k), getattr(b, k)) for k in ("t", "o", "h", "l", "c", "v"))
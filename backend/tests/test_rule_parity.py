@@ -0,0 +1,89 @@
+"""Every rule's mask, its scan over a symbol universe and its streaming check agree bar for bar."""
+import numpy as np
+import pytest
+
+from app.market_data.resolution import DAY_SECONDS, resolution_seconds
+from app.market_data.synthetic import synthetic_bars
+from app.strategies.indicators import RULES
+from app.strategies.precompute import IndicatorFrame
+from app.strategies.scanner import _Universe, check_all
+from app.strategies.streaming import SymbolTicks
+
+SYMBOLS = ("GME", "AMC", "ZZT")
+START = 19_003 * DAY_SECONDS
+
+# Parameters beside each rule's defaults, so thresholds both pass and fail some bars
+VARIANTS = {
+    "percent_gain_from_prior_close": [{"min_threshold_pct": 3}],
+    "two_day_percent_gain": [{"min_threshold_pct": 5}],
+    "gap_up_pct": [{"min_gap_pct": 1}],
+    "volume_vs_float_ratio": [{"min_rotation_multiple": 1.5}],
+    "percent_above_vwap": [{"min_pct": 1}],
+    "atr_multiple_extension": [{"min_multiple": 0.5, "lookback_period": 5}],
+    "failed_breakout_within_n_bars": [{"bars": 1}, {"bars": 0}],
+    "upper_wick_ratio_threshold": [{"min_wick_to_body_ratio": 1}],
+    "volume_climax_bar": [{"min_multiple_vs_5bar_avg": 1.5}],
+    "declining_volume_on_bounce": [{"comparison_bars": 1}, {"comparison_bars": 0}],
+    "break_of_morning_support": [{"time_window_minutes": 60}],
+}
+
+
+def _universe_bars(resolution: str) -> dict:
+    """Synthetic bars per symbol with some bars (and one symbol's first sessions) missing."""
+    rng = np.random.default_rng(11)
+    out = {}
+    for k, symbol in enumerate(SYMBOLS):
+        days = 200 if resolution == "1D" else 12
+        b = synthetic_bars(symbol, resolution, START, START + days * DAY_SECONDS, "small_cap")
+        keep = rng.random(len(b)) > 0.1
+        keep[: len(b) // 5 if k == 2 else 0] = False
+        out[symbol] = type(b)(*(getattr(b, f)[keep] for f in "tohlcv"))
+    return out
+
+
+def _cases(resolution: str):
+    for kind in ("entry", "confirmation"):
+        for name, spec in RULES[kind].items():
+            if spec.mask is None or (spec.timeframe == "intraday" and resolution == "1D"):
+                continue
+            for params in [{}] + VARIANTS.get(name, []):
+                yield spec, spec.bind(params)
+
+
+@pytest.mark.parametrize("resolution", ["5", "1D"])
+def test_mask_scan_and_stream_agree(resolution):
+    bars = _universe_bars(resolution)
+    bar_seconds = resolution_seconds(resolution)
+    cases = list(_cases(resolution))
+    inputs = tuple(dict.fromkeys(k for spec, p in cases for k in spec.inputs(p)))
+
+    # Masks over each symbol's whole series
+    masks = {}
+    for symbol, series in bars.items():
+        frame = IndicatorFrame(series)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            masks[symbol] = [spec.mask(frame, p) for spec, p in cases]
+
+    # The same rules as scans: over the universe tick by tick, and over each symbol's stream
+    universe = _Universe(len(SYMBOLS), inputs)
+    streams = {symbol: SymbolTicks(inputs) for symbol in SYMBOLS}
+    position = dict.fromkeys(SYMBOLS, 0)
+    times = np.unique(np.concatenate([b.t for b in bars.values()]))
+    checked = 0
+    for t in times:
+        rows = [k for k, s in enumerate(SYMBOLS) if position[s] < len(bars[s]) and bars[s].t[position[s]] == t]
+        cols = [np.array([getattr(bars[SYMBOLS[k]], f)[position[SYMBOLS[k]]] for k in rows]) for f in "ohlcv"]
+        tick = universe.update(np.array(rows), np.full(len(rows), t), *cols)
+        for j, k in enumerate(rows):
+            symbol = SYMBOLS[k]
+            i = position[symbol]
+            own = streams[symbol].update(bars[symbol][i])
+            for (spec, p), mask in zip(cases, masks[symbol]):
+                if i < spec.lookback(p, bar_seconds):
+                    continue
+                expected = bool(mask[i])
+                assert bool(check_all([(spec.scan, p)], tick)[j]) == expected, (spec.name, p, symbol, i)
+                assert bool(check_all([(spec.scan, p)], own)[0]) == expected, (spec.name, p, symbol, i)
+                checked += 1
+            position[symbol] = i + 1
+    assert checked > 1000
@@ -0,0 +1,26 @@
+import pytest
+
+from app.strategies import load_config
+from app.strategies.plan import UnsupportedRuleError
+from app.strategies.steven_dux_configs import DUX_PARABOLIC_EXHAUSTION
+from app.strategies.sweep import apply_params
+
+
+def _params(config, indicator: str) -> dict:
+    return next(e.parameters for e in config.entries if e.indicator == indicator)
+
+
+def test_apply_params_sets_rule_parameters():
+    config = load_config(DUX_PARABOLIC_EXHAUSTION)
+    swept = apply_params(config, {"entries.percent_above_vwap.min_pct": 35, "min_threshold_pct": 90})
+    assert _params(swept, "percent_above_vwap")["min_pct"] == 35
+    assert _params(swept, "percent_gain_from_prior_close")["min_threshold_pct"] == 90
+    assert _params(config, "percent_above_vwap")["min_pct"] == 20
+
+
+def test_apply_params_refuses_a_parameter_the_rule_does_not_take():
+    config = load_config(DUX_PARABOLIC_EXHAUSTION)
+    with pytest.raises(UnsupportedRuleError, match="entries.percent_above_vwap has no parameter min_pcnt"):
+        apply_params(config, {"entries.percent_above_vwap.min_pcnt": 35})
+    with pytest.raises(ValueError, match="Unknown sweep parameter"):
+        apply_params(config, {"entries.gap_up_pct.min_gap_pct": 35})
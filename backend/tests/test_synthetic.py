@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.market_data.resolution import DAY_SECONDS
+from app.market_data.synthetic import ANCHOR_DAY, synthetic_bars, synthetic_symbols
+from app.strategies import load_config
+from app.strategies.plan import compile_config
+from app.strategies.precompute import precompute_indicators
+from app.strategies.simulator import simulate
+from app.strategies.steven_dux_configs import DUX_MULTIDAY_PARABOLIC, DUX_PARABOLIC_EXHAUSTION
+
+END = ANCHOR_DAY * DAY_SECONDS
+START = END - 2 * 365 * DAY_SECONDS
+
+
+def _small_caps():
+    return [synthetic_bars(s, "5", START, END, "small_cap") for s in synthetic_symbols(10)]
+
+
+def test_small_cap_trades_the_seeded_multiday_short():
+    plan = compile_config(load_config(DUX_MULTIDAY_PARABOLIC))
+    trades = [len(simulate(plan, bars).trades) for bars in _small_caps()]
+    assert sum(trades) >= 5 and sum(n > 0 for n in trades) >= 3
+
+
+def test_small_cap_runs_reach_the_intraday_exhaustion_entries():
+    # Gains of 70% over the prior close, 20% above the session VWAP: the seeded intraday short's
+    # entry thresholds before its single-bar confirmations
+    plan = compile_config(load_config(DUX_PARABOLIC_EXHAUSTION))
+    entries = [r for r in plan.signals if r.name in ("percent_gain_from_prior_close", "percent_above_vwap")]
+    assert len(entries) == 2
+    hits = 0
+    for bars in _small_caps():
+        frame = precompute_indicators(bars, plan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            hits += int(np.logical_and.reduce([r.spec.mask(frame, r.params) for r in entries]).sum())
+    assert hits > 0
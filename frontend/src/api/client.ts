@@ -115,19 +115,74 @@ export const strategies = {
     api<{ id: number; guru_id: number; name: string; strategy_type: string | null }[]>(
       `/strategies/similar?strategy_id=${strategyId}`
     ),
+  backtestTrades: (strategyId: number, runId: number, offset = 0, limit = 100) =>
+    api<{
+      run_id: number;
+      total: number;
+      offset: number;
+      trades: {
+        entry_index: number;
+        exit_index: number;
+        entry_t: number;
+        exit_t: number;
+        entry_price: number;
+        exit_price: number;
+        shares: number;
+        pnl: number;
+        pnl_pct: number;
+        reason: string;
+        partial: boolean;
+      }[];
+    }>(`/strategies/${strategyId}/backtests/${runId}/trades?offset=${offset}&limit=${limit}`),
+  backtestEquity: (strategyId: number, runId: number, maxPoints = 2000) =>
+    api<{ run_id: number; total: number; offset: number; t: number[]; equity: number[] }>(
+      `/strategies/${strategyId}/backtests/${runId}/equity?max_points=${maxPoints}`
+    ),
+};
+
+type ChartBarsParams = { symbol: string; from_ts: number; to_ts: number; resolution?: string; countback?: number };
+
+type ChartBars = {
+  s: string;
+  nextTime?: number;
+  t: number[];
+  o: number[];
+  h: number[];
+  l: number[];
+  c: number[];
+  v: number[];
 };
 
+function chartBarsPage(params: ChartBarsParams) {
+  const q = new URLSearchParams({
+    symbol: params.symbol,
+    from_ts: String(params.from_ts),
+    to_ts: String(params.to_ts),
+    resolution: params.resolution ?? "1D",
+  });
+  if (params.countback != null) q.set("countback", String(params.countback));
+  return api<ChartBars>(`/chart/bars?${q}`);
+}
+
 export const chart = {
-  bars: (params: { symbol: string; from_ts: number; to_ts: number; resolution?: string }) => {
-    const q = new URLSearchParams({
-      symbol: params.symbol,
-      from_ts: String(params.from_ts),
-      to_ts: String(params.to_ts),
-      resolution: params.resolution ?? "1D",
-    });
-    return api<{ s: string; t: number[]; o: number[]; h: number[]; l: number[]; c: number[]; v: number[] }>(
-      `/chart/bars?${q}`
-    );
+  // The server returns one page at most, the newest bars of the range. A page with nextTime has
+  // bars before it (or, when empty, an earlier bar at nextTime): request to_ts = nextTime until
+  // the range, or countback, is filled.
+  bars: async (params: ChartBarsParams): Promise<ChartBars> => {
+    const out = await chartBarsPage(params);
+    let next = out.nextTime;
+    while (next != null) {
+      const left = params.countback != null ? params.countback - out.t.length : null;
+      if (left != null ? left <= 0 : next < params.from_ts) break;
+      const page = await chartBarsPage({ ...params, to_ts: next, countback: left ?? undefined });
+      if (page.s === "ok") {
+        for (const k of ["t", "o", "h", "l", "c", "v"] as const) out[k] = page[k].concat(out[k]);
+        out.s = "ok";
+      }
+      next = page.nextTime;
+    }
+    out.nextTime = out.s === "ok" ? undefined : next;
+    return out;
   },
   symbol: (symbol: string) =>
     api<{ name: string; exchange: string; type: string; description: string }>(`/chart/symbol?symbol=${encodeURIComponent(symbol)}`),